@@ -35,7 +35,7 @@ class RelevanceTier(Enum):
     TIER_4_EXCLUDE = 4  # Exclude
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalyzedItem:
     """An item that has been analyzed for relevance."""
     item: any
@@ -752,7 +752,7 @@ class DemoPrepGenerator:
             sources.append({
                 "type": "document",
                 "title": doc.filename,
-                "date": doc.extraction_time.strftime("%B %d") if hasattr(doc, 'extraction_time') else "Attached",
+                "date": doc.extraction_datetime.strftime("%B %d") if hasattr(doc, 'extraction_datetime') else "Attached",
             })
 
         return sources
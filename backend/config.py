@@ -7,6 +7,7 @@ class Settings(BaseSettings):
     supabase_url: str = ""
     supabase_key: str = ""
     supabase_service_key: str = ""
+    supabase_jwt_secret: str = ""  # Verifies auth JWTs when set
 
     # Google OAuth
     google_client_id: str = ""
@@ -26,6 +27,9 @@ class Settings(BaseSettings):
     frontend_url: str = "http://localhost:3000"
     demo_mode: bool = True
 
+    # Documents
+    native_pdf_parser: bool = False  # Opt in to turbo-parsepdf when installed
+
     class Config:
         env_file = ".env"
 
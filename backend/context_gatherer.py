@@ -9,23 +9,65 @@ Collects context from multiple sources:
 """
 
 import asyncio
+import hashlib
+import time
+from contextvars import ContextVar
 from datetime import datetime, timedelta
 from typing import Optional
 from dataclasses import dataclass, field
 import logging
-import base64
 import io
 import re
 
+try:
+    # SIMD-accelerated drop-in for the stdlib decoder
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 from models import Meeting, Attendee, Email, SlackMessage
-from document_processor import DocumentProcessor, ExtractedDocument
+from document_processor import DocumentProcessor, ExtractedDocument, run_in_process_pool
+from integrations.gmail import parse_headers
 
 logger = logging.getLogger(__name__)
 
+# Source lookups that failed during the current gather_meeting_context()
+# call. Their handlers fall back to [] so the other sources still come
+# through, but a context missing a source must not be cached
+_source_failures: ContextVar[Optional[list[str]]] = ContextVar("context_source_failures", default=None)
 
-@dataclass
+
+def _record_source_failure(message: str) -> None:
+    """Log a failed source lookup and note it for the current gather."""
+    logger.error(message)
+    failures = _source_failures.get()
+    if failures is not None:
+        failures.append(message)
+
+
+# Precompiled once: HTML bodies can be large and are stripped per email
+_HTML_BLOCK_RE = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# HTML bodies above this size are stripped in a worker process
+_HTML_OFFLOAD_MIN_CHARS = 64 * 1024
+
+
+def _html_to_text(html: str) -> str:
+    """Strip tags (and script/style contents) from an HTML body in one pass each."""
+    if '<' not in html:
+        return html
+    return _HTML_TAG_RE.sub('', _HTML_BLOCK_RE.sub('', html))
+
+
+@dataclass(slots=True)
 class EmailAttachment:
-    """Represents an email attachment."""
+    """
+    Represents an email attachment.
+
+    Raw bytes are released once text is extracted, so `content` is normally
+    None on gathered contexts.
+    """
     filename: str
     mime_type: str
     size: int
@@ -33,7 +75,7 @@ class EmailAttachment:
     extracted_text: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class EnrichedEmail:
     """Email with full body content and attachments."""
     id: str
@@ -49,8 +91,8 @@ class EnrichedEmail:
     labels: list[str] = field(default_factory=list)
 
     def to_basic_email(self) -> Email:
-        """Convert to basic Email model."""
-        return Email(
+        """Convert to basic Email model (fields are already typed, so skip validation)."""
+        return Email.model_construct(
             id=self.id,
             subject=self.subject,
             sender=self.sender,
@@ -60,7 +102,7 @@ class EnrichedEmail:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class SlackFile:
     """Represents a file shared in Slack."""
     id: str
@@ -74,7 +116,7 @@ class SlackFile:
     timestamp: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class EnrichedSlackMessage:
     """Slack message with files and additional context."""
     text: str
@@ -89,8 +131,8 @@ class EnrichedSlackMessage:
     is_thread_reply: bool = False
 
     def to_basic_message(self) -> SlackMessage:
-        """Convert to basic SlackMessage model."""
-        return SlackMessage(
+        """Convert to basic SlackMessage model (fields are already typed, so skip validation)."""
+        return SlackMessage.model_construct(
             text=self.text,
             user=self.user,
             channel=self.channel,
@@ -98,7 +140,7 @@ class EnrichedSlackMessage:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class CalendarAttachment:
     """Represents a calendar event attachment."""
     file_id: str
@@ -127,7 +169,7 @@ class MeetingContext:
     external_attendees: list[str] = field(default_factory=list)
     internal_domain: Optional[str] = None
 
-    # Stats
+    # Stats; everything gathered, including what cap() later drops
     total_emails: int = 0
     total_slack_messages: int = 0
     total_documents: int = 0
@@ -137,6 +179,21 @@ class MeetingContext:
         """Check if meeting has external attendees."""
         return len(self.external_attendees) > 0
 
+    def cap(self, max_emails: Optional[int] = None, max_slack_messages: Optional[int] = None) -> None:
+        """
+        Record the totals, then keep only the newest emails and messages.
+
+        Both lists are sorted newest first. The totals are taken before
+        trimming so stats report what was actually gathered.
+        """
+        self.total_emails = len(self.emails)
+        self.total_slack_messages = len(self.slack_messages)
+        self.total_documents = len(self.get_all_extracted_documents())
+        if max_emails is not None:
+            del self.emails[max_emails:]
+        if max_slack_messages is not None:
+            del self.slack_messages[max_slack_messages:]
+
     def get_all_extracted_documents(self) -> list[ExtractedDocument]:
         """Get all documents extracted from all sources."""
         docs = []
@@ -192,8 +249,36 @@ class MeetingContext:
 class ContextGatherer:
     """
     Gathers comprehensive context for a meeting from all integrated sources.
+
+    Gathered contexts are cached per user for CONTEXT_CACHE_TTL seconds so
+    back-to-back requests for the same meeting (preview then generate,
+    retries) don't re-hit Gmail/Slack/Drive.
     """
 
+    CONTEXT_CACHE_TTL = 300  # seconds
+    CONTEXT_CACHE_MAX_ENTRIES = 128
+    MAX_CONCURRENT_DOWNLOADS = 8
+    CALENDAR_BATCH_SIZE = 50  # Calendar API's recommended max calls per batch
+
+    # Size band in which Slack files are worth running a document parser on
+    MIN_EXTRACT_BYTES = 256
+    MAX_EXTRACT_BYTES = 20 * 1024 * 1024  # 20MB
+    PLAIN_TEXT_FILETYPES = frozenset({"text", "txt", "md", "markdown", "json"})
+
+    # Per-file bounds so one stuck download/parse can't stall the whole gather
+    FILE_DOWNLOAD_TIMEOUT = 15  # seconds
+    FILE_EXTRACT_TIMEOUT = 20  # seconds
+
+    # Extracted text of Slack/Drive files, keyed by (user_id, source, file_id)
+    EXTRACTION_CACHE_TTL = 600  # seconds
+    EXTRACTION_CACHE_MAX_ENTRIES = 512
+
+    # key -> (stored_at, value); shared across instances since a gatherer
+    # is built per request
+    _context_cache: dict[str, tuple[float, MeetingContext]] = {}
+    _extraction_cache: dict[tuple, tuple[float, str]] = {}
+    _extraction_in_flight: dict[tuple, asyncio.Future] = {}
+
     def __init__(
         self,
         gmail_client=None,
@@ -201,6 +286,7 @@ class ContextGatherer:
         calendar_client=None,
         drive_credentials=None,
         internal_domain: Optional[str] = None,
+        user_id: Optional[str] = None,
     ):
         """
         Initialize the context gatherer.
@@ -211,20 +297,26 @@ class ContextGatherer:
             calendar_client: Initialized GoogleCalendarClient
             drive_credentials: Google credentials for Drive API
             internal_domain: Company domain for detecting external attendees
+            user_id: Owner of the clients; enables the context cache when set
         """
         self.gmail_client = gmail_client
         self.slack_client = slack_client
         self.calendar_client = calendar_client
         self.drive_credentials = drive_credentials
         self.internal_domain = internal_domain
+        self.user_id = user_id
 
         self.document_processor = DocumentProcessor(drive_credentials)
+        self._download_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_DOWNLOADS)
+        self._calendar_events: dict[str, dict] = {}
 
     async def gather_meeting_context(
         self,
         meeting: Meeting,
         days_back: int = 14,
         include_documents: bool = True,
+        max_emails: Optional[int] = None,
+        max_slack_messages: Optional[int] = None,
     ) -> MeetingContext:
         """
         Gather all context for a meeting.
@@ -233,69 +325,204 @@ class ContextGatherer:
             meeting: The meeting to gather context for
             days_back: Number of days to look back for messages/emails
             include_documents: Whether to extract text from attachments
+            max_emails: Keep only this many of the newest emails
+            max_slack_messages: Keep only this many of the newest Slack messages
 
         Returns:
-            MeetingContext with all gathered information
+            MeetingContext with all gathered information; the totals still
+            count everything found, before the caps are applied
         """
+        cache_key = self._context_cache_key(
+            meeting, days_back, include_documents, max_emails, max_slack_messages,
+        )
+        if cache_key:
+            cached = self._context_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < self.CONTEXT_CACHE_TTL:
+                return cached[1]
+
         context = MeetingContext(meeting=meeting, internal_domain=self.internal_domain)
 
         # Identify external attendees
         context.external_attendees = self._identify_external_attendees(meeting.attendees)
 
-        # Gather context from all sources in parallel
+        # Gather context from all sources in parallel, tagging each result
+        # with its source so routing doesn't depend on the result contents
         tasks = []
 
         # Email context
         if self.gmail_client:
-            tasks.append(self._gather_email_context(
+            tasks.append(self._tag("emails", self._gather_email_context(
                 meeting.attendees,
                 days_back,
                 include_documents,
-            ))
+            )))
 
         # Slack context
         if self.slack_client:
-            tasks.append(self._gather_slack_context(
+            tasks.append(self._tag("slack", self._gather_slack_context(
                 meeting.attendees,
                 days_back,
                 include_documents,
                 meeting_title=meeting.title,
-            ))
+            )))
 
         # Calendar attachments
         if self.calendar_client:
-            tasks.append(self._gather_calendar_attachments(
+            tasks.append(self._tag("calendar", self._gather_calendar_attachments(
                 meeting,
                 include_documents,
-            ))
+            )))
 
-        # Execute all gathering tasks
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Execute all gathering tasks; their tasks inherit the failure list
+        failures: list[str] = []
+        failures_scope = _source_failures.set(failures)
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            _source_failures.reset(failures_scope)
 
         # Process results
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
+        for result in results:
+            if isinstance(result, BaseException):
                 context.errors.append(f"Gathering error: {result}")
                 logger.error(f"Context gathering error: {result}")
-            elif isinstance(result, list):
-                if tasks and i < len(tasks):
-                    task_name = tasks[i].__name__ if hasattr(tasks[i], '__name__') else str(i)
-
-                    # Determine result type by content
-                    if result and isinstance(result[0], EnrichedEmail):
-                        context.emails = result
-                        context.total_emails = len(result)
-                    elif result and isinstance(result[0], EnrichedSlackMessage):
-                        context.slack_messages = result
-                        context.total_slack_messages = len(result)
-                    elif result and isinstance(result[0], CalendarAttachment):
-                        context.calendar_attachments = result
-
-        # Count total documents
-        context.total_documents = len(context.get_all_extracted_documents())
+                continue
+
+            source, items = result
+            match source:
+                case "emails":
+                    context.emails = items
+                case "slack":
+                    context.slack_messages = items
+                case "calendar":
+                    context.calendar_attachments = items
+
+        # Count everything, then drop what the caller won't use
+        context.cap(max_emails, max_slack_messages)
+
+        # Only cache complete results so a transient failure isn't replayed
+        if cache_key and not context.errors and not failures:
+            self._store_cached_context(cache_key, context)
 
         return context
 
+    def _context_cache_key(
+        self,
+        meeting: Meeting,
+        days_back: int,
+        include_documents: bool,
+        max_emails: Optional[int] = None,
+        max_slack_messages: Optional[int] = None,
+    ) -> Optional[str]:
+        """Content-address a gather request; edits to the meeting change the key."""
+        if not self.user_id:
+            return None
+
+        raw = "|".join((
+            self.user_id,
+            meeting.model_dump_json(),
+            str(days_back),
+            str(include_documents),
+            str(self.internal_domain),
+            str(bool(self.gmail_client)),
+            str(bool(self.slack_client)),
+            str(bool(self.calendar_client)),
+            str(bool(self.drive_credentials)),
+            str(max_emails),
+            str(max_slack_messages),
+        ))
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def _store_cached_context(self, key: str, context: MeetingContext) -> None:
+        """Store a context, evicting expired and then oldest entries when full."""
+        cache = self._context_cache
+        if len(cache) >= self.CONTEXT_CACHE_MAX_ENTRIES:
+            now = time.monotonic()
+            for stale_key in [k for k, (ts, _) in cache.items() if now - ts >= self.CONTEXT_CACHE_TTL]:
+                del cache[stale_key]
+            while len(cache) >= self.CONTEXT_CACHE_MAX_ENTRIES:
+                del cache[next(iter(cache))]
+        cache[key] = (time.monotonic(), context)
+
+    async def prefetch_calendar_events(self, meetings: list[Meeting]) -> None:
+        """
+        Fetch the calendar events for several meetings in batched requests.
+
+        Later gather_meeting_context calls for these meetings reuse the
+        prefetched events instead of issuing one events.get each.
+        """
+        if not self.calendar_client:
+            return
+
+        service = self.calendar_client.service
+        event_ids = [m.id for m in meetings if m.id not in self._calendar_events]
+
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"Error prefetching calendar event {request_id}: {exception}")
+            else:
+                self._calendar_events[request_id] = response
+
+        for i in range(0, len(event_ids), self.CALENDAR_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            for event_id in event_ids[i:i + self.CALENDAR_BATCH_SIZE]:
+                batch.add(
+                    service.events().get(calendarId="primary", eventId=event_id),
+                    request_id=event_id,
+                )
+            try:
+                await asyncio.to_thread(batch.execute)
+            except Exception as e:
+                logger.error(f"Error executing calendar batch: {e}")
+
+    async def aclose(self) -> None:
+        """Release pooled connections held by the integration clients."""
+        if self.slack_client:
+            await self.slack_client.aclose()
+        await self.document_processor.aclose()
+
+    async def _map_bounded(self, func, items: list, return_exceptions: bool = False) -> list:
+        """
+        Apply async `func` to each item using a fixed pool of queue workers.
+
+        Unlike gathering one task per item, at most MAX_CONCURRENT_DOWNLOADS
+        items are in flight, so a user with hundreds of files doesn't spawn
+        hundreds of concurrent requests. Results keep the input order; with
+        return_exceptions, failures are returned in place as in asyncio.gather.
+        """
+        results = [None] * len(items)
+        queue: asyncio.Queue = asyncio.Queue()
+        for index, item in enumerate(items):
+            queue.put_nowait((index, item))
+
+        async def worker():
+            # Everything is enqueued up front, so an empty queue means done
+            while not queue.empty():
+                index, item = queue.get_nowait()
+                try:
+                    results[index] = await func(item)
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results[index] = e
+
+        await asyncio.gather(*(worker() for _ in range(min(self.MAX_CONCURRENT_DOWNLOADS, len(items)))))
+        return results
+
+    @staticmethod
+    async def _bounded(coro, timeout: float, label: str):
+        """Await `coro` with a timeout; log and return None if it expires."""
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out after {timeout}s: {label}")
+            return None
+
+    @staticmethod
+    async def _tag(source: str, coro) -> tuple[str, list]:
+        """Await a gathering coroutine and label its result with the source name."""
+        return source, await coro
+
     def _identify_external_attendees(self, attendees: list[Attendee]) -> list[str]:
         """Identify attendees with external (non-company) email domains."""
         if not self.internal_domain:
@@ -327,7 +554,7 @@ class ContextGatherer:
                 )
                 all_emails.extend(emails)
             except Exception as e:
-                logger.error(f"Error gathering emails for {attendee.email}: {e}")
+                _record_source_failure(f"Error gathering emails for {attendee.email}: {e}")
 
         # Deduplicate by email ID
         seen_ids = set()
@@ -388,7 +615,7 @@ class ContextGatherer:
                     logger.error(f"Error parsing email {msg_info['id']}: {e}")
 
         except Exception as e:
-            logger.error(f"Error searching emails: {e}")
+            _record_source_failure(f"Error searching emails: {e}")
 
         return enriched_emails
 
@@ -399,7 +626,7 @@ class ContextGatherer:
     ) -> Optional[EnrichedEmail]:
         """Parse a Gmail message into EnrichedEmail."""
         try:
-            headers = {h["name"]: h["value"] for h in message.get("payload", {}).get("headers", [])}
+            headers = parse_headers(message.get("payload", {}).get("headers", []))
 
             # Parse date
             date_str = headers.get("Date", "")
@@ -422,7 +649,7 @@ class ContextGatherer:
                     recipients.append(addr)
 
             # Extract body
-            body_text, body_html = self._extract_email_body(message.get("payload", {}))
+            body_text, body_html = await self._extract_email_body(message.get("payload", {}))
 
             # Extract attachments
             attachments = []
@@ -450,25 +677,11 @@ class ContextGatherer:
             logger.error(f"Error parsing email message: {e}")
             return None
 
-    def _extract_email_body(self, payload: dict) -> tuple[str, Optional[str]]:
+    async def _extract_email_body(self, payload: dict) -> tuple[str, Optional[str]]:
         """Extract plain text and HTML body from email payload."""
         body_text = ""
         body_html = None
 
-        def extract_parts(parts):
-            nonlocal body_text, body_html
-
-            for part in parts:
-                mime_type = part.get("mimeType", "")
-                body_data = part.get("body", {}).get("data")
-
-                if mime_type == "text/plain" and body_data:
-                    body_text = base64.urlsafe_b64decode(body_data).decode("utf-8", errors="ignore")
-                elif mime_type == "text/html" and body_data:
-                    body_html = base64.urlsafe_b64decode(body_data).decode("utf-8", errors="ignore")
-                elif "parts" in part:
-                    extract_parts(part["parts"])
-
         # Handle single-part messages
         if payload.get("body", {}).get("data"):
             mime_type = payload.get("mimeType", "")
@@ -477,14 +690,32 @@ class ContextGatherer:
 
             if mime_type == "text/html":
                 body_html = decoded
-                # Strip HTML tags for plain text
-                body_text = re.sub(r'<[^>]+>', '', decoded)
+                # Strip HTML tags for plain text; large newsletters/reports
+                # are regex-heavy, so keep them off the event loop
+                if len(decoded) >= _HTML_OFFLOAD_MIN_CHARS:
+                    body_text = await run_in_process_pool(_html_to_text, decoded)
+                else:
+                    body_text = _html_to_text(decoded)
             else:
                 body_text = decoded
 
-        # Handle multi-part messages
-        if "parts" in payload:
-            extract_parts(payload["parts"])
+        # Handle multi-part messages: walk the MIME tree depth-first in
+        # document order, keeping the first body of each type and stopping
+        # once both are found
+        stack = list(reversed(payload.get("parts", [])))
+        while stack and not (body_text and body_html is not None):
+            part = stack.pop()
+            mime_type = part.get("mimeType", "")
+            body_data = part.get("body", {}).get("data")
+
+            if mime_type == "text/plain" and body_data:
+                if not body_text:
+                    body_text = base64.urlsafe_b64decode(body_data).decode("utf-8", errors="ignore")
+            elif mime_type == "text/html" and body_data:
+                if body_html is None:
+                    body_html = base64.urlsafe_b64decode(body_data).decode("utf-8", errors="ignore")
+            elif "parts" in part:
+                stack.extend(reversed(part["parts"]))
 
         return body_text, body_html
 
@@ -515,28 +746,39 @@ class ContextGatherer:
         # Download and process attachments
         processed_attachments = []
         for att_info in attachments[:5]:  # Limit to 5 attachments
-            try:
-                # Download attachment
-                attachment = service.users().messages().attachments().get(
-                    userId="me",
-                    messageId=message_id,
-                    id=att_info["attachment_id"],
-                ).execute()
+            # Skip the download entirely when the reported size can't be extracted
+            if not self.document_processor.is_extractable_size(att_info["size"]):
+                logger.info(f"Skipping oversized attachment {att_info['filename']} ({att_info['size']} bytes)")
+                processed_attachments.append(EmailAttachment(
+                    filename=att_info["filename"],
+                    mime_type=att_info["mime_type"],
+                    size=att_info["size"],
+                ))
+                continue
 
-                content = base64.urlsafe_b64decode(attachment["data"])
+            try:
+                # Download attachment; decode straight out of the response so
+                # the base64 copy is released before extraction runs
+                content = base64.urlsafe_b64decode(
+                    service.users().messages().attachments().get(
+                        userId="me",
+                        messageId=message_id,
+                        id=att_info["attachment_id"],
+                    ).execute()["data"]
+                )
 
-                # Extract text
+                # Extract text, then drop the bytes for the next download
                 extracted = await self.document_processor.extract_from_bytes(
                     content,
                     att_info["filename"],
                     att_info["mime_type"],
                 )
+                del content
 
                 processed_attachments.append(EmailAttachment(
                     filename=att_info["filename"],
                     mime_type=att_info["mime_type"],
                     size=att_info["size"],
-                    content=content,
                     extracted_text=extracted.text_content if extracted.success else None,
                 ))
 
@@ -570,7 +812,7 @@ class ContextGatherer:
                 )
                 all_messages.extend(messages)
             except Exception as e:
-                logger.error(f"Error gathering Slack messages for {attendee.email}: {e}")
+                _record_source_failure(f"Error gathering Slack messages for {attendee.email}: {e}")
 
             # Also get DMs with this person (conversations.history includes files properly)
             try:
@@ -581,7 +823,7 @@ class ContextGatherer:
                 )
                 all_messages.extend(dm_messages)
             except Exception as e:
-                logger.error(f"Error getting DMs with {attendee.email}: {e}")
+                _record_source_failure(f"Error getting DMs with {attendee.email}: {e}")
 
         # Also search by meeting title keywords if provided
         if meeting_title:
@@ -593,7 +835,7 @@ class ContextGatherer:
                 )
                 all_messages.extend(title_messages)
             except Exception as e:
-                logger.error(f"Error searching Slack by title keywords: {e}")
+                _record_source_failure(f"Error searching Slack by title keywords: {e}")
 
         # Also fetch recent files separately (search API doesn't always return files)
         if include_documents:
@@ -601,7 +843,7 @@ class ContextGatherer:
                 file_messages = await self._gather_slack_files(attendees, days_back)
                 all_messages.extend(file_messages)
             except Exception as e:
-                logger.error(f"Error gathering Slack files: {e}")
+                _record_source_failure(f"Error gathering Slack files: {e}")
 
         # Deduplicate by timestamp
         seen_ts = set()
@@ -660,7 +902,7 @@ class ContextGatherer:
                         logger.error(f"Error parsing Slack message: {e}")
 
             except Exception as e:
-                logger.error(f"Error searching Slack for keyword '{keyword}': {e}")
+                _record_source_failure(f"Error searching Slack for keyword '{keyword}': {e}")
 
         return enriched_messages
 
@@ -678,15 +920,14 @@ class ContextGatherer:
         enriched_messages = []
         client = self.slack_client.client
 
-        # Try to find user by email
+        # Try to find user by email (cached across the Slack paths)
         user_id = None
         user_email = email
-        try:
-            response = client.users_lookupByEmail(email=email)
-            user = response.get("user", {})
+        user = self.slack_client.lookup_user_by_email(email)
+        if user:
             user_id = user.get("id")
             name = name or user.get("real_name", user.get("name"))
-        except Exception:
+        else:
             # If email lookup fails, try to extract name from email
             if not name:
                 # Extract potential name from email (e.g., "john.doe@..." -> "John Doe")
@@ -737,7 +978,7 @@ class ContextGatherer:
                         logger.error(f"Error parsing Slack message: {e}")
 
             except Exception as e:
-                logger.error(f"Error searching Slack for '{query}': {e}")
+                _record_source_failure(f"Error searching Slack for '{query}': {e}")
 
         return enriched_messages
 
@@ -749,11 +990,7 @@ class ContextGatherer:
         """Parse a Slack search match into EnrichedSlackMessage."""
         try:
             channel_info = match.get("channel", {})
-            channel_type = "channel"
-            if channel_info.get("is_im"):
-                channel_type = "dm"
-            elif channel_info.get("is_private") or channel_info.get("is_mpim"):
-                channel_type = "group"
+            channel_type = self.slack_client.channel_type(channel_info)
 
             # Extract files
             files = []
@@ -779,55 +1016,7 @@ class ContextGatherer:
 
     async def _extract_slack_files(self, files: list[dict]) -> list[SlackFile]:
         """Extract and process Slack files."""
-        processed_files = []
-
-        for file_info in files[:5]:  # Limit to 5 files
-            try:
-                slack_file = SlackFile(
-                    id=file_info.get("id", ""),
-                    name=file_info.get("name", "unknown"),
-                    filetype=file_info.get("filetype", ""),
-                    url_private=file_info.get("url_private", ""),
-                    size=file_info.get("size", 0),
-                    shared_by=file_info.get("user", ""),
-                    timestamp=str(file_info.get("timestamp", "")),
-                )
-
-                # Download file if URL available
-                if slack_file.url_private:
-                    try:
-                        import httpx
-
-                        async with httpx.AsyncClient() as http_client:
-                            response = await http_client.get(
-                                slack_file.url_private,
-                                headers={
-                                    "Authorization": f"Bearer {self.slack_client.client.token}",
-                                },
-                                timeout=30,
-                            )
-
-                            if response.status_code == 200:
-                                content = response.content
-                                slack_file.content = content
-
-                                # Extract text
-                                extracted = await self.document_processor.extract_from_bytes(
-                                    content,
-                                    slack_file.name,
-                                )
-                                if extracted.success:
-                                    slack_file.extracted_text = extracted.text_content
-
-                    except Exception as e:
-                        logger.error(f"Error downloading Slack file {slack_file.name}: {e}")
-
-                processed_files.append(slack_file)
-
-            except Exception as e:
-                logger.error(f"Error processing Slack file: {e}")
-
-        return processed_files
+        return await self._map_bounded(self._fetch_slack_file, files[:5])  # Limit to 5 files
 
     async def _get_direct_messages_with_files(
         self,
@@ -842,66 +1031,57 @@ class ContextGatherer:
         if not self.slack_client:
             return []
 
-        enriched_messages = []
-
         try:
             # Use the slack client's get_direct_messages method
             dm_messages = self.slack_client.get_direct_messages(
                 user_email=email,
                 limit=50,
                 days_back=days_back,
+                raise_errors=True,
             )
+        except Exception as e:
+            _record_source_failure(f"Error getting DMs with {email}: {e}")
+            return []
 
-            for msg in dm_messages:
-                files = []
-                if include_documents and msg.get("files"):
-                    for file_info in msg["files"][:5]:
-                        slack_file = SlackFile(
-                            id=file_info.get("id", ""),
-                            name=file_info.get("name", "unknown"),
-                            filetype=file_info.get("filetype", ""),
-                            url_private=file_info.get("url_private", ""),
-                            size=file_info.get("size", 0),
-                            shared_by=file_info.get("user", ""),
-                            timestamp=str(file_info.get("timestamp", "")),
-                        )
-
-                        # Download and extract file
-                        if slack_file.url_private:
-                            try:
-                                content = await self.slack_client.download_file(slack_file.url_private)
-                                if content:
-                                    slack_file.content = content
-                                    extracted = await self.document_processor.extract_from_bytes(
-                                        content,
-                                        slack_file.name,
-                                    )
-                                    if extracted.success:
-                                        slack_file.extracted_text = extracted.text_content
-                                        logger.info(f"Successfully extracted text from Slack file: {slack_file.name}")
-                            except Exception as e:
-                                logger.error(f"Error downloading Slack DM file {slack_file.name}: {e}")
-
-                        files.append(slack_file)
-
-                enriched_messages.append(EnrichedSlackMessage(
-                    text=msg.get("text", ""),
-                    user=msg.get("user", "Unknown"),
-                    user_email=email,
-                    channel=msg.get("channel", "direct-message"),
-                    channel_type="dm",
-                    timestamp=msg.get("timestamp", ""),
-                    thread_ts=msg.get("thread_ts"),
-                    files=files,
-                    reactions=[],
-                    is_thread_reply=False,
-                ))
+        results = await self._map_bounded(
+            lambda msg: self._enrich_dm_message(msg, email, include_documents),
+            dm_messages,
+            return_exceptions=True,
+        )
 
-        except Exception as e:
-            logger.error(f"Error getting DMs with {email}: {e}")
+        enriched_messages = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.error(f"Error processing DM with {email}: {result}")
+            else:
+                enriched_messages.append(result)
 
         return enriched_messages
 
+    async def _enrich_dm_message(
+        self,
+        msg: dict,
+        email: str,
+        include_documents: bool,
+    ) -> EnrichedSlackMessage:
+        """Convert a DM dict, downloading its files (up to 5) concurrently."""
+        files = []
+        if include_documents and msg.get("files"):
+            files = await self._map_bounded(self._fetch_slack_file, msg["files"][:5])
+
+        return EnrichedSlackMessage(
+            text=msg.get("text", ""),
+            user=msg.get("user", "Unknown"),
+            user_email=email,
+            channel=msg.get("channel", "direct-message"),
+            channel_type="dm",
+            timestamp=msg.get("timestamp", ""),
+            thread_ts=msg.get("thread_ts"),
+            files=files,
+            reactions=[],
+            is_thread_reply=False,
+        )
+
     async def _gather_slack_files(
         self,
         attendees: list[Attendee],
@@ -914,67 +1094,202 @@ class ContextGatherer:
         if not self.slack_client:
             return []
 
-        enriched_messages = []
+        # Shared across attendees; check-and-add never spans an await, so
+        # concurrent attendee tasks can't both claim the same file
         seen_file_ids = set()
 
-        for attendee in attendees:
+        results = await asyncio.gather(
+            *(self._gather_attendee_slack_files(attendee, days_back, seen_file_ids) for attendee in attendees),
+            return_exceptions=True,
+        )
+
+        enriched_messages = []
+        for attendee, result in zip(attendees, results):
+            if isinstance(result, BaseException):
+                _record_source_failure(f"Error listing files for {attendee.email}: {result}")
+            else:
+                enriched_messages.extend(result)
+
+        return enriched_messages
+
+    async def _gather_attendee_slack_files(
+        self,
+        attendee: Attendee,
+        days_back: int,
+        seen_file_ids: set,
+    ) -> list[EnrichedSlackMessage]:
+        """List one attendee's recent files and download them concurrently."""
+        # List files shared by this user (blocking SDK call)
+        files = await asyncio.to_thread(
+            self.slack_client.list_files,
+            user_email=attendee.email,
+            days_back=days_back,
+            max_files=10,
+            raise_errors=True,
+        )
+
+        # Skip files already claimed by another attendee (or listed twice)
+        new_files = []
+        for file_info in files:
+            file_id = file_info.get("id")
+            if file_id not in seen_file_ids:
+                seen_file_ids.add(file_id)
+                new_files.append(file_info)
+
+        slack_files = await self._map_bounded(self._fetch_slack_file, new_files)
+
+        # Create a synthetic message for each file
+        display_name = attendee.name or attendee.email.split('@')[0]
+        fallback_ts = str(time.time())
+        return [
+            EnrichedSlackMessage(
+                text=f"[Shared file: {slack_file.name}]",
+                user=display_name,
+                user_email=attendee.email,
+                channel="file-share",
+                channel_type="channel",
+                timestamp=slack_file.timestamp or fallback_ts,
+                files=[slack_file],
+                reactions=[],
+                is_thread_reply=False,
+            )
+            for slack_file in slack_files
+        ]
+
+    async def _fetch_slack_file(self, file_info: dict) -> SlackFile:
+        """Build a SlackFile and download/extract it, bounded by the download semaphore."""
+        slack_file = SlackFile(
+            id=file_info.get("id", ""),
+            name=file_info.get("name", "unknown"),
+            filetype=file_info.get("filetype", ""),
+            url_private=file_info.get("url_private", "") or file_info.get("url_private_download", ""),
+            size=file_info.get("size", 0),
+            shared_by=file_info.get("user", ""),
+            timestamp=str(file_info.get("timestamp", "")),
+        )
+
+        # Download and extract file
+        if slack_file.url_private and self._worth_extracting(slack_file):
             try:
-                # List files shared by this user
-                files = self.slack_client.list_files(
-                    user_email=attendee.email,
-                    days_back=days_back,
-                    max_files=10,
+                slack_file.extracted_text = await self._get_or_extract(
+                    ("slack", slack_file.id or slack_file.url_private),
+                    lambda: self._download_and_extract_slack_file(slack_file),
                 )
+            except Exception as e:
+                logger.error(f"Error downloading Slack file {slack_file.name}: {e}")
 
-                for file_info in files:
-                    # Skip if already processed
-                    if file_info.get("id") in seen_file_ids:
-                        continue
-                    seen_file_ids.add(file_info.get("id"))
-
-                    slack_file = SlackFile(
-                        id=file_info.get("id", ""),
-                        name=file_info.get("name", "unknown"),
-                        filetype=file_info.get("filetype", ""),
-                        url_private=file_info.get("url_private", "") or file_info.get("url_private_download", ""),
-                        size=file_info.get("size", 0),
-                        shared_by=file_info.get("user", ""),
-                        timestamp=str(file_info.get("timestamp", "")),
-                    )
+        return slack_file
 
-                    # Download and extract file
-                    if slack_file.url_private:
-                        try:
-                            content = await self.slack_client.download_file(slack_file.url_private)
-                            if content:
-                                slack_file.content = content
-                                extracted = await self.document_processor.extract_from_bytes(
-                                    content,
-                                    slack_file.name,
-                                )
-                                if extracted.success:
-                                    slack_file.extracted_text = extracted.text_content
-                                    logger.info(f"Successfully extracted text from Slack file (via files.list): {slack_file.name}")
-                        except Exception as e:
-                            logger.error(f"Error downloading Slack file {slack_file.name}: {e}")
-
-                    # Create a synthetic message for this file
-                    enriched_messages.append(EnrichedSlackMessage(
-                        text=f"[Shared file: {slack_file.name}]",
-                        user=attendee.name or attendee.email.split('@')[0],
-                        user_email=attendee.email,
-                        channel="file-share",
-                        channel_type="channel",
-                        timestamp=slack_file.timestamp or str(datetime.utcnow().timestamp()),
-                        files=[slack_file],
-                        reactions=[],
-                        is_thread_reply=False,
-                    ))
+    def _worth_extracting(self, slack_file: SlackFile) -> bool:
+        """
+        Size-gate Slack files before downloading.
 
-            except Exception as e:
-                logger.error(f"Error listing files for {attendee.email}: {e}")
+        Text files are always cheap to decode. Other formats are skipped when
+        too small to hold real content or too large to parse in reasonable time.
+        """
+        if slack_file.filetype in self.PLAIN_TEXT_FILETYPES:
+            return self.document_processor.is_extractable_size(slack_file.size)
+        if slack_file.size and slack_file.size < self.MIN_EXTRACT_BYTES:
+            return False
+        return slack_file.size <= self.MAX_EXTRACT_BYTES
+
+    async def _download_and_extract_slack_file(self, slack_file: SlackFile) -> Optional[str]:
+        """Download a Slack file and return its extracted text, if any."""
+        async with self._download_semaphore:
+            content = await self._bounded(
+                self.slack_client.download_file(
+                    slack_file.url_private,
+                    expected_size=slack_file.size,
+                    max_bytes=self.MAX_EXTRACT_BYTES,
+                ),
+                self.FILE_DOWNLOAD_TIMEOUT,
+                f"download of Slack file {slack_file.name}",
+            )
+        if not content:
+            return None
 
-        return enriched_messages
+        # Plain text needs no parser; decode directly
+        if slack_file.filetype in self.PLAIN_TEXT_FILETYPES:
+            return content.decode("utf-8", errors="replace")
+
+        extracted = await self._bounded(
+            self.document_processor.extract_from_bytes(content, slack_file.name),
+            self.FILE_EXTRACT_TIMEOUT,
+            f"extraction of Slack file {slack_file.name}",
+        )
+        if not extracted or not extracted.success:
+            return None
+
+        logger.info(f"Successfully extracted text from Slack file: {slack_file.name}")
+        return extracted.text_content
+
+    async def _download_and_extract_drive_file(
+        self,
+        file_id: str,
+        filename: Optional[str] = None,
+        mime_type: Optional[str] = None,
+    ) -> Optional[str]:
+        """Download a Drive file and return its extracted text, if any."""
+        content, filename, mime_type = await self.document_processor.download_drive_file(
+            file_id, filename, mime_type,
+        )
+
+        extracted = await self.document_processor.extract_from_bytes(
+            content,
+            filename,
+            mime_type,
+        )
+        return extracted.text_content if extracted.success else None
+
+    async def _get_or_extract(self, file_key: tuple[str, str], extract) -> Optional[str]:
+        """
+        Return cached extracted text for a file, or run `extract` and cache it.
+
+        Concurrent requests for the same file (e.g. one Drive doc attached to
+        several meetings) share a single in-flight future, so the file is
+        downloaded and extracted once and every caller gets the same result,
+        including a failure. Only successful extractions are cached.
+        Without a user_id there's no owner to key on, so nothing is shared.
+        """
+        if self.user_id is None:
+            return await extract()
+
+        key = (self.user_id, *file_key)
+        cache = self._extraction_cache
+
+        entry = cache.get(key)
+        if entry and time.monotonic() - entry[0] < self.EXTRACTION_CACHE_TTL:
+            return entry[1]
+
+        in_flight = self._extraction_in_flight.get(key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._extraction_in_flight[key] = future
+        try:
+            text = await extract()
+        except asyncio.CancelledError:
+            # Waiters belong to other requests; fail them with an ordinary
+            # error their own handlers catch instead of cancelling them too
+            self._extraction_in_flight.pop(key, None)
+            future.set_exception(RuntimeError(f"Extraction of {file_key[1]} was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure isn't logged as such
+            future.exception()
+            raise
+        else:
+            future.set_result(text)
+            if text is not None:
+                if len(cache) >= self.EXTRACTION_CACHE_MAX_ENTRIES:
+                    del cache[next(iter(cache))]
+                cache[key] = (time.monotonic(), text)
+            return text
+        finally:
+            self._extraction_in_flight.pop(key, None)
 
     async def _gather_calendar_attachments(
         self,
@@ -989,66 +1304,224 @@ class ContextGatherer:
         service = self.calendar_client.service
 
         try:
-            # Get event with attachments
-            event = service.events().get(
-                calendarId="primary",
-                eventId=meeting.id,
-            ).execute()
+            # Get event with attachments (may already be batch-prefetched)
+            event = self._calendar_events.get(meeting.id)
+            if event is None:
+                event = service.events().get(
+                    calendarId="primary",
+                    eventId=meeting.id,
+                ).execute()
 
-            event_attachments = event.get("attachments", [])
+            event_attachments = event.get("attachments", [])[:10]  # Limit to 10 attachments
 
-            for att in event_attachments[:10]:  # Limit to 10 attachments
-                try:
-                    cal_attachment = CalendarAttachment(
-                        file_id=att.get("fileId", ""),
-                        filename=att.get("title", "unknown"),
-                        mime_type=att.get("mimeType", ""),
-                        icon_link=att.get("iconLink"),
-                    )
+            # Run attachments through the worker pool so one file's download
+            # overlaps another's extraction instead of alternating between them
+            results = await self._map_bounded(
+                lambda att: self._fetch_calendar_attachment(att, include_documents),
+                event_attachments,
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    logger.error(f"Error processing calendar attachment: {result}")
+                else:
+                    attachments.append(result)
 
-                    # Download and extract if it's a Drive file
-                    if include_documents and cal_attachment.file_id and self.drive_credentials:
-                        try:
-                            content, filename, mime_type = await self.document_processor.download_drive_file(
-                                cal_attachment.file_id,
-                            )
-                            cal_attachment.content = content
+        except Exception as e:
+            _record_source_failure(f"Error getting calendar event attachments: {e}")
 
-                            extracted = await self.document_processor.extract_from_bytes(
-                                content,
-                                filename,
-                                mime_type,
-                            )
-                            if extracted.success:
-                                cal_attachment.extracted_text = extracted.text_content
+        return attachments
 
-                        except Exception as e:
-                            logger.error(f"Error downloading calendar attachment: {e}")
+    async def _fetch_calendar_attachment(self, att: dict, include_documents: bool) -> CalendarAttachment:
+        """Build a CalendarAttachment and download/extract it if it's a Drive file."""
+        cal_attachment = CalendarAttachment(
+            file_id=att.get("fileId", ""),
+            filename=att.get("title", "unknown"),
+            mime_type=att.get("mimeType", ""),
+            icon_link=att.get("iconLink"),
+        )
 
-                    attachments.append(cal_attachment)
+        # Download and extract if it's a Drive file
+        if include_documents and cal_attachment.file_id and self.drive_credentials:
+            try:
+                cal_attachment.extracted_text = await self._get_or_extract(
+                    ("drive", cal_attachment.file_id),
+                    # The event already names the file and its type, so
+                    # regular files skip Drive's metadata lookup
+                    lambda: self._download_and_extract_drive_file(
+                        cal_attachment.file_id,
+                        att.get("title"),
+                        att.get("mimeType"),
+                    ),
+                )
+            except Exception as e:
+                logger.error(f"Error downloading calendar attachment: {e}")
 
-                except Exception as e:
-                    logger.error(f"Error processing calendar attachment: {e}")
+        return cal_attachment
 
-        except Exception as e:
-            logger.error(f"Error getting calendar event attachments: {e}")
 
-        return attachments
+# ========== Demo Context Gatherer ==========
 
+_DEMO_INTERNAL_SUFFIX = "@company.com"
+
+# Demo document/email text, built once at import rather than per call
+
+_DEMO_BUDGET_EMAIL_BODY = """Hi,
+
+I've completed the Q4 budget analysis. Key findings:
+
+- Total projected revenue: $2.4M (down 8% from Q3)
+- Marketing spend needs to increase by 15% to hit targets
+- Engineering headcount request: 3 FTEs
+- Infrastructure costs trending 20% over budget
+
+The attached spreadsheet has the full breakdown. We should discuss the revenue decline in our meeting - it's concerning given our growth targets.
+
+Can you review before our meeting?
+
+Best,
+Sarah"""
+
+_DEMO_BUDGET_XLSX_TEXT = """Q4 Budget Analysis
+=== Revenue Projections ===
+Month | Projected | Actual | Variance
+Oct | $800,000 | $720,000 | -10%
+Nov | $850,000 | $790,000 | -7%
+Dec | $900,000 | TBD | TBD
+
+=== Department Budgets ===
+Engineering | $450,000 | Headcount: 12 -> 15 requested
+Marketing | $200,000 | Increase needed for Q4 push
+Sales | $180,000 | On track
+Infrastructure | $120,000 | 20% over due to cloud costs
+
+KEY CONCERNS:
+- Revenue trending 8% below Q3
+- Cloud infrastructure costs up 35% YoY
+- Marketing ROI needs improvement"""
+
+_DEMO_HEALTH_EMAIL_BODY = """Hey,
+
+Just wanted to give you a heads up - I've been dealing with some back issues this week and might need to take it easy. Still planning to be in the meeting but might need to keep it shorter if that's okay.
+
+Also, I finished the code review you asked about. Left some comments on the PR.
+
+Thanks for understanding,
+Tom"""
+
+_DEMO_VENDOR_EMAIL_BODY = """Hi,
+
+Looking forward to our demo next week. I've attached our standard requirements checklist and a brief overview of our platform capabilities.
+
+For the demo, I'll cover:
+1. Real-time analytics dashboard
+2. Custom report builder
+3. API integration options
+4. Security & compliance features
+
+Please let me know if there are specific features you'd like me to focus on.
+
+Best regards,
+John Smith
+Senior Solutions Engineer
+Analytics Platform Inc."""
+
+_DEMO_VENDOR_OVERVIEW_PDF_TEXT = """Analytics Platform - Enterprise Overview
+
+PLATFORM CAPABILITIES:
+- Real-time data processing: Up to 1M events/second
+- Custom dashboards with 50+ visualization types
+- Machine learning insights and anomaly detection
+- SOC2 Type II and HIPAA compliant
+
+PRICING TIERS:
+- Starter: $500/month (up to 10 users)
+- Professional: $2,000/month (up to 50 users)
+- Enterprise: Custom pricing
+
+INTEGRATION OPTIONS:
+- REST API with full documentation
+- Native connectors for Salesforce, HubSpot, Segment
+- Webhook support for real-time alerts
+- SSO via SAML 2.0 and OAuth 2.0
+
+IMPLEMENTATION TIMELINE:
+- Basic setup: 1-2 weeks
+- Full integration: 4-6 weeks
+- Custom development: 8-12 weeks"""
+
+_DEMO_FOLLOWUP_EMAIL_TEMPLATE = """Hi,
+
+Quick question before our meeting - did you get a chance to review the proposal I sent last week? I haven't heard back and want to make sure we're aligned before discussing with the broader team.
+
+Also, I noticed the deadline for the roadmap doc is coming up. Can we add that to our agenda?
+
+Thanks,
+{attendee_name}"""
+
+_DEMO_API_DOCS_TEXT = """# API Documentation v2.0
+
+## Authentication
+All API requests require Bearer token authentication.
+
+## Endpoints
+
+### GET /api/v2/users
+Returns list of users with pagination.
+
+### POST /api/v2/analytics/events
+Submit analytics events in batch.
+- Max batch size: 1000 events
+- Rate limit: 10,000 events/minute
+
+## Breaking Changes from v1
+- Removed deprecated /api/v1/legacy endpoint
+- Changed date format to ISO 8601
+- Added required 'source' field to events"""
+
+_DEMO_ROADMAP_PDF_TEXT = """Q4 2024 Product Roadmap
+
+PRIORITY 1 - MUST SHIP:
+- User authentication overhaul (Oct 15)
+- Mobile app v2.0 launch (Nov 1)
+- Holiday readiness optimizations (Nov 15)
+
+PRIORITY 2 - SHOULD SHIP:
+- Analytics dashboard redesign
+- API rate limiting improvements
+- Customer portal enhancements
+
+KEY MILESTONES:
+- Oct 1: Feature freeze for mobile v2.0
+- Oct 15: Auth system go-live
+- Nov 1: Mobile launch (App Store + Play Store)
+- Dec 1: Year-end code freeze
+
+RISKS:
+- Mobile app approval process may delay launch
+- Auth migration requires 2-hour downtime window
+- Team capacity reduced due to PTO in December
+
+RESOURCE ALLOCATION:
+- Mobile team: 5 engineers (full-time)
+- Backend team: 3 engineers (50% on auth)
+- QA team: 2 engineers (shared)"""
 
-# ========== Demo Context Gatherer ==========
 
 class DemoContextGatherer:
     """Generate demo context for testing without real API connections."""
 
     def __init__(self, internal_domain: str = "company.com"):
         self.internal_domain = internal_domain
+        self._internal_suffix = f"@{internal_domain}"
 
     async def gather_meeting_context(
         self,
         meeting: Meeting,
         days_back: int = 14,
         include_documents: bool = True,
+        max_emails: Optional[int] = None,
+        max_slack_messages: Optional[int] = None,
     ) -> MeetingContext:
         """Generate demo meeting context."""
         context = MeetingContext(
@@ -1059,22 +1532,20 @@ class DemoContextGatherer:
         # Identify external attendees
         context.external_attendees = [
             a.email for a in meeting.attendees
-            if not a.email.endswith(f"@{self.internal_domain}")
+            if not a.email.endswith(self._internal_suffix)
         ]
 
         # Generate demo emails
         context.emails = self._generate_demo_emails(meeting)
-        context.total_emails = len(context.emails)
 
         # Generate demo Slack messages
         context.slack_messages = self._generate_demo_slack_messages(meeting)
-        context.total_slack_messages = len(context.slack_messages)
 
         # Generate demo attachments for specific meetings
         if "Q4" in meeting.title or "Budget" in meeting.title:
             context.calendar_attachments = self._generate_demo_calendar_attachments()
 
-        context.total_documents = len(context.get_all_extracted_documents())
+        context.cap(max_emails, max_slack_messages)
 
         return context
 
@@ -1082,6 +1553,7 @@ class DemoContextGatherer:
         """Generate demo emails based on meeting context."""
         emails = []
         now = datetime.utcnow()
+        first_attendee_email = meeting.attendees[0].email if meeting.attendees else None
 
         # Email templates based on meeting type
         if "Q4" in meeting.title or "Planning" in meeting.title:
@@ -1089,74 +1561,37 @@ class DemoContextGatherer:
                 id="demo-email-budget-1",
                 thread_id="thread-1",
                 subject="Q4 Budget Analysis - Action Required",
-                sender=meeting.attendees[0].email if meeting.attendees else "sarah@company.com",
+                sender=first_attendee_email or "sarah@company.com",
                 recipients=["you@company.com"],
                 date=now - timedelta(days=2),
-                body_text="""Hi,
-
-I've completed the Q4 budget analysis. Key findings:
-
-- Total projected revenue: $2.4M (down 8% from Q3)
-- Marketing spend needs to increase by 15% to hit targets
-- Engineering headcount request: 3 FTEs
-- Infrastructure costs trending 20% over budget
-
-The attached spreadsheet has the full breakdown. We should discuss the revenue decline in our meeting - it's concerning given our growth targets.
-
-Can you review before our meeting?
-
-Best,
-Sarah""",
+                body_text=_DEMO_BUDGET_EMAIL_BODY,
                 snippet="I've completed the Q4 budget analysis. Key findings: Total projected revenue: $2.4M (down 8% from Q3)...",
                 attachments=[
                     EmailAttachment(
                         filename="Q4_Budget_Analysis.xlsx",
                         mime_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                         size=45000,
-                        extracted_text="""Q4 Budget Analysis
-=== Revenue Projections ===
-Month | Projected | Actual | Variance
-Oct | $800,000 | $720,000 | -10%
-Nov | $850,000 | $790,000 | -7%
-Dec | $900,000 | TBD | TBD
-
-=== Department Budgets ===
-Engineering | $450,000 | Headcount: 12 -> 15 requested
-Marketing | $200,000 | Increase needed for Q4 push
-Sales | $180,000 | On track
-Infrastructure | $120,000 | 20% over due to cloud costs
-
-KEY CONCERNS:
-- Revenue trending 8% below Q3
-- Cloud infrastructure costs up 35% YoY
-- Marketing ROI needs improvement""",
+                        extracted_text=_DEMO_BUDGET_XLSX_TEXT,
                     ),
                 ],
             ))
 
         # Health-related context email
-        if any("1:1" in meeting.title or "Check-in" in meeting.title for _ in [1]):
+        if "1:1" in meeting.title or "Check-in" in meeting.title:
             emails.append(EnrichedEmail(
                 id="demo-email-health-1",
                 thread_id="thread-2",
                 subject="Re: This week",
-                sender=meeting.attendees[0].email if meeting.attendees else "tom@company.com",
+                sender=first_attendee_email or "tom@company.com",
                 recipients=["you@company.com"],
                 date=now - timedelta(days=1),
-                body_text="""Hey,
-
-Just wanted to give you a heads up - I've been dealing with some back issues this week and might need to take it easy. Still planning to be in the meeting but might need to keep it shorter if that's okay.
-
-Also, I finished the code review you asked about. Left some comments on the PR.
-
-Thanks for understanding,
-Tom""",
+                body_text=_DEMO_HEALTH_EMAIL_BODY,
                 snippet="Just wanted to give you a heads up - I've been dealing with some back issues this week...",
             ))
 
         # External meeting context
         if meeting.external_attendees if hasattr(meeting, 'external_attendees') else any(
-            not a.email.endswith("@company.com") for a in meeting.attendees
+            not a.email.endswith(_DEMO_INTERNAL_SUFFIX) for a in meeting.attendees
         ):
             emails.append(EnrichedEmail(
                 id="demo-email-vendor-1",
@@ -1165,51 +1600,14 @@ Tom""",
                 sender="john.smith@analyticsplatform.com",
                 recipients=["you@company.com"],
                 date=now - timedelta(days=3),
-                body_text="""Hi,
-
-Looking forward to our demo next week. I've attached our standard requirements checklist and a brief overview of our platform capabilities.
-
-For the demo, I'll cover:
-1. Real-time analytics dashboard
-2. Custom report builder
-3. API integration options
-4. Security & compliance features
-
-Please let me know if there are specific features you'd like me to focus on.
-
-Best regards,
-John Smith
-Senior Solutions Engineer
-Analytics Platform Inc.""",
+                body_text=_DEMO_VENDOR_EMAIL_BODY,
                 snippet="Looking forward to our demo next week. I've attached our standard requirements checklist...",
                 attachments=[
                     EmailAttachment(
                         filename="Analytics_Platform_Overview.pdf",
                         mime_type="application/pdf",
                         size=2500000,
-                        extracted_text="""Analytics Platform - Enterprise Overview
-
-PLATFORM CAPABILITIES:
-- Real-time data processing: Up to 1M events/second
-- Custom dashboards with 50+ visualization types
-- Machine learning insights and anomaly detection
-- SOC2 Type II and HIPAA compliant
-
-PRICING TIERS:
-- Starter: $500/month (up to 10 users)
-- Professional: $2,000/month (up to 50 users)
-- Enterprise: Custom pricing
-
-INTEGRATION OPTIONS:
-- REST API with full documentation
-- Native connectors for Salesforce, HubSpot, Segment
-- Webhook support for real-time alerts
-- SSO via SAML 2.0 and OAuth 2.0
-
-IMPLEMENTATION TIMELINE:
-- Basic setup: 1-2 weeks
-- Full integration: 4-6 weeks
-- Custom development: 8-12 weeks""",
+                        extracted_text=_DEMO_VENDOR_OVERVIEW_PDF_TEXT,
                     ),
                 ],
             ))
@@ -1221,17 +1619,10 @@ IMPLEMENTATION TIMELINE:
                 id="demo-email-followup-1",
                 thread_id="thread-4",
                 subject=f"Re: {meeting.title} - Quick question",
-                sender=meeting.attendees[0].email if meeting.attendees else "colleague@company.com",
+                sender=first_attendee_email or "colleague@company.com",
                 recipients=["you@company.com"],
                 date=now - timedelta(days=5),
-                body_text=f"""Hi,
-
-Quick question before our meeting - did you get a chance to review the proposal I sent last week? I haven't heard back and want to make sure we're aligned before discussing with the broader team.
-
-Also, I noticed the deadline for the roadmap doc is coming up. Can we add that to our agenda?
-
-Thanks,
-{attendee_name}""",
+                body_text=_DEMO_FOLLOWUP_EMAIL_TEMPLATE.format(attendee_name=attendee_name),
                 snippet="Quick question before our meeting - did you get a chance to review the proposal I sent last week?...",
             ))
 
@@ -1244,12 +1635,13 @@ Thanks,
 
         attendee_name = meeting.attendees[0].name if meeting.attendees else "Sarah"
         first_name = attendee_name.split()[0] if attendee_name else "Sarah"
+        first_attendee_email = meeting.attendees[0].email if meeting.attendees else None
 
         # Work-related messages
         messages.append(EnrichedSlackMessage(
             text=f"@{first_name} the deployment is blocked - we're waiting on the security review. Can you check with IT?",
             user="Alex Kumar",
-            user_email=meeting.attendees[0].email if meeting.attendees else None,
+            user_email=first_attendee_email,
             channel="engineering",
             channel_type="channel",
             timestamp=str((now - timedelta(hours=4)).timestamp()),
@@ -1258,7 +1650,7 @@ Thanks,
         messages.append(EnrichedSlackMessage(
             text=f"Thanks for the heads up. I'll ping the security team. Also, I need to reschedule our 1:1 this week - dealing with some personal stuff.",
             user=first_name,
-            user_email=meeting.attendees[0].email if meeting.attendees else None,
+            user_email=first_attendee_email,
             channel="engineering",
             channel_type="channel",
             timestamp=str((now - timedelta(hours=3, minutes=45)).timestamp()),
@@ -1268,7 +1660,7 @@ Thanks,
         messages.append(EnrichedSlackMessage(
             text=f"Hey, just between us - I'm pretty stressed about the Q4 targets. The numbers aren't looking great and leadership is pushing hard. Can we talk about this in our meeting?",
             user=first_name,
-            user_email=meeting.attendees[0].email if meeting.attendees else None,
+            user_email=first_attendee_email,
             channel="direct-message",
             channel_type="dm",
             timestamp=str((now - timedelta(days=1)).timestamp()),
@@ -1278,7 +1670,7 @@ Thanks,
         messages.append(EnrichedSlackMessage(
             text=f"I promised to have the API docs ready by Friday. @channel I'll need some review help - who's available?",
             user=first_name,
-            user_email=meeting.attendees[0].email if meeting.attendees else None,
+            user_email=first_attendee_email,
             channel="product",
             channel_type="channel",
             timestamp=str((now - timedelta(days=2)).timestamp()),
@@ -1289,25 +1681,7 @@ Thanks,
                     filetype="md",
                     url_private="",
                     size=15000,
-                    extracted_text="""# API Documentation v2.0
-
-## Authentication
-All API requests require Bearer token authentication.
-
-## Endpoints
-
-### GET /api/v2/users
-Returns list of users with pagination.
-
-### POST /api/v2/analytics/events
-Submit analytics events in batch.
-- Max batch size: 1000 events
-- Rate limit: 10,000 events/minute
-
-## Breaking Changes from v1
-- Removed deprecated /api/v1/legacy endpoint
-- Changed date format to ISO 8601
-- Added required 'source' field to events""",
+                    extracted_text=_DEMO_API_DOCS_TEXT,
                 ),
             ],
         ))
@@ -1316,7 +1690,7 @@ Submit analytics events in batch.
         messages.append(EnrichedSlackMessage(
             text=f"@you Did you see my question about the database migration timeline? Need to know for capacity planning.",
             user=first_name,
-            user_email=meeting.attendees[0].email if meeting.attendees else None,
+            user_email=first_attendee_email,
             channel="engineering",
             channel_type="channel",
             timestamp=str((now - timedelta(days=3)).timestamp()),
@@ -1331,32 +1705,6 @@ Submit analytics events in batch.
                 file_id="cal-attach-1",
                 filename="Q4_Roadmap_2024.pdf",
                 mime_type="application/pdf",
-                extracted_text="""Q4 2024 Product Roadmap
-
-PRIORITY 1 - MUST SHIP:
-- User authentication overhaul (Oct 15)
-- Mobile app v2.0 launch (Nov 1)
-- Holiday readiness optimizations (Nov 15)
-
-PRIORITY 2 - SHOULD SHIP:
-- Analytics dashboard redesign
-- API rate limiting improvements
-- Customer portal enhancements
-
-KEY MILESTONES:
-- Oct 1: Feature freeze for mobile v2.0
-- Oct 15: Auth system go-live
-- Nov 1: Mobile launch (App Store + Play Store)
-- Dec 1: Year-end code freeze
-
-RISKS:
-- Mobile app approval process may delay launch
-- Auth migration requires 2-hour downtime window
-- Team capacity reduced due to PTO in December
-
-RESOURCE ALLOCATION:
-- Mobile team: 5 engineers (full-time)
-- Backend team: 3 engineers (50% on auth)
-- QA team: 2 engineers (shared)""",
+                extracted_text=_DEMO_ROADMAP_PDF_TEXT,
             ),
         ]
@@ -1,84 +1,130 @@
 """Demo data for testing without real API connections."""
 
 from datetime import datetime, timedelta
+from functools import lru_cache
+import time
+from pydantic import TypeAdapter
 from models import Meeting, Attendee, Email, SlackMessage
 
+# Demo meetings are rebuilt at most this often so their times keep sliding
+# forward relative to "now" without being reconstructed on every request
+DEMO_MEETINGS_REFRESH_SECONDS = 60
+
+
+_MEETING_LIST_ADAPTER = TypeAdapter(list[Meeting])
+
+
+@lru_cache(maxsize=1)
+def _demo_meetings_cached(refresh_bucket: int) -> tuple[list[Meeting], dict[str, Meeting], bytes]:
+    """Build the demo meetings once per refresh bucket, plus an id index and their JSON."""
+    meetings = _build_demo_meetings()
+    return meetings, {m.id: m for m in meetings}, _MEETING_LIST_ADAPTER.dump_json(meetings)
+
+
+def _current_demo_meetings() -> tuple[list[Meeting], dict[str, Meeting], bytes]:
+    return _demo_meetings_cached(int(time.time() // DEMO_MEETINGS_REFRESH_SECONDS))
+
 
 def get_demo_meetings() -> list[Meeting]:
+    """Get demo meetings for the next 7 days."""
+    return list(_current_demo_meetings()[0])
+
+
+def get_demo_meetings_json() -> bytes:
+    """Get the demo meetings already serialized as a JSON array."""
+    return _current_demo_meetings()[2]
+
+
+# Static parts of the demo meetings. Attendee models are built once here and
+# shared by every rebuilt Meeting; only the start/end times change.
+_DEMO_MEETING_TEMPLATES = [
+    {
+        "id": "demo-meeting-1",
+        "title": "Q4 Planning Review",
+        "description": "Quarterly planning review with leadership team to discuss goals and objectives for Q4.",
+        "start_offset": timedelta(hours=2),
+        "end_offset": timedelta(hours=3),
+        "attendees": [
+            Attendee(email="sarah.chen@company.com", name="Sarah Chen", response_status="accepted"),
+            Attendee(email="mike.johnson@company.com", name="Mike Johnson", response_status="accepted"),
+            Attendee(email="lisa.wang@company.com", name="Lisa Wang", response_status="tentative"),
+        ],
+        "location": "Conference Room A",
+        "meeting_link": "https://meet.google.com/abc-defg-hij",
+    },
+    {
+        "id": "demo-meeting-2",
+        "title": "Product Sync with Engineering",
+        "description": "Weekly sync between product and engineering teams.",
+        "start_offset": timedelta(days=1, hours=3),
+        "end_offset": timedelta(days=1, hours=4),
+        "attendees": [
+            Attendee(email="alex.kumar@company.com", name="Alex Kumar", response_status="accepted"),
+            Attendee(email="emma.davis@company.com", name="Emma Davis", response_status="accepted"),
+        ],
+        "location": None,
+        "meeting_link": "https://meet.google.com/xyz-uvwx-yz",
+    },
+    {
+        "id": "demo-meeting-3",
+        "title": "Customer Success Check-in",
+        "description": "Monthly check-in with the customer success team to review metrics and discuss improvements.",
+        "start_offset": timedelta(days=2, hours=5),
+        "end_offset": timedelta(days=2, hours=6),
+        "attendees": [
+            Attendee(email="james.wilson@company.com", name="James Wilson", response_status="accepted"),
+            Attendee(email="maria.garcia@company.com", name="Maria Garcia", response_status="needsAction"),
+        ],
+        "location": "Virtual",
+        "meeting_link": "https://zoom.us/j/123456789",
+    },
+    {
+        "id": "demo-meeting-4",
+        "title": "1:1 with Direct Report",
+        "description": "Weekly 1:1 meeting",
+        "start_offset": timedelta(days=3, hours=1),
+        "end_offset": timedelta(days=3, hours=1, minutes=30),
+        "attendees": [
+            Attendee(email="tom.anderson@company.com", name="Tom Anderson", response_status="accepted"),
+        ],
+        "location": None,
+        "meeting_link": "https://meet.google.com/one-on-one",
+    },
+    {
+        "id": "demo-meeting-5",
+        "title": "Vendor Demo - Analytics Platform",
+        "description": "Demo of the new analytics platform from potential vendor.",
+        "start_offset": timedelta(days=4, hours=4),
+        "end_offset": timedelta(days=4, hours=5),
+        "attendees": [
+            Attendee(email="vendor@analyticsplatform.com", name="John Smith (Vendor)", response_status="accepted"),
+            Attendee(email="procurement@company.com", name="Procurement Team", response_status="accepted"),
+            Attendee(email="it-security@company.com", name="IT Security", response_status="tentative"),
+        ],
+        "location": "Virtual",
+        "meeting_link": "https://teams.microsoft.com/demo-link",
+    },
+]
+
+
+def _build_demo_meetings() -> list[Meeting]:
     """Generate demo meetings for the next 7 days."""
     now = datetime.utcnow()
 
-    meetings = [
-        Meeting(
-            id="demo-meeting-1",
-            title="Q4 Planning Review",
-            description="Quarterly planning review with leadership team to discuss goals and objectives for Q4.",
-            start_time=now + timedelta(hours=2),
-            end_time=now + timedelta(hours=3),
-            attendees=[
-                Attendee(email="sarah.chen@company.com", name="Sarah Chen", response_status="accepted"),
-                Attendee(email="mike.johnson@company.com", name="Mike Johnson", response_status="accepted"),
-                Attendee(email="lisa.wang@company.com", name="Lisa Wang", response_status="tentative"),
-            ],
-            location="Conference Room A",
-            meeting_link="https://meet.google.com/abc-defg-hij",
-        ),
+    return [
         Meeting(
-            id="demo-meeting-2",
-            title="Product Sync with Engineering",
-            description="Weekly sync between product and engineering teams.",
-            start_time=now + timedelta(days=1, hours=3),
-            end_time=now + timedelta(days=1, hours=4),
-            attendees=[
-                Attendee(email="alex.kumar@company.com", name="Alex Kumar", response_status="accepted"),
-                Attendee(email="emma.davis@company.com", name="Emma Davis", response_status="accepted"),
-            ],
-            location=None,
-            meeting_link="https://meet.google.com/xyz-uvwx-yz",
-        ),
-        Meeting(
-            id="demo-meeting-3",
-            title="Customer Success Check-in",
-            description="Monthly check-in with the customer success team to review metrics and discuss improvements.",
-            start_time=now + timedelta(days=2, hours=5),
-            end_time=now + timedelta(days=2, hours=6),
-            attendees=[
-                Attendee(email="james.wilson@company.com", name="James Wilson", response_status="accepted"),
-                Attendee(email="maria.garcia@company.com", name="Maria Garcia", response_status="needsAction"),
-            ],
-            location="Virtual",
-            meeting_link="https://zoom.us/j/123456789",
-        ),
-        Meeting(
-            id="demo-meeting-4",
-            title="1:1 with Direct Report",
-            description="Weekly 1:1 meeting",
-            start_time=now + timedelta(days=3, hours=1),
-            end_time=now + timedelta(days=3, hours=1, minutes=30),
-            attendees=[
-                Attendee(email="tom.anderson@company.com", name="Tom Anderson", response_status="accepted"),
-            ],
-            location=None,
-            meeting_link="https://meet.google.com/one-on-one",
-        ),
-        Meeting(
-            id="demo-meeting-5",
-            title="Vendor Demo - Analytics Platform",
-            description="Demo of the new analytics platform from potential vendor.",
-            start_time=now + timedelta(days=4, hours=4),
-            end_time=now + timedelta(days=4, hours=5),
-            attendees=[
-                Attendee(email="vendor@analyticsplatform.com", name="John Smith (Vendor)", response_status="accepted"),
-                Attendee(email="procurement@company.com", name="Procurement Team", response_status="accepted"),
-                Attendee(email="it-security@company.com", name="IT Security", response_status="tentative"),
-            ],
-            location="Virtual",
-            meeting_link="https://teams.microsoft.com/demo-link",
-        ),
+            id=t["id"],
+            title=t["title"],
+            description=t["description"],
+            start_time=now + t["start_offset"],
+            end_time=now + t["end_offset"],
+            attendees=t["attendees"],
+            location=t["location"],
+            meeting_link=t["meeting_link"],
+        )
+        for t in _DEMO_MEETING_TEMPLATES
     ]
 
-    return meetings
-
 
 def get_demo_emails(attendee_email: str) -> list[Email]:
     """Generate demo emails for a given attendee."""
@@ -164,8 +210,4 @@ def get_demo_slack_messages(attendee_email: str) -> list[SlackMessage]:
 
 def get_demo_meeting_by_id(meeting_id: str) -> Meeting | None:
     """Get a specific demo meeting by ID."""
-    meetings = get_demo_meetings()
-    for meeting in meetings:
-        if meeting.id == meeting_id:
-            return meeting
-    return None
+    return _current_demo_meetings()[1].get(meeting_id)
@@ -1,29 +1,141 @@
 """Document processing module for extracting text from various file formats."""
 
+import hashlib
 import io
+import multiprocessing
 import os
 import tempfile
 import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Optional
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 import mimetypes
 import logging
+import re
+
+import httplib2
+import httpx
+import google_auth_httplib2
+
+from config import get_settings
+from google_services import build_google_service
+
+# Parsing libraries are optional; import them once here rather than on
+# every extraction
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    from docx import Document as DocxDocument
+except ImportError:
+    DocxDocument = None
+
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None
+
+try:
+    from pptx import Presentation
+except ImportError:
+    Presentation = None
 
 logger = logging.getLogger(__name__)
 
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get the shared process pool for CPU-bound parsing (created on first use)."""
+    global _process_pool
+    if _process_pool is None:
+        # The pool is created inside a running, multi-threaded server, where
+        # fork() can deadlock; workers start from a clean forkserver/spawn
+        # process and import this module, and with it the parsing
+        # libraries, once at startup
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _process_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context(method),
+        )
+    return _process_pool
+
 
-@dataclass
+async def run_in_process_pool(func, *args):
+    """
+    Run func(*args) in the shared process pool.
+
+    A worker dying (e.g. a parser crashing on a malformed file) breaks the
+    whole executor; the broken pool is then discarded so the next call
+    starts a fresh one, and this call falls back to a thread.
+    """
+    global _process_pool
+    pool = get_process_pool()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    except BrokenProcessPool as e:
+        logger.error(f"Process pool broke, restarting it: {e}")
+        if _process_pool is pool:
+            _process_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+        return await asyncio.to_thread(func, *args)
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the shared process pool, if it was started."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def _native_pdf_parser():
+    """Return the turbo_parsepdf module if enabled in settings and installed."""
+    if not get_settings().native_pdf_parser:
+        return None
+    try:
+        import turbo_parsepdf
+    except ImportError:
+        return None
+    return turbo_parsepdf
+
+
+def _run_extractor(source_type: str, content: bytes, filename: str) -> str:
+    """Run an extractor in a worker process (module-level so it pickles)."""
+    processor = DocumentProcessor()
+    return processor.EXTRACTORS[source_type](processor, content, filename)
+
+
+def _extract_pdf_page_range(content: bytes, start: int, end: int) -> str:
+    """Extract pages [start, end) of a PDF in a worker process."""
+    doc = fitz.open(stream=content, filetype="pdf")
+    try:
+        return "\n".join(DocumentProcessor()._extract_pdf_pages(doc, start, end))
+    finally:
+        doc.close()
+
+
+@dataclass(slots=True)
 class ExtractedDocument:
     """Represents extracted content from a document."""
     filename: str
     text_content: str
     source_type: str  # 'pdf', 'docx', 'xlsx', 'txt', 'gdoc', 'gsheet', 'gslide'
-    extraction_time: datetime = field(default_factory=datetime.utcnow)
+    extraction_time: int = field(default_factory=time.time_ns)  # ns since epoch
     metadata: dict = field(default_factory=dict)
     success: bool = True
     error_message: Optional[str] = None
 
+    @property
+    def extraction_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.extraction_time / 1e9, tz=timezone.utc)
+
     @property
     def word_count(self) -> int:
         return len(self.text_content.split()) if self.text_content else 0
@@ -68,6 +180,48 @@ class DocumentProcessor:
     EXTRACTION_TIMEOUT = 30  # seconds
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
+    # Minimum size at which each format is parsed in a worker process rather
+    # than a thread. python-docx/openpyxl/python-pptx and the csv module are
+    # pure Python and hold the GIL throughout, so concurrent extractions only
+    # scale across processes; PyMuPDF releases the GIL for much of its work,
+    # so only larger PDFs are worth the process hop. Plain text is a single
+    # decode and stays in a thread.
+    PROCESS_POOL_MIN_BYTES = {
+        'pdf': 1 * 1024 * 1024,  # 1MB
+        'docx': 0,
+        'doc': 0,
+        'xlsx': 0,
+        'xls': 0,
+        'pptx': 0,
+        'csv': 0,
+    }
+
+    # PDFs with at least this many pages are split into page windows and
+    # parsed across the process pool in parallel
+    PDF_PARALLEL_MIN_PAGES = 20
+
+    # Rows of horizontally aligned text blocks needed before a PDF page is
+    # handed to the (slow) table finder
+    TABLE_MIN_ALIGNED_ROWS = 3
+
+    # Pages with a content stream this large but less text than this are
+    # treated as graphics and skip table detection
+    GRAPHICS_PAGE_MIN_STREAM_BYTES = 512 * 1024
+    GRAPHICS_PAGE_MAX_TEXT_CHARS = 2000
+
+    # Rows of a spreadsheet kept in the extracted text
+    MAX_SHEET_ROWS = 100
+
+    # Extracted text keyed by content hash, shared by every processor in
+    # this process. Bytes never change meaning, so entries don't expire.
+    # Bounded by total characters as well as entries; texts too large to
+    # be worth holding aren't cached at all
+    TEXT_CACHE_MAX_ENTRIES = 256
+    TEXT_CACHE_MAX_CHARS = 20_000_000
+    TEXT_CACHE_MAX_ENTRY_CHARS = 1_000_000
+    _text_cache: dict[tuple[bytes, str], str] = {}
+    _text_cache_chars = 0
+
     def __init__(self, google_credentials=None):
         """
         Initialize the document processor.
@@ -79,6 +233,42 @@ class DocumentProcessor:
         self._drive_service = None
         self._docs_service = None
         self._sheets_service = None
+        # httplib2 connections aren't thread-safe; serialize Drive API calls
+        self._drive_lock = threading.Lock()
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Get or create the pooled HTTP client used for Drive media downloads."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=60,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=30),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close the pooled download connections."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @classmethod
+    def _cache_text(cls, key: tuple[bytes, str], text: str) -> None:
+        """Cache extracted text, evicting the oldest entries to stay within budget."""
+        if len(text) > cls.TEXT_CACHE_MAX_ENTRY_CHARS:
+            return
+        cache = cls._text_cache
+        old = cache.pop(key, None)
+        if old is not None:
+            cls._text_cache_chars -= len(old)
+        while cache and (
+            len(cache) >= cls.TEXT_CACHE_MAX_ENTRIES
+            or cls._text_cache_chars + len(text) > cls.TEXT_CACHE_MAX_CHARS
+        ):
+            cls._text_cache_chars -= len(cache.pop(next(iter(cache))))
+        cache[key] = text
+        cls._text_cache_chars += len(text)
 
     async def extract_from_bytes(
         self,
@@ -114,6 +304,23 @@ class DocumentProcessor:
         if mime_type and mime_type in self.GOOGLE_MIME_TYPES:
             source_type = self.GOOGLE_MIME_TYPES[mime_type]
 
+        # The same file is often shared with several users or re-sent in
+        # later threads; reuse the text if these exact bytes were seen before
+        # Hashing multi-MB files is done off the event loop
+        digest = await asyncio.to_thread(lambda: hashlib.blake2b(content, digest_size=16).digest())
+        cache_key = (digest, source_type)
+        text = self._text_cache.get(cache_key)
+        if text is not None:
+            return ExtractedDocument(
+                filename=filename,
+                text_content=text,
+                source_type=source_type,
+                metadata={
+                    'file_size': len(content),
+                    'mime_type': mime_type,
+                },
+            )
+
         try:
             # Use asyncio timeout for extraction
             text = await asyncio.wait_for(
@@ -121,6 +328,8 @@ class DocumentProcessor:
                 timeout=self.EXTRACTION_TIMEOUT,
             )
 
+            self._cache_text(cache_key, text)
+
             return ExtractedDocument(
                 filename=filename,
                 text_content=text,
@@ -152,6 +361,17 @@ class DocumentProcessor:
         """Extract text from a local file."""
         filename = os.path.basename(file_path)
         try:
+            # Reject oversized files before reading them into memory
+            size = os.path.getsize(file_path)
+            if size > self.MAX_FILE_SIZE:
+                return ExtractedDocument(
+                    filename=filename,
+                    text_content="",
+                    source_type="unknown",
+                    success=False,
+                    error_message=f"File too large: {size} bytes (max: {self.MAX_FILE_SIZE})",
+                )
+
             with open(file_path, 'rb') as f:
                 content = f.read()
             mime_type, _ = mimetypes.guess_type(file_path)
@@ -172,20 +392,17 @@ class DocumentProcessor:
         filename: str,
     ) -> str:
         """Internal method to extract text based on file type."""
-        extractors = {
-            'pdf': self._extract_pdf,
-            'docx': self._extract_docx,
-            'doc': self._extract_docx,  # Try docx parser, may not work for old .doc
-            'xlsx': self._extract_xlsx,
-            'xls': self._extract_xlsx,
-            'txt': self._extract_text_file,
-            'csv': self._extract_csv,
-            'pptx': self._extract_pptx,
-        }
-
-        extractor = extractors.get(source_type)
+        extractor = self.EXTRACTORS.get(source_type)
         if extractor:
-            return await asyncio.to_thread(extractor, content, filename)
+            if self._use_process_pool(source_type, len(content)):
+                if source_type == 'pdf':
+                    text = await self._extract_pdf_parallel(content)
+                    if text is not None:
+                        return text
+
+                # Large documents hold the GIL long enough to stall other requests
+                return await run_in_process_pool(_run_extractor, source_type, content, filename)
+            return await asyncio.to_thread(extractor, self, content, filename)
 
         # Try plain text as fallback
         try:
@@ -193,60 +410,172 @@ class DocumentProcessor:
         except Exception:
             return ""
 
+    async def _extract_pdf_parallel(self, content: bytes) -> Optional[str]:
+        """
+        Extract a long PDF by splitting its pages across the process pool.
+
+        Each worker re-opens the bytes and parses one contiguous page window;
+        results are joined in page order. Returns None when PyMuPDF is
+        unavailable or the PDF is too short to be worth splitting.
+        """
+        if _native_pdf_parser():
+            # The native parser handles a whole document in one call
+            return None
+
+        if fitz is None:
+            return None
+
+        def count_pages() -> int:
+            with fitz.open(stream=content, filetype="pdf") as doc:
+                return doc.page_count
+
+        page_count = await asyncio.to_thread(count_pages)
+        if page_count < self.PDF_PARALLEL_MIN_PAGES:
+            return None
+
+        workers = os.cpu_count() or 1
+        window = -(-page_count // workers)  # ceil division
+
+        chunks = await asyncio.gather(*(
+            run_in_process_pool(_extract_pdf_page_range, content, start, min(start + window, page_count))
+            for start in range(0, page_count, window)
+        ))
+        return "\n".join(chunk for chunk in chunks if chunk)
+
+    def _use_process_pool(self, source_type: str, size: int) -> bool:
+        """Decide whether a file is worth the process hop for extraction."""
+        min_bytes = self.PROCESS_POOL_MIN_BYTES.get(source_type)
+        return min_bytes is not None and size >= min_bytes
+
+    def is_extractable_size(self, size: int) -> bool:
+        """Check a reported size before downloading; unknown (0) sizes pass."""
+        return size <= self.MAX_FILE_SIZE
+
     def _extract_pdf(self, content: bytes, filename: str) -> str:
         """Extract text from PDF using PyMuPDF (fitz)."""
-        text_parts = []
-
-        try:
-            import fitz  # PyMuPDF
+        native = _native_pdf_parser()
+        if native:
+            try:
+                return native.parse_to_markdown(content)
+            except ValueError as e:
+                # Malformed header/stream; let PyMuPDF have a go
+                logger.warning(f"Native PDF parser failed on {filename}: {e}")
 
+        if fitz is not None:
             # Open PDF from bytes
             doc = fitz.open(stream=content, filetype="pdf")
+            text_parts = self._extract_pdf_pages(doc, 0, doc.page_count)
+            doc.close()
+            return "\n".join(text_parts)
 
-            for page_num, page in enumerate(doc):
-                # Extract text with layout preservation
-                text = page.get_text("text")
+        # Fall back to pypdfium2, which is much faster than pdfplumber
+        # (text only, no table detection)
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            return self._extract_pdf_pdfplumber(content)
+
+        text_parts = []
+        pdf = pdfium.PdfDocument(content)
+        try:
+            for page_num, page in enumerate(pdf):
+                textpage = page.get_textpage()
+                text = textpage.get_text_range()
+                textpage.close()
+                page.close()
                 if text.strip():
                     text_parts.append(f"--- Page {page_num + 1} ---")
                     text_parts.append(text)
+        finally:
+            pdf.close()
+
+        return "\n".join(text_parts)
+
+    def _extract_pdf_pdfplumber(self, content: bytes) -> str:
+        """Last-resort PDF extraction via pdfplumber (slow, but finds tables)."""
+        text_parts = []
+
+        try:
+            import pdfplumber
 
-                # Also extract tables if present
-                tables = page.find_tables()
-                if tables:
+            with pdfplumber.open(io.BytesIO(content)) as pdf:
+                for page_num, page in enumerate(pdf.pages):
+                    text = page.extract_text()
+                    if text:
+                        text_parts.append(f"--- Page {page_num + 1} ---")
+                        text_parts.append(text)
+
+                    # Extract tables
+                    tables = page.extract_tables()
                     for table in tables:
-                        df_text = self._table_to_text(table)
-                        if df_text:
+                        if table:
                             text_parts.append("\n[Table]")
-                            text_parts.append(df_text)
-
-            doc.close()
+                            for row in table:
+                                text_parts.append(" | ".join(str(cell or '') for cell in row))
 
-        except ImportError:
-            # Fallback to pdfplumber
-            try:
-                import pdfplumber
-
-                with pdfplumber.open(io.BytesIO(content)) as pdf:
-                    for page_num, page in enumerate(pdf.pages):
-                        text = page.extract_text()
-                        if text:
-                            text_parts.append(f"--- Page {page_num + 1} ---")
-                            text_parts.append(text)
-
-                        # Extract tables
-                        tables = page.extract_tables()
-                        for table in tables:
-                            if table:
-                                text_parts.append("\n[Table]")
-                                for row in table:
-                                    text_parts.append(" | ".join(str(cell or '') for cell in row))
-
-            except Exception as e:
-                logger.error(f"pdfplumber failed: {e}")
-                raise
+        except Exception as e:
+            logger.error(f"pdfplumber failed: {e}")
+            raise
 
         return "\n".join(text_parts)
 
+    def _extract_pdf_pages(self, doc, start: int, end: int) -> list[str]:
+        """Extract text and tables from pages [start, end) of an open fitz document."""
+        text_parts = []
+
+        for page_num in range(start, end):
+            page = doc.load_page(page_num)
+            # Lay out the page's text once for both the text and block passes
+            textpage = page.get_textpage()
+
+            # Extract text with layout preservation
+            text = page.get_text("text", textpage=textpage)
+            if text.strip():
+                text_parts.append(f"--- Page {page_num + 1} ---")
+                text_parts.append(text)
+
+            # Also extract tables if present (find_tables is expensive, so
+            # only run it on pages whose layout looks tabular and which
+            # aren't mostly vector graphics)
+            if self._may_contain_table(page, textpage) and not self._is_graphics_heavy(doc, page, text):
+                for table in page.find_tables():
+                    df_text = self._table_to_text(table)
+                    if df_text:
+                        text_parts.append("\n[Table]")
+                        text_parts.append(df_text)
+
+            # Release the page before loading the next one
+            del textpage, page
+
+        return text_parts
+
+    def _is_graphics_heavy(self, doc, page, text: str) -> bool:
+        """
+        Detect pages dominated by drawing operators (charts, diagrams).
+
+        The table finder walks every path operator in the content stream, so
+        a huge stream with little text costs far more than it can yield.
+        """
+        if len(text) >= self.GRAPHICS_PAGE_MAX_TEXT_CHARS:
+            return False
+        stream_size = sum(len(doc.xref_stream(xref) or b"") for xref in page.get_contents())
+        return stream_size > self.GRAPHICS_PAGE_MIN_STREAM_BYTES
+
+    def _may_contain_table(self, page, textpage=None) -> bool:
+        """
+        Cheap check for table-like layout on a fitz page.
+
+        Table cells come out as separate text blocks sharing a top edge, so
+        look for at least TABLE_MIN_ALIGNED_ROWS rows of two or more aligned
+        blocks.
+        """
+        rows: dict[int, int] = {}
+        for block in page.get_text("blocks", textpage=textpage):
+            top = round(block[1])
+            rows[top] = rows.get(top, 0) + 1
+        aligned = sum(1 for count in rows.values() if count >= 2)
+        return aligned >= self.TABLE_MIN_ALIGNED_ROWS
+
     def _table_to_text(self, table) -> str:
         """Convert a fitz table to text."""
         try:
@@ -261,19 +590,28 @@ class DocumentProcessor:
     def _extract_docx(self, content: bytes, filename: str) -> str:
         """Extract text from Word document."""
         try:
-            from docx import Document
+            if DocxDocument is None:
+                raise ImportError("python-docx is not installed")
 
-            doc = Document(io.BytesIO(content))
+            doc = DocxDocument(io.BytesIO(content))
             text_parts = []
 
             for para in doc.paragraphs:
+                # para.text and para.style are recomputed on every access
+                text = para.text
+                style_name = para.style.name
+
                 # Preserve heading structure
-                if para.style.name.startswith('Heading'):
-                    level = para.style.name.replace('Heading ', '')
-                    prefix = '#' * int(level) if level.isdigit() else '#'
-                    text_parts.append(f"\n{prefix} {para.text}\n")
-                elif para.text.strip():
-                    text_parts.append(para.text)
+                if style_name.startswith('Heading'):
+                    # Fast path for the built-in "Heading 1".."Heading 9"
+                    if len(style_name) == 9 and style_name[7] == ' ' and '1' <= style_name[8] <= '9':
+                        prefix = '#' * (ord(style_name[8]) - ord('0'))
+                    else:
+                        level = style_name.replace('Heading ', '')
+                        prefix = '#' * int(level) if level.isdigit() else '#'
+                    text_parts.append(f"\n{prefix} {text}\n")
+                elif text.strip():
+                    text_parts.append(text)
 
             # Extract tables
             for table in doc.tables:
@@ -291,26 +629,40 @@ class DocumentProcessor:
     def _extract_xlsx(self, content: bytes, filename: str) -> str:
         """Extract text from Excel file."""
         try:
-            from openpyxl import load_workbook
+            if load_workbook is None:
+                raise ImportError("openpyxl is not installed")
 
-            wb = load_workbook(io.BytesIO(content), data_only=True)
+            # read_only streams rows from the sheet XML instead of building
+            # the full cell tree up front
+            wb = load_workbook(io.BytesIO(content), data_only=True, read_only=True)
             text_parts = []
 
-            for sheet_name in wb.sheetnames:
-                sheet = wb[sheet_name]
-                text_parts.append(f"\n=== Sheet: {sheet_name} ===\n")
-
-                rows_data = []
-                for row in sheet.iter_rows(values_only=True):
-                    # Filter out completely empty rows
-                    if any(cell is not None for cell in row):
-                        row_text = [str(cell) if cell is not None else '' for cell in row]
-                        rows_data.append(" | ".join(row_text))
-
-                text_parts.extend(rows_data[:100])  # Limit rows per sheet
-
-                if len(rows_data) > 100:
-                    text_parts.append(f"... and {len(rows_data) - 100} more rows")
+            try:
+                for sheet in wb.worksheets:
+                    text_parts.append(f"\n=== Sheet: {sheet.title} ===\n")
+
+                    rows_kept = 0
+                    rows_scanned = 0
+                    truncated = False
+                    for row in sheet.iter_rows(values_only=True):
+                        rows_scanned += 1
+                        # Filter out completely empty rows
+                        if any(cell is not None for cell in row):
+                            if rows_kept == self.MAX_SHEET_ROWS:  # Limit rows per sheet
+                                truncated = True
+                                break
+                            row_text = [str(cell) if cell is not None else '' for cell in row]
+                            text_parts.append(" | ".join(row_text))
+                            rows_kept += 1
+
+                    if truncated:
+                        # Stop parsing here; the sheet dimension gives the remainder
+                        if sheet.max_row:
+                            text_parts.append(f"... and {sheet.max_row - rows_scanned + 1} more rows")
+                        else:
+                            text_parts.append("... (truncated, more rows follow)")
+            finally:
+                wb.close()
 
             return "\n".join(text_parts)
 
@@ -320,39 +672,63 @@ class DocumentProcessor:
 
     def _extract_text_file(self, content: bytes, filename: str) -> str:
         """Extract text from plain text file."""
-        # Try different encodings
-        for encoding in ['utf-8', 'latin-1', 'cp1252']:
+        # UTF-8 (and plain ASCII) is by far the common case and decodes fastest
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+
+        # Otherwise detect the codec in one statistical pass rather than
+        # trial-decoding the whole file per candidate
+        try:
+            from charset_normalizer import from_bytes
+
+            best = from_bytes(content).best()
+            if best is not None:
+                return str(best)
+        except ImportError:
+            pass
+
+        # latin-1 maps every byte, so this always succeeds
+        return content.decode('latin-1')
+
+    def _extract_csv(self, content: bytes, filename: str) -> str:
+        """Extract text from CSV file."""
+        # Decode lazily while parsing, so only the rows we keep are decoded
+        # rather than the whole file up front
+        for encoding in ['utf-8', 'latin-1']:
             try:
-                return content.decode(encoding)
+                return self._read_csv_rows(content, encoding)
             except UnicodeDecodeError:
                 continue
-        return content.decode('utf-8', errors='ignore')
+            except Exception:
+                break
 
-    def _extract_csv(self, content: bytes, filename: str) -> str:
-        """Extract text from CSV file."""
+        # Fallback to raw text
+        return self._extract_text_file(content, filename)[:10000]
+
+    def _read_csv_rows(self, content: bytes, encoding: str) -> str:
+        """Parse up to MAX_SHEET_ROWS rows of CSV content in the given encoding."""
         import csv
 
-        text = self._extract_text_file(content, filename)
         text_parts = []
-
-        try:
-            reader = csv.reader(io.StringIO(text))
-            for i, row in enumerate(reader):
-                if i >= 100:  # Limit rows
-                    text_parts.append(f"... (truncated, more rows follow)")
-                    break
-                text_parts.append(" | ".join(row))
-        except Exception:
-            # Fallback to raw text
-            return text[:10000]
+        stream = io.TextIOWrapper(io.BytesIO(content), encoding=encoding, newline='')
+        reader = csv.reader(stream)
+        for i, row in enumerate(reader):
+            if i >= self.MAX_SHEET_ROWS:  # Limit rows
+                text_parts.append(f"... (truncated, more rows follow)")
+                break
+            text_parts.append(" | ".join(row))
 
         return "\n".join(text_parts)
 
     def _extract_pptx(self, content: bytes, filename: str) -> str:
         """Extract text from PowerPoint file."""
-        try:
-            from pptx import Presentation
+        if Presentation is None:
+            logger.warning("python-pptx not installed, skipping PPTX extraction")
+            return ""
 
+        try:
             prs = Presentation(io.BytesIO(content))
             text_parts = []
 
@@ -371,34 +747,39 @@ class DocumentProcessor:
 
             return "\n".join(text_parts)
 
-        except ImportError:
-            logger.warning("python-pptx not installed, skipping PPTX extraction")
-            return ""
         except Exception as e:
             logger.error(f"Error extracting PPTX: {e}")
             raise
 
+    EXTRACTORS = {
+        'pdf': _extract_pdf,
+        'docx': _extract_docx,
+        'doc': _extract_docx,  # Try docx parser, may not work for old .doc
+        'xlsx': _extract_xlsx,
+        'xls': _extract_xlsx,
+        'txt': _extract_text_file,
+        'csv': _extract_csv,
+        'pptx': _extract_pptx,
+    }
+
     # ========== Google Docs/Sheets/Slides Extraction ==========
 
     def _get_drive_service(self):
         """Get or create Google Drive service."""
         if not self._drive_service and self.google_credentials:
-            from googleapiclient.discovery import build
-            self._drive_service = build('drive', 'v3', credentials=self.google_credentials)
+            self._drive_service = build_google_service('drive', 'v3', self.google_credentials)
         return self._drive_service
 
     def _get_docs_service(self):
         """Get or create Google Docs service."""
         if not self._docs_service and self.google_credentials:
-            from googleapiclient.discovery import build
-            self._docs_service = build('docs', 'v1', credentials=self.google_credentials)
+            self._docs_service = build_google_service('docs', 'v1', self.google_credentials)
         return self._docs_service
 
     def _get_sheets_service(self):
         """Get or create Google Sheets service."""
         if not self._sheets_service and self.google_credentials:
-            from googleapiclient.discovery import build
-            self._sheets_service = build('sheets', 'v4', credentials=self.google_credentials)
+            self._sheets_service = build_google_service('sheets', 'v4', self.google_credentials)
         return self._sheets_service
 
     async def extract_google_doc(self, doc_id: str) -> ExtractedDocument:
@@ -447,11 +828,11 @@ class DocumentProcessor:
         for element in content:
             if 'paragraph' in element:
                 para = element['paragraph']
-                para_text = ""
-
-                for elem in para.get('elements', []):
-                    if 'textRun' in elem:
-                        para_text += elem['textRun'].get('content', '')
+                para_text = "".join(
+                    elem['textRun'].get('content', '')
+                    for elem in para.get('elements', [])
+                    if 'textRun' in elem
+                )
 
                 if para_text.strip():
                     # Check for heading style
@@ -497,24 +878,28 @@ class DocumentProcessor:
 
             text_parts = [f"# {title}\n"]
 
-            # Get data from each sheet
-            for sheet in spreadsheet.get('sheets', []):
-                sheet_title = sheet.get('properties', {}).get('title', 'Sheet')
-                text_parts.append(f"\n=== {sheet_title} ===\n")
-
-                # Get sheet data
-                range_name = f"'{sheet_title}'"
-                result = sheets_service.spreadsheets().values().get(
+            # Fetch every tab's values in one batchGet round-trip
+            sheet_titles = [
+                sheet.get('properties', {}).get('title', 'Sheet')
+                for sheet in spreadsheet.get('sheets', [])
+            ]
+            value_ranges = []
+            if sheet_titles:
+                result = sheets_service.spreadsheets().values().batchGet(
                     spreadsheetId=sheet_id,
-                    range=range_name,
+                    ranges=[f"'{sheet_title}'" for sheet_title in sheet_titles],
                 ).execute()
+                value_ranges = result.get('valueRanges', [])
 
-                values = result.get('values', [])
-                for i, row in enumerate(values[:100]):  # Limit rows
-                    text_parts.append(" | ".join(str(cell) for cell in row))
+            for sheet_title, value_range in zip(sheet_titles, value_ranges):
+                text_parts.append(f"\n=== {sheet_title} ===\n")
+
+                values = value_range.get('values', [])
+                # Values come back as formatted strings, so join them directly
+                text_parts.extend(" | ".join(row) for row in values[:self.MAX_SHEET_ROWS])  # Limit rows
 
-                if len(values) > 100:
-                    text_parts.append(f"... and {len(values) - 100} more rows")
+                if len(values) > self.MAX_SHEET_ROWS:
+                    text_parts.append(f"... and {len(values) - self.MAX_SHEET_ROWS} more rows")
 
             return ExtractedDocument(
                 filename=f"{title}.gsheet",
@@ -533,26 +918,77 @@ class DocumentProcessor:
                 error_message=str(e),
             )
 
-    async def download_drive_file(self, file_id: str) -> tuple[bytes, str, str]:
+    async def download_drive_file(
+        self,
+        file_id: str,
+        filename: Optional[str] = None,
+        mime_type: Optional[str] = None,
+    ) -> tuple[bytes, str, str]:
         """
         Download a file from Google Drive.
 
+        Args:
+            file_id: The Google Drive file ID
+            filename: The file's name, if already known (e.g. from a calendar
+                attachment), to skip the metadata lookup
+            mime_type: The file's MIME type, if already known
+
         Returns:
             Tuple of (content_bytes, filename, mime_type)
         """
         if not self.google_credentials:
             raise ValueError("Google credentials not provided")
 
+        if filename is not None and mime_type and mime_type not in self.GOOGLE_MIME_TYPES:
+            # Regular file with known metadata: the media download is the
+            # only round-trip needed
+            return await self._download_drive_media(file_id), filename, mime_type
+
+        # The Drive client blocks, so run the metadata/export calls in a
+        # thread; that lets the event loop extract an already-downloaded
+        # file while this one transfers
+        content, filename, mime_type = await asyncio.to_thread(
+            self._download_drive_file_sync, file_id, filename, mime_type,
+        )
+        if content is None:
+            # Regular files: stream the media natively instead of through
+            # MediaIoBaseDownload's small synchronous chunks
+            content = await self._download_drive_media(file_id)
+        return content, filename, mime_type
+
+    def _download_drive_file_sync(
+        self,
+        file_id: str,
+        filename: Optional[str] = None,
+        mime_type: Optional[str] = None,
+    ) -> tuple[Optional[bytes], str, str]:
+        """Blocking body of download_drive_file."""
+        with self._drive_lock:
+            return self._fetch_drive_file(file_id, filename, mime_type)
+
+    def _fetch_drive_file(
+        self,
+        file_id: str,
+        filename: Optional[str] = None,
+        mime_type: Optional[str] = None,
+    ) -> tuple[Optional[bytes], str, str]:
+        """
+        Fetch metadata for a Drive file, exporting Google Workspace files.
+
+        The metadata lookup is skipped when filename and mime_type are given.
+        Returns None as content for regular files, which are downloaded
+        separately by _download_drive_media.
+        """
         drive_service = self._get_drive_service()
 
-        # Get file metadata
-        file_metadata = drive_service.files().get(
-            fileId=file_id,
-            fields='name,mimeType',
-        ).execute()
+        if filename is None or not mime_type:
+            file_metadata = drive_service.files().get(
+                fileId=file_id,
+                fields='name,mimeType',
+            ).execute()
 
-        filename = file_metadata.get('name', 'unknown')
-        mime_type = file_metadata.get('mimeType', '')
+            filename = file_metadata.get('name', 'unknown')
+            mime_type = file_metadata.get('mimeType', '')
 
         # Handle Google Workspace files (export to different format)
         if mime_type in self.GOOGLE_MIME_TYPES:
@@ -572,21 +1008,47 @@ class DocumentProcessor:
 
             return content, filename, mime_type
 
-        # Download regular file
-        from googleapiclient.http import MediaIoBaseDownload
+        return None, filename, mime_type
+
+    async def _download_drive_media(self, file_id: str) -> bytes:
+        """Download a regular Drive file's content with the pooled async client."""
+        url = f"https://www.googleapis.com/drive/v3/files/{file_id}"
+        client = self._get_http_client()
+
+        response = await client.get(
+            url,
+            params={'alt': 'media'},
+            headers={'Authorization': f"Bearer {self.google_credentials.token}"},
+        )
+        if response.status_code == 401:
+            # Expired access token (no Drive API call has refreshed it yet)
+            await asyncio.to_thread(self._refresh_credentials)
+            response = await client.get(
+                url,
+                params={'alt': 'media'},
+                headers={'Authorization': f"Bearer {self.google_credentials.token}"},
+            )
+        response.raise_for_status()
+        return response.content
 
-        request = drive_service.files().get_media(fileId=file_id)
-        file_buffer = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_buffer, request)
+    def _refresh_credentials(self):
+        """Refresh the Google access token (blocking)."""
+        with self._drive_lock:
+            self.google_credentials.refresh(google_auth_httplib2.Request(httplib2.Http()))
 
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
 
-        return file_buffer.getvalue(), filename, mime_type
+# ========== Utility Functions ==========
 
+_CURRENCY_RE = re.compile(r'[\$€£¥]\s*[\d,]+(?:\.\d{2})?(?:\s*(?:million|billion|M|B|K))?', re.IGNORECASE)
+_PERCENT_RE = re.compile(r'\d+(?:\.\d+)?\s*%')
+_NUMBER_RE = re.compile(r'(?:\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(?:million|billion|thousand|M|B|K)', re.IGNORECASE)
+_LINE_STRUCTURE_RE = re.compile(
+    r'(?P<heading>^#+[ \t]+(?P<title>.+)$)'
+    r'|(?P<bullet>^[\s]*[-•*]\s+)',
+    re.MULTILINE,
+)
+_PAGE_MARKER_RE = re.compile(r'---\s*Page\s+\d+\s*---')
 
-# ========== Utility Functions ==========
 
 def extract_key_metrics(text: str) -> list[str]:
     """
@@ -598,23 +1060,18 @@ def extract_key_metrics(text: str) -> list[str]:
     - Large numbers
     - Dates
     """
-    import re
-
     metrics = []
 
     # Currency patterns
-    currency_pattern = r'[\$€£¥]\s*[\d,]+(?:\.\d{2})?(?:\s*(?:million|billion|M|B|K))?'
-    currencies = re.findall(currency_pattern, text, re.IGNORECASE)
+    currencies = _CURRENCY_RE.findall(text)
     metrics.extend(currencies[:10])
 
     # Percentage patterns
-    percent_pattern = r'\d+(?:\.\d+)?\s*%'
-    percentages = re.findall(percent_pattern, text)
+    percentages = _PERCENT_RE.findall(text)
     metrics.extend(percentages[:10])
 
     # Large numbers with context
-    number_pattern = r'(?:\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(?:million|billion|thousand|M|B|K)'
-    numbers = re.findall(number_pattern, text, re.IGNORECASE)
+    numbers = _NUMBER_RE.findall(text)
     metrics.extend(numbers[:10])
 
     return list(set(metrics))
@@ -627,33 +1084,22 @@ def extract_document_structure(text: str) -> dict:
     Returns:
         Dict with headings, bullet_points, tables count, etc.
     """
-    import re
-
-    structure = {
-        'headings': [],
-        'bullet_points': 0,
-        'tables': 0,
-        'pages': 0,
+    headings = []
+    bullets = 0
+
+    for match in _LINE_STRUCTURE_RE.finditer(text):
+        if match.lastgroup == 'bullet':
+            bullets += 1
+        elif len(headings) < 20:
+            headings.append(match.group('title'))
+
+    # Markers can sit inside a heading line, so they're counted separately
+    tables = text.count('[Table]')
+    pages = sum(1 for _ in _PAGE_MARKER_RE.finditer(text))
+
+    return {
+        'headings': headings,
+        'bullet_points': bullets,
+        'tables': tables,
+        'pages': pages or 1,
     }
-
-    # Find markdown-style headings
-    heading_pattern = r'^#+\s+(.+)$'
-    headings = re.findall(heading_pattern, text, re.MULTILINE)
-    structure['headings'] = headings[:20]
-
-    # Count bullet points
-    bullet_pattern = r'^[\s]*[-•*]\s+'
-    bullets = re.findall(bullet_pattern, text, re.MULTILINE)
-    structure['bullet_points'] = len(bullets)
-
-    # Count tables
-    table_pattern = r'\[Table\]'
-    tables = re.findall(table_pattern, text)
-    structure['tables'] = len(tables)
-
-    # Count pages
-    page_pattern = r'---\s*Page\s+\d+\s*---'
-    pages = re.findall(page_pattern, text)
-    structure['pages'] = len(pages) if pages else 1
-
-    return structure
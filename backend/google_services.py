@@ -0,0 +1,30 @@
+"""Shared construction of Google API service objects."""
+
+from functools import lru_cache
+from typing import Optional
+
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+
+@lru_cache(maxsize=8)
+def _discovery_document(api: str, version: str) -> Optional[str]:
+    """Load the discovery document bundled with googleapiclient, once per API."""
+    return get_static_doc(api, version)
+
+
+def build_google_service(api: str, version: str, credentials=None, http=None):
+    """
+    Build a Google API service from the cached discovery document.
+
+    build() locates and re-reads the bundled discovery JSON for every
+    client; reusing the cached copy skips that file I/O. The document is
+    kept as a string because building a service mutates the parsed dict.
+    Services themselves aren't shared, since their httplib2 connection
+    isn't thread-safe. Pass either credentials or an already-authorized
+    http.
+    """
+    document = _discovery_document(api, version)
+    if document is None:
+        return build(api, version, credentials=credentials, http=http, cache_discovery=False)
+    return build_from_document(document, credentials=credentials, http=http)
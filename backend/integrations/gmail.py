@@ -1,22 +1,189 @@
 """Gmail API client with attachment support."""
 
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from models import Email
 from config import get_settings
-import base64
+from google_services import build_google_service
+from document_processor import run_in_process_pool
+import asyncio
+import httplib2
 import re
-from email.utils import parsedate_to_datetime
+from email.utils import getaddresses, parsedate_to_datetime
 import logging
 
+try:
+    # SIMD-accelerated drop-in for the stdlib decoder
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 logger = logging.getLogger(__name__)
 
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# The only headers the parsers read; full-format payloads carry dozens more
+_WANTED_HEADERS = frozenset({"From", "To", "Subject", "Date"})
+
+
+def parse_headers(raw_headers) -> dict[str, str]:
+    """
+    Collect the wanted headers, normalizing name case ("date" -> "Date").
+
+    The first occurrence of a header wins, and scanning stops once all
+    wanted headers are found.
+    """
+    headers = {}
+    for h in raw_headers:
+        name = h["name"].title()
+        if name in _WANTED_HEADERS and name not in headers:
+            headers[name] = h["value"]
+            if len(headers) == len(_WANTED_HEADERS):
+                break
+    return headers
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(date_str: str) -> Optional[datetime]:
+    """Parse an RFC 2822 Date header; messages in a thread often share one."""
+    try:
+        return parsedate_to_datetime(date_str)
+    except Exception:
+        return None
+
+
+def _parse_full_message(message: dict, fetch_bodies: bool = True) -> Optional[dict]:
+    """
+    Build a full email dict from a full-format message.
+
+    Module-level (and free of client state) so it can run in a worker process.
+    """
+    try:
+        headers = parse_headers(message.get("payload", {}).get("headers", ()))
+
+        # Parse date
+        date_str = headers.get("Date", "")
+        date = _parse_date(date_str) or datetime.utcnow()
+
+        # Parse recipients (getaddresses handles quoted names with commas)
+        recipients = [
+            addr for _, addr in getaddresses([headers.get("To", "")])
+            if '@' in addr
+        ]
+
+        # Extract body
+        if fetch_bodies:
+            body_text, body_html = _extract_body(message.get("payload", {}))
+        else:
+            body_text, body_html = "", None
+
+        # Extract attachment info
+        attachments = _get_attachment_info(message.get("payload", {}))
+
+        return {
+            "id": message["id"],
+            "thread_id": message.get("threadId", ""),
+            "subject": headers.get("Subject", "No Subject"),
+            "sender": headers.get("From", ""),
+            "recipients": recipients,
+            "date": date,
+            "body_text": body_text,
+            "body_html": body_html,
+            "snippet": message.get("snippet", ""),
+            "attachments": attachments,
+            "labels": message.get("labelIds", []),
+        }
+
+    except Exception as e:
+        logger.error(f"Error parsing full email: {e}")
+        return None
+
+
+def _extract_body(payload: dict) -> tuple[str, Optional[str]]:
+    """Extract plain text and HTML body from email payload."""
+    body_text = ""
+    body_html = None
+
+    html_only = False
+
+    # Handle single-part messages
+    if payload.get("body", {}).get("data"):
+        mime_type = payload.get("mimeType", "")
+        body_data = payload["body"]["data"]
+        decoded = base64.urlsafe_b64decode(body_data).decode("utf-8", errors="ignore")
+
+        if mime_type == "text/html":
+            body_html = decoded
+            html_only = True
+        else:
+            body_text = decoded
+
+    # Handle multi-part messages: walk the MIME tree depth-first in
+    # document order, keeping the first body of each type and stopping
+    # once both are found
+    stack = list(reversed(payload.get("parts", [])))
+    while stack and not (body_text and body_html is not None):
+        part = stack.pop()
+        mime_type = part.get("mimeType", "")
+        body_data = part.get("body", {}).get("data")
+
+        if mime_type == "text/plain" and body_data:
+            if not body_text:
+                body_text = base64.urlsafe_b64decode(body_data).decode("utf-8", errors="ignore")
+        elif mime_type == "text/html" and body_data:
+            if body_html is None:
+                body_html = base64.urlsafe_b64decode(body_data).decode("utf-8", errors="ignore")
+        elif "parts" in part:
+            stack.extend(reversed(part["parts"]))
+
+    # Strip HTML tags for plain text, unless a text part turned up
+    if html_only and not body_text:
+        body_text = _HTML_TAG_RE.sub('', body_html)
+
+    return body_text, body_html
+
+
+def _get_attachment_info(payload: dict) -> list[dict]:
+    """Get metadata for all attachments in an email."""
+    attachments = []
+
+    def find_attachments(parts):
+        for part in parts:
+            filename = part.get("filename", "")
+            body = part.get("body", {})
+
+            if filename and body.get("attachmentId"):
+                attachments.append({
+                    "filename": filename,
+                    "mime_type": part.get("mimeType", ""),
+                    "size": body.get("size", 0),
+                    "attachment_id": body["attachmentId"],
+                })
+
+            if "parts" in part:
+                find_attachments(part["parts"])
+
+    find_attachments(payload.get("parts", []))
+    return attachments
+
 
 class GmailClient:
     """Client for interacting with Gmail API with full attachment support."""
 
+    # Gmail accepts up to 100 calls per batch request
+    BATCH_SIZE = 100
+    METADATA_HEADERS = ["From", "To", "Subject", "Date"]
+
+    # Largest page messages.list / threads.list will return
+    MAX_LIST_RESULTS = 500
+
+    # Partial-response selectors: only request the fields the parsers read
+    METADATA_FIELDS = "id,snippet,payload/headers"
+    FULL_FIELDS = "id,threadId,snippet,labelIds,payload"
+
     def __init__(self, access_token: str, refresh_token: Optional[str] = None):
         settings = get_settings()
         self.credentials = Credentials(
@@ -26,7 +193,9 @@ class GmailClient:
             client_id=settings.google_client_id,
             client_secret=settings.google_client_secret,
         )
-        self.service = build("gmail", "v1", credentials=self.credentials)
+        # One authorized keep-alive connection for every call this client makes
+        self._http = AuthorizedHttp(self.credentials, http=httplib2.Http())
+        self.service = build_google_service("gmail", "v1", http=self._http)
 
     def search_emails_with_person(
         self,
@@ -43,13 +212,19 @@ class GmailClient:
                 userId="me",
                 q=query,
                 maxResults=max_results,
+                fields="messages/id",
             ).execute()
 
-            messages = results.get("messages", [])
-            emails = []
+            messages = self._batch_get_messages(
+                [msg["id"] for msg in results.get("messages", [])],
+                format="metadata",
+                metadataHeaders=self.METADATA_HEADERS,
+                fields=self.METADATA_FIELDS,
+            )
 
-            for msg in messages:
-                email = self._get_email_details(msg["id"])
+            emails = []
+            for message in messages:
+                email = self._parse_email_metadata(message)
                 if email:
                     emails.append(email)
 
@@ -58,6 +233,43 @@ class GmailClient:
             logger.error(f"Error searching emails: {e}")
             return []
 
+    def _batch_get_messages(self, message_ids: list[str], **params) -> list[dict]:
+        """
+        Fetch several messages with batched messages().get() calls.
+
+        Returns the messages that were fetched successfully, in the order of
+        message_ids; failures are logged and skipped.
+        """
+        messages = self.service.users().messages()
+        return self._batch_execute(
+            [(message_id, messages.get(userId="me", id=message_id, **params)) for message_id in message_ids],
+        )
+
+    def _batch_get_threads(self, thread_ids: list[str], **params) -> list[dict]:
+        """Fetch several threads with batched threads().get() calls, in order."""
+        threads = self.service.users().threads()
+        return self._batch_execute(
+            [(thread_id, threads.get(userId="me", id=thread_id, **params)) for thread_id in thread_ids],
+        )
+
+    def _batch_execute(self, requests: list[tuple[str, object]]) -> list[dict]:
+        """Execute (request_id, request) pairs in batches of BATCH_SIZE, keeping their order."""
+        responses = {}
+
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"Error in batched Gmail request {request_id}: {exception}")
+            else:
+                responses[request_id] = response
+
+        for i in range(0, len(requests), self.BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=on_response)
+            for request_id, request in requests[i:i + self.BATCH_SIZE]:
+                batch.add(request, request_id=request_id)
+            batch.execute()
+
+        return [responses[request_id] for request_id, _ in requests if request_id in responses]
+
     def _get_email_details(self, message_id: str) -> Optional[Email]:
         """Get details for a specific email."""
         try:
@@ -65,20 +277,26 @@ class GmailClient:
                 userId="me",
                 id=message_id,
                 format="metadata",
-                metadataHeaders=["From", "To", "Subject", "Date"],
+                metadataHeaders=self.METADATA_HEADERS,
+                fields=self.METADATA_FIELDS,
             ).execute()
 
-            headers = {h["name"]: h["value"] for h in message.get("payload", {}).get("headers", [])}
+            return self._parse_email_metadata(message)
+        except Exception as e:
+            logger.error(f"Error getting email details: {e}")
+            return None
+
+    def _parse_email_metadata(self, message: dict) -> Optional[Email]:
+        """Build an Email from a metadata-format message."""
+        try:
+            headers = parse_headers(message.get("payload", {}).get("headers", ()))
 
             # Parse date
             date_str = headers.get("Date", "")
-            try:
-                date = parsedate_to_datetime(date_str)
-            except Exception:
-                date = datetime.utcnow()
+            date = _parse_date(date_str) or datetime.utcnow()
 
-            return Email(
-                id=message_id,
+            return Email.model_construct(
+                id=message["id"],
                 subject=headers.get("Subject", "No Subject"),
                 sender=headers.get("From", ""),
                 recipient=headers.get("To", ""),
@@ -86,20 +304,25 @@ class GmailClient:
                 date=date,
             )
         except Exception as e:
-            logger.error(f"Error getting email details: {e}")
+            logger.error(f"Error parsing email details: {e}")
             return None
 
     def get_email_thread(self, thread_id: str) -> list[Email]:
         """Get all emails in a thread."""
         try:
+            # The thread response already carries each message's headers,
+            # so no per-message fetch is needed
             thread = self.service.users().threads().get(
                 userId="me",
                 id=thread_id,
+                format="metadata",
+                metadataHeaders=self.METADATA_HEADERS,
+                fields=f"messages({self.METADATA_FIELDS})",
             ).execute()
 
             emails = []
             for message in thread.get("messages", []):
-                email = self._get_email_details(message["id"])
+                email = self._parse_email_metadata(message)
                 if email:
                     emails.append(email)
 
@@ -108,7 +331,7 @@ class GmailClient:
             logger.error(f"Error getting email thread: {e}")
             return []
 
-    def get_full_email(self, message_id: str) -> Optional[dict]:
+    def get_full_email(self, message_id: str, fetch_bodies: bool = True) -> Optional[dict]:
         """
         Get full email content including body and attachment metadata.
 
@@ -116,146 +339,130 @@ class GmailClient:
         - id, thread_id, subject, sender, recipients, date
         - body_text, body_html
         - attachments: list of {filename, mime_type, size, attachment_id}
+
+        With fetch_bodies=False the body parts aren't decoded and body_text
+        and body_html are left empty.
         """
         try:
             message = self.service.users().messages().get(
                 userId="me",
                 id=message_id,
                 format="full",
+                fields=self.FULL_FIELDS,
             ).execute()
 
-            headers = {h["name"]: h["value"] for h in message.get("payload", {}).get("headers", [])}
+            return _parse_full_message(message, fetch_bodies)
 
-            # Parse date
-            date_str = headers.get("Date", "")
-            try:
-                date = parsedate_to_datetime(date_str)
-            except Exception:
-                date = datetime.utcnow()
-
-            # Parse recipients
-            recipients = []
-            to_header = headers.get("To", "")
-            for addr in to_header.split(","):
-                addr = addr.strip()
-                match = re.search(r'<([^>]+)>', addr)
-                if match:
-                    recipients.append(match.group(1))
-                elif '@' in addr:
-                    recipients.append(addr)
-
-            # Extract body
-            body_text, body_html = self._extract_body(message.get("payload", {}))
-
-            # Extract attachment info
-            attachments = self._get_attachment_info(message.get("payload", {}))
+        except Exception as e:
+            logger.error(f"Error getting full email: {e}")
+            return None
 
-            return {
-                "id": message_id,
-                "thread_id": message.get("threadId", ""),
-                "subject": headers.get("Subject", "No Subject"),
-                "sender": headers.get("From", ""),
-                "recipients": recipients,
-                "date": date,
-                "body_text": body_text,
-                "body_html": body_html,
-                "snippet": message.get("snippet", ""),
-                "attachments": attachments,
-                "labels": message.get("labelIds", []),
-            }
+    async def get_full_email_async(self, message_id: str, fetch_bodies: bool = True) -> Optional[dict]:
+        """
+        Async get_full_email that keeps the event loop free.
 
+        The fetch runs in a thread on its own connection, and body decoding
+        and HTML stripping run in the shared process pool.
+        """
+        try:
+            message = await asyncio.to_thread(
+                self.service.users().messages().get(
+                    userId="me",
+                    id=message_id,
+                    format="full",
+                    fields=self.FULL_FIELDS,
+                ).execute,
+                http=self._new_http(),
+            )
         except Exception as e:
             logger.error(f"Error getting full email: {e}")
             return None
 
-    def _extract_body(self, payload: dict) -> tuple[str, Optional[str]]:
-        """Extract plain text and HTML body from email payload."""
-        body_text = ""
-        body_html = None
-
-        def extract_parts(parts):
-            nonlocal body_text, body_html
-
-            for part in parts:
-                mime_type = part.get("mimeType", "")
-                body_data = part.get("body", {}).get("data")
-
-                if mime_type == "text/plain" and body_data:
-                    body_text = base64.urlsafe_b64decode(body_data).decode("utf-8", errors="ignore")
-                elif mime_type == "text/html" and body_data:
-                    body_html = base64.urlsafe_b64decode(body_data).decode("utf-8", errors="ignore")
-                elif "parts" in part:
-                    extract_parts(part["parts"])
-
-        # Handle single-part messages
-        if payload.get("body", {}).get("data"):
-            mime_type = payload.get("mimeType", "")
-            body_data = payload["body"]["data"]
-            decoded = base64.urlsafe_b64decode(body_data).decode("utf-8", errors="ignore")
-
-            if mime_type == "text/html":
-                body_html = decoded
-                # Strip HTML tags for plain text
-                body_text = re.sub(r'<[^>]+>', '', decoded)
-            else:
-                body_text = decoded
+        return await run_in_process_pool(_parse_full_message, message, fetch_bodies)
 
-        # Handle multi-part messages
-        if "parts" in payload:
-            extract_parts(payload["parts"])
+    def _new_http(self) -> AuthorizedHttp:
+        """Build a dedicated authorized connection (httplib2 isn't thread-safe)."""
+        return AuthorizedHttp(self.credentials, http=httplib2.Http())
 
-        return body_text, body_html
+    def download_attachment_raw(
+        self,
+        message_id: str,
+        attachment_id: str,
+        http: Optional[AuthorizedHttp] = None,
+    ) -> Optional[str]:
+        """
+        Download an email attachment without decoding it.
 
-    def _get_attachment_info(self, payload: dict) -> list[dict]:
-        """Get metadata for all attachments in an email."""
-        attachments = []
+        For pass-through callers that forward base64 content as-is.
 
-        def find_attachments(parts):
-            for part in parts:
-                filename = part.get("filename", "")
-                body = part.get("body", {})
+        Args:
+            message_id: The email message ID
+            attachment_id: The attachment ID
+            http: Connection to use instead of the service's shared one
 
-                if filename and body.get("attachmentId"):
-                    attachments.append({
-                        "filename": filename,
-                        "mime_type": part.get("mimeType", ""),
-                        "size": body.get("size", 0),
-                        "attachment_id": body["attachmentId"],
-                    })
+        Returns:
+            Attachment content as a base64url string, or None on error
+        """
+        try:
+            attachment = self.service.users().messages().attachments().get(
+                userId="me",
+                messageId=message_id,
+                id=attachment_id,
+                fields="data",
+            ).execute(http=http)
 
-                if "parts" in part:
-                    find_attachments(part["parts"])
+            return attachment.get("data") or None
 
-        find_attachments(payload.get("parts", []))
-        return attachments
+        except Exception as e:
+            logger.error(f"Error downloading attachment: {e}")
+            return None
 
-    def download_attachment(self, message_id: str, attachment_id: str) -> Optional[bytes]:
+    def download_attachment(
+        self,
+        message_id: str,
+        attachment_id: str,
+        http: Optional[AuthorizedHttp] = None,
+    ) -> Optional[bytes]:
         """
         Download an email attachment.
 
         Args:
             message_id: The email message ID
             attachment_id: The attachment ID
+            http: Connection to use instead of the service's shared one
 
         Returns:
             Attachment content as bytes, or None on error
         """
-        try:
-            attachment = self.service.users().messages().attachments().get(
-                userId="me",
-                messageId=message_id,
-                id=attachment_id,
-            ).execute()
-
-            data = attachment.get("data")
-            if data:
-                return base64.urlsafe_b64decode(data)
+        data = self.download_attachment_raw(message_id, attachment_id, http)
+        if not data:
             return None
 
+        try:
+            return base64.urlsafe_b64decode(data)
         except Exception as e:
-            logger.error(f"Error downloading attachment: {e}")
+            logger.error(f"Error decoding attachment: {e}")
             return None
 
+    async def download_attachments_async(
+        self,
+        pairs: list[tuple[str, str]],
+    ) -> list[Optional[bytes]]:
+        """
+        Download several attachments concurrently.
+
+        Args:
+            pairs: (message_id, attachment_id) tuples
+
+        Returns:
+            Attachment contents in the order of pairs (None for failures)
+        """
+        # Each download gets its own connection so the threads don't share one
+        return await asyncio.gather(*(
+            asyncio.to_thread(self.download_attachment, message_id, attachment_id, self._new_http())
+            for message_id, attachment_id in pairs
+        ))
+
     def search_emails_with_attachments(
         self,
         email_address: str,
@@ -265,7 +472,8 @@ class GmailClient:
         """
         Search for emails with attachments involving a specific person.
 
-        Returns list of full email dicts with attachment info.
+        Returns list of full email dicts with attachment info (bodies are
+        not decoded).
         """
         # Build query with attachment filter
         date_filter = (datetime.utcnow() - timedelta(days=days_back)).strftime("%Y/%m/%d")
@@ -276,13 +484,19 @@ class GmailClient:
                 userId="me",
                 q=query,
                 maxResults=max_results,
+                fields="messages/id",
             ).execute()
 
-            messages = results.get("messages", [])
+            messages = self._batch_get_messages(
+                [msg["id"] for msg in results.get("messages", [])],
+                format="full",
+                fields=self.FULL_FIELDS,
+            )
             emails_with_attachments = []
 
-            for msg in messages:
-                full_email = self.get_full_email(msg["id"])
+            for message in messages:
+                # Only attachment info is needed here; skip decoding bodies
+                full_email = _parse_full_message(message, fetch_bodies=False)
                 if full_email and full_email["attachments"]:
                     emails_with_attachments.append(full_email)
 
@@ -310,17 +524,18 @@ class GmailClient:
             results = self.service.users().threads().list(
                 userId="me",
                 q=query,
-                maxResults=max_threads,
+                maxResults=min(max_threads, self.MAX_LIST_RESULTS),
+                fields="threads/id",
             ).execute()
 
-            threads_data = []
-            for thread_info in results.get("threads", []):
-                thread = self.service.users().threads().get(
-                    userId="me",
-                    id=thread_info["id"],
-                    format="full",
-                ).execute()
+            threads = self._batch_get_threads(
+                [thread_info["id"] for thread_info in results.get("threads", [])],
+                format="full",
+                fields=f"messages({self.FULL_FIELDS})",
+            )
 
+            threads_data = []
+            for thread in threads:
                 thread_emails = []
                 for message in thread.get("messages", []):
                     full_email = self._parse_thread_message(message)
@@ -339,16 +554,13 @@ class GmailClient:
     def _parse_thread_message(self, message: dict) -> Optional[dict]:
         """Parse a message from a thread response."""
         try:
-            headers = {h["name"]: h["value"] for h in message.get("payload", {}).get("headers", [])}
+            headers = parse_headers(message.get("payload", {}).get("headers", ()))
 
             date_str = headers.get("Date", "")
-            try:
-                date = parsedate_to_datetime(date_str)
-            except Exception:
-                date = datetime.utcnow()
+            date = _parse_date(date_str) or datetime.utcnow()
 
-            body_text, body_html = self._extract_body(message.get("payload", {}))
-            attachments = self._get_attachment_info(message.get("payload", {}))
+            body_text, body_html = _extract_body(message.get("payload", {}))
+            attachments = _get_attachment_info(message.get("payload", {}))
 
             return {
                 "id": message["id"],
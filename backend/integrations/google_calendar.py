@@ -1,17 +1,33 @@
 """Google Calendar API client with attachment support."""
 
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.http import MediaIoBaseDownload
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import BinaryIO, Optional, Union
 from models import Meeting, Attendee
 from config import get_settings
+from google_services import build_google_service
+import asyncio
+import httplib2
 import io
 import logging
+import sys
 
 logger = logging.getLogger(__name__)
 
+# fromisoformat only accepts a trailing "Z" from 3.11 on
+_NEEDS_Z_REWRITE = sys.version_info < (3, 11)
+
+
+@lru_cache(maxsize=2048)
+def _parse_event_time(value: str) -> datetime:
+    """Parse an event dateTime; the same events come back on every poll."""
+    if _NEEDS_Z_REWRITE and value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
 
 class GoogleCalendarClient:
     """Client for interacting with Google Calendar API with attachment support."""
@@ -22,6 +38,20 @@ class GoogleCalendarClient:
         "https://www.googleapis.com/auth/drive.readonly",
     ]
 
+    # Partial-response selector: only the event fields _parse_event and the
+    # attachment helpers read
+    EVENT_FIELDS = "id,summary,description,start,end,attendees,hangoutLink,conferenceData,location,attachments"
+    EVENT_LIST_FIELDS = f"nextPageToken,items({EVENT_FIELDS})"
+
+    # Largest page events.list will return
+    MAX_PAGE_SIZE = 2500
+
+    # Drive accepts up to 100 calls per batch request
+    DRIVE_BATCH_SIZE = 100
+
+    # Bytes per media request when streaming an attachment into a file
+    DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
     def __init__(self, access_token: str, refresh_token: Optional[str] = None):
         settings = get_settings()
         self.credentials = Credentials(
@@ -31,15 +61,51 @@ class GoogleCalendarClient:
             client_id=settings.google_client_id,
             client_secret=settings.google_client_secret,
         )
-        self.service = build("calendar", "v3", credentials=self.credentials)
+        # Calendar and Drive calls share one authorized keep-alive connection
+        # (both live on www.googleapis.com)
+        self._http = AuthorizedHttp(self.credentials, http=httplib2.Http())
+        self.service = build_google_service("calendar", "v3", http=self._http)
         self._drive_service = None
 
     def _get_drive_service(self):
-        """Get or create Google Drive service for attachment downloads."""
-        if not self._drive_service:
-            self._drive_service = build("drive", "v3", credentials=self.credentials)
+        """
+        Get or create Google Drive service for attachment downloads.
+
+        Built once per client on first use. The discovery document behind it
+        is cached process-wide, so this is cheap for returning users. The
+        service itself is not shared across clients because it is bound to
+        this client's httplib2 connection, which isn't thread-safe.
+        """
+        if self._drive_service is None:
+            self._drive_service = build_google_service("drive", "v3", http=self._http)
         return self._drive_service
 
+    def _list_events(self, limit: Optional[int] = None, **params) -> list[dict]:
+        """
+        List primary-calendar events, following nextPageToken.
+
+        Pages are as large as the API allows, so most ranges take one call.
+        Stops once limit events have been collected.
+        """
+        page_size = min(limit, self.MAX_PAGE_SIZE) if limit else self.MAX_PAGE_SIZE
+        events = self.service.events()
+        request = events.list(
+            calendarId="primary",
+            maxResults=page_size,
+            fields=self.EVENT_LIST_FIELDS,
+            **params,
+        )
+
+        items = []
+        while request is not None:
+            response = request.execute()
+            items.extend(response.get("items", []))
+            if limit and len(items) >= limit:
+                return items[:limit]
+            request = events.list_next(request, response)
+
+        return items
+
     def get_upcoming_meetings(
         self,
         days_ahead: int = 7,
@@ -50,16 +116,13 @@ class GoogleCalendarClient:
         time_min = now.isoformat() + "Z"
         time_max = (now + timedelta(days=days_ahead)).isoformat() + "Z"
 
-        events_result = self.service.events().list(
-            calendarId="primary",
+        events = self._list_events(
+            limit=max_results,
             timeMin=time_min,
             timeMax=time_max,
-            maxResults=max_results,
             singleEvents=True,
             orderBy="startTime",
-        ).execute()
-
-        events = events_result.get("items", [])
+        )
         meetings = []
 
         for event in events:
@@ -75,6 +138,7 @@ class GoogleCalendarClient:
             event = self.service.events().get(
                 calendarId="primary",
                 eventId=meeting_id,
+                fields=self.EVENT_FIELDS,
             ).execute()
 
             return self._parse_event(event)
@@ -91,13 +155,15 @@ class GoogleCalendarClient:
         if "dateTime" not in start:
             return None
 
-        attendees = []
-        for attendee in event.get("attendees", []):
-            attendees.append(Attendee(
+        # The API returns well-typed fields, so skip pydantic validation
+        attendees = [
+            Attendee.model_construct(
                 email=attendee.get("email", ""),
                 name=attendee.get("displayName"),
                 response_status=attendee.get("responseStatus"),
-            ))
+            )
+            for attendee in event.get("attendees", [])
+        ]
 
         # Extract meeting link
         meeting_link = None
@@ -110,12 +176,12 @@ class GoogleCalendarClient:
                     meeting_link = ep.get("uri")
                     break
 
-        return Meeting(
+        return Meeting.model_construct(
             id=event["id"],
             title=event.get("summary", "Untitled Meeting"),
             description=event.get("description"),
-            start_time=datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00")),
-            end_time=datetime.fromisoformat(end["dateTime"].replace("Z", "+00:00")),
+            start_time=_parse_event_time(start["dateTime"]),
+            end_time=_parse_event_time(end["dateTime"]),
             attendees=attendees,
             location=event.get("location"),
             meeting_link=meeting_link,
@@ -131,6 +197,7 @@ class GoogleCalendarClient:
             event = self.service.events().get(
                 calendarId="primary",
                 eventId=event_id,
+                fields=self.EVENT_FIELDS,
             ).execute()
 
             meeting = self._parse_event(event)
@@ -158,27 +225,46 @@ class GoogleCalendarClient:
             logger.error(f"Error getting event with attachments: {e}")
             return None
 
-    def download_attachment(self, file_id: str) -> Optional[tuple[bytes, str, str]]:
+    def _new_http(self) -> AuthorizedHttp:
+        """Build a dedicated authorized connection (httplib2 isn't thread-safe)."""
+        return AuthorizedHttp(self.credentials, http=httplib2.Http())
+
+    def download_attachment(
+        self,
+        file_id: str,
+        http: Optional[AuthorizedHttp] = None,
+        dest: Optional[BinaryIO] = None,
+        filename: Optional[str] = None,
+        mime_type: Optional[str] = None,
+    ) -> Optional[tuple[Union[bytes, BinaryIO], str, str]]:
         """
         Download a calendar attachment from Google Drive.
 
         Args:
             file_id: The Google Drive file ID
+            http: Connection to use instead of the service's shared one
+            dest: Writable binary file to stream the content into (e.g. a
+                SpooledTemporaryFile) instead of holding it all in memory
+            filename: The attachment's title from the event, if known
+            mime_type: The attachment's mimeType from the event, if known
 
         Returns:
-            Tuple of (content_bytes, filename, mime_type) or None on error
+            Tuple of (content, filename, mime_type) or None on error.
+            content is the bytes, or dest itself (rewound) when one is given.
         """
         try:
             drive_service = self._get_drive_service()
 
-            # Get file metadata
-            file_metadata = drive_service.files().get(
-                fileId=file_id,
-                fields='name,mimeType',
-            ).execute()
+            # Event attachments already carry title and mimeType; only look
+            # the file up when the caller doesn't have them
+            if filename is None or not mime_type:
+                file_metadata = drive_service.files().get(
+                    fileId=file_id,
+                    fields='name,mimeType',
+                ).execute(http=http)
 
-            filename = file_metadata.get('name', 'unknown')
-            mime_type = file_metadata.get('mimeType', '')
+                filename = file_metadata.get('name', 'unknown')
+                mime_type = file_metadata.get('mimeType', '')
 
             # Handle Google Workspace files (export to different format)
             google_mime_types = {
@@ -191,28 +277,110 @@ class GoogleCalendarClient:
                 content = drive_service.files().export(
                     fileId=file_id,
                     mimeType=google_mime_types[mime_type],
-                ).execute()
+                ).execute(http=http)
 
                 if isinstance(content, str):
                     content = content.encode('utf-8')
 
+                if dest is not None:
+                    dest.write(content)
+                    dest.seek(0)
+                    return dest, filename, mime_type
                 return content, filename, mime_type
 
-            # Download regular file
+            # Download regular file, chunk by chunk, straight into dest
             request = drive_service.files().get_media(fileId=file_id)
-            file_buffer = io.BytesIO()
-            downloader = MediaIoBaseDownload(file_buffer, request)
+            if http is not None:
+                request.http = http
+            file_buffer = dest if dest is not None else io.BytesIO()
+            downloader = MediaIoBaseDownload(file_buffer, request, chunksize=self.DOWNLOAD_CHUNK_SIZE)
 
             done = False
             while not done:
                 _, done = downloader.next_chunk()
 
+            if dest is not None:
+                dest.seek(0)
+                return dest, filename, mime_type
             return file_buffer.getvalue(), filename, mime_type
 
         except Exception as e:
             logger.error(f"Error downloading attachment: {e}")
             return None
 
+    def _batch_get_file_metadata(self, file_ids: list[str]) -> dict[str, dict]:
+        """Fetch name and mimeType for several Drive files in batched requests."""
+        drive_service = self._get_drive_service()
+        metadata = {}
+
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"Error getting attachment metadata {request_id}: {exception}")
+            else:
+                metadata[request_id] = response
+
+        unique_ids = list(dict.fromkeys(file_ids))
+        try:
+            for i in range(0, len(unique_ids), self.DRIVE_BATCH_SIZE):
+                batch = drive_service.new_batch_http_request(callback=on_response)
+                for file_id in unique_ids[i:i + self.DRIVE_BATCH_SIZE]:
+                    batch.add(
+                        drive_service.files().get(fileId=file_id, fields='name,mimeType'),
+                        request_id=file_id,
+                    )
+                batch.execute(http=self._new_http())
+        except Exception as e:
+            # Files without metadata fall back to a per-download lookup
+            logger.error(f"Error batching attachment metadata: {e}")
+
+        return metadata
+
+    async def download_attachments_bulk(
+        self,
+        file_ids: list[str],
+        attachments: Optional[list[dict]] = None,
+    ) -> list[Optional[tuple[bytes, str, str]]]:
+        """
+        Download several calendar attachments concurrently.
+
+        Args:
+            file_ids: Google Drive file IDs
+            attachments: Matching attachment dicts (filename, mime_type) from
+                the event, letting each download skip its metadata lookup
+
+        Returns results in the order of file_ids (None for failures).
+        """
+        hints = attachments or [{}] * len(file_ids)
+
+        # Look up any missing names/types in one batched request rather than
+        # one files.get per download
+        missing = [
+            file_id for file_id, hint in zip(file_ids, hints)
+            if hint.get("filename") is None or not hint.get("mime_type")
+        ]
+        if missing:
+            metadata = await asyncio.to_thread(self._batch_get_file_metadata, missing)
+            hints = [
+                {
+                    "filename": metadata[file_id].get("name", "unknown"),
+                    "mime_type": metadata[file_id].get("mimeType", ""),
+                } if file_id in metadata else hint
+                for file_id, hint in zip(file_ids, hints)
+            ]
+
+        # Each download gets its own connection so the threads don't share one
+        return await asyncio.gather(*(
+            asyncio.to_thread(
+                self.download_attachment,
+                file_id,
+                self._new_http(),
+                None,
+                hint.get("filename"),
+                hint.get("mime_type"),
+            )
+            for file_id, hint in zip(file_ids, hints)
+        ))
+
     def get_meetings_in_range(
         self,
         start_time: datetime,
@@ -231,16 +399,15 @@ class GoogleCalendarClient:
             List of meeting dicts with optional attachments
         """
         try:
-            events_result = self.service.events().list(
-                calendarId="primary",
+            events = self._list_events(
                 timeMin=start_time.isoformat() + "Z",
                 timeMax=end_time.isoformat() + "Z",
                 singleEvents=True,
                 orderBy="startTime",
-            ).execute()
+            )
 
             meetings = []
-            for event in events_result.get("items", []):
+            for event in events:
                 meeting = self._parse_event(event)
                 if not meeting:
                     continue
@@ -290,16 +457,15 @@ class GoogleCalendarClient:
         time_max = (now + timedelta(hours=hours_ahead)).isoformat() + "Z"
 
         try:
-            events_result = self.service.events().list(
-                calendarId="primary",
+            events = self._list_events(
                 timeMin=time_min,
                 timeMax=time_max,
                 singleEvents=True,
                 orderBy="startTime",
-            ).execute()
+            )
 
             meetings = []
-            for event in events_result.get("items", []):
+            for event in events:
                 if event["id"] in exclude_ids:
                     continue
 
@@ -324,6 +490,7 @@ class GoogleCalendarClient:
                 calendarId="primary",
                 eventId=recurring_event_id,
                 maxResults=max_instances,
+                fields=self.EVENT_LIST_FIELDS,
             ).execute()
 
             meetings = []
@@ -4,20 +4,240 @@ from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from models import SlackMessage
 from typing import Optional
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import logging
+import time
 import httpx
+import requests
 
 logger = logging.getLogger(__name__)
 
+try:
+    # The async Slack client needs aiohttp; without it the async methods
+    # run the sync client in a thread
+    import aiohttp
+    from slack_sdk.web.async_client import AsyncWebClient
+except ImportError:
+    aiohttp = None
+    AsyncWebClient = None
+
+try:
+    # httpx only speaks HTTP/2 when the h2 package is installed
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+try:
+    # httpx decodes brotli only when a brotli package is installed
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+
+def _ts_key(ts: str):
+    """
+    Pack a Slack ts ("1712345678.123456") into one int for dedup sets.
+
+    Ints are smaller and hash faster than the strings; anything that isn't a
+    well-formed ts is returned unchanged.
+    """
+    seconds, _, micros = ts.partition(".")
+    if seconds.isdigit() and len(micros) == 6 and micros.isdigit():
+        return int(seconds) * 1_000_000 + int(micros)
+    return ts
+
+
+def _slack_file_dict(file: dict, include_shares: bool = False) -> dict:
+    """
+    Build the file metadata dict shared by the search, DM and listing methods.
+
+    include_shares adds the channels/ims the file was shared to.
+    """
+    get = file.get
+    file_dict = {
+        "id": get("id", ""),
+        "name": get("name", "unknown"),
+        "title": get("title", ""),
+        "filetype": get("filetype", ""),
+        "mimetype": get("mimetype", ""),
+        "url_private": get("url_private", ""),
+        "url_private_download": get("url_private_download", ""),
+        "size": get("size", 0),
+        "user": get("user", ""),
+        "timestamp": get("timestamp", 0),
+    }
+    if include_shares:
+        file_dict["channels"] = get("channels", [])
+        file_dict["ims"] = get("ims", [])
+    return file_dict
+
+
+# Shared "files" value for the (common) messages without attachments
+_NO_FILES: tuple = ()
+
+
+def _slack_file_dicts(files: Optional[list]):
+    """File dicts for a message's files; the shared empty tuple when it has none."""
+    if not files:
+        return _NO_FILES
+    return [_slack_file_dict(file) for file in files]
+
 
 class SlackClient:
     """Client for interacting with Slack API with file support."""
 
+    # Short-lived cache for per-user listing calls (DMs, files.list), shared
+    # across instances since a client is built per request. Keyed by token
+    # so entries never cross users.
+    RESPONSE_CACHE_TTL = 300  # seconds
+    RESPONSE_CACHE_MAX_ENTRIES = 256
+    _response_cache: dict[tuple, tuple[float, list]] = {}
+
+    # channel_type by (is_im << 2 | is_private << 1 | is_mpim): a DM wins,
+    # then private channels and multi-person DMs are groups
+    _CHANNEL_TYPES = ("channel", "group", "group", "group", "dm", "dm", "dm", "dm")
+
+    # User info by (token, user ID), shared across instances like the
+    # caches below; profile edits show up within the TTL. A token's
+    # users.list prewarm is likewise done once per TTL, not per client
+    USER_CACHE_TTL = 3600  # seconds
+    USER_CACHE_MAX_ENTRIES = 50_000
+    USER_PREWARM_MAX_TOKENS = 1024
+    _user_cache: dict[tuple[str, str], tuple[float, dict]] = {}
+    _users_prewarmed_at: dict[str, float] = {}
+
+    # users.list pages fetched to prewarm the user cache (200 users each)
+    USER_PREWARM_PAGE_SIZE = 200
+    USER_PREWARM_MAX_PAGES = 10
+
+    # Concurrent users.info calls for authors the prewarm didn't cover
+    USER_LOOKUP_WORKERS = 16
+
+    # Largest file download_file will hold in memory
+    MAX_DOWNLOAD_BYTES = 100 * 1024 * 1024
+
+    # Read size for streamed file downloads
+    DOWNLOAD_CHUNK_SIZE = 100 * 1024
+
+    # users.lookupByEmail results (None for unknown emails), keyed by
+    # (token, email) and shared across instances like the response cache
+    EMAIL_CACHE_TTL = 3600  # seconds
+    EMAIL_CACHE_MAX_ENTRIES = 1024
+    _email_cache: dict[tuple[str, str], tuple[float, Optional[dict]]] = {}
+
+    # DM channel IDs by (token, user ID); a pair's DM channel doesn't change
+    DM_CHANNEL_CACHE_TTL = 86400  # seconds
+    DM_CHANNEL_CACHE_MAX_ENTRIES = 1024
+    _dm_channel_cache: dict[tuple[str, str], tuple[float, str]] = {}
+
+    # Keep-alive session for download_file_sync, shared across instances
+    # (the token goes in per-request headers)
+    _sync_session: Optional[requests.Session] = None
+
     def __init__(self, access_token: str):
+        # Responses are decoded with the SDK's own json.loads. It has no
+        # decoder hook, and our responses are small (search pages of <= 30
+        # matches), so the time goes to the network rather than parsing
         self.client = WebClient(token=access_token)
         self.token = access_token
-        self._user_cache: dict[str, dict] = {}
+        self._http: Optional[httpx.AsyncClient] = None
+        self._aclient: Optional["AsyncWebClient"] = None
+        self._aiohttp: Optional["aiohttp.ClientSession"] = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Get or create the pooled HTTP client used for file downloads."""
+        if self._http is None:
+            # HTTP/2 multiplexes concurrent downloads from files.slack.com
+            # over one connection
+            self._http = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {self.token}",
+                    # Compressible files (logs, JSON, source) cross the wire
+                    # compressed; binaries come back as-is
+                    "Accept-Encoding": _ACCEPT_ENCODING,
+                },
+                timeout=30,
+                follow_redirects=True,
+                http2=_HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=30),
+            )
+        return self._http
+
+    def _get_cached_response(self, key: tuple) -> Optional[list]:
+        """Return a cached listing if it's still fresh."""
+        entry = self._response_cache.get((self.token, *key))
+        if entry and time.monotonic() - entry[0] < self.RESPONSE_CACHE_TTL:
+            return entry[1]
+        return None
+
+    def _cache_response(self, key: tuple, value: list) -> None:
+        """Cache a successful listing, evicting the oldest entry when full."""
+        cache = self._response_cache
+        if len(cache) >= self.RESPONSE_CACHE_MAX_ENTRIES:
+            del cache[next(iter(cache))]
+        cache[(self.token, *key)] = (time.monotonic(), value)
+
+    def _get_aiohttp_session(self) -> "aiohttp.ClientSession":
+        """Get or create the aiohttp session shared by async API calls and downloads."""
+        if self._aiohttp is None:
+            self._aiohttp = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=30),
+                connector=aiohttp.TCPConnector(limit=64, limit_per_host=32, ttl_dns_cache=300),
+            )
+        return self._aiohttp
+
+    def _get_async_client(self) -> Optional["AsyncWebClient"]:
+        """Get or create the AsyncWebClient (None when aiohttp isn't installed)."""
+        if AsyncWebClient is None:
+            return None
+        if self._aclient is None:
+            # One aiohttp session for every async API call this client makes
+            self._aclient = AsyncWebClient(token=self.token, session=self._get_aiohttp_session())
+        return self._aclient
+
+    def lookup_user_by_email(self, email: str) -> Optional[dict]:
+        """
+        Resolve an email to its raw Slack user object, or None if there's none.
+
+        Results (including "no such user") are cached per token, so the
+        search, DM and file paths that each start from the same email share
+        one users.lookupByEmail call. Other failures aren't cached.
+        """
+        key = (self.token, email)
+        entry = self._email_cache.get(key)
+        if entry and time.monotonic() - entry[0] < self.EMAIL_CACHE_TTL:
+            return entry[1]
+
+        try:
+            response = self.client.users_lookupByEmail(email=email)
+            user = response.get("user") or None
+        except SlackApiError as e:
+            if e.response.get("error") != "users_not_found":
+                logger.error(f"Error looking up Slack user by email: {e}")
+                return None
+            user = None
+        except Exception as e:
+            logger.error(f"Error looking up Slack user by email: {e}")
+            return None
+
+        cache = self._email_cache
+        if key not in cache and len(cache) >= self.EMAIL_CACHE_MAX_ENTRIES:
+            del cache[next(iter(cache))]
+        cache[key] = (time.monotonic(), user)
+        return user
+
+    async def aclose(self) -> None:
+        """Close the pooled download and async API connections."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        self._aclient = None
+        if self._aiohttp is not None:
+            await self._aiohttp.close()
+            self._aiohttp = None
 
     def search_messages_mentioning(
         self,
@@ -34,67 +254,193 @@ class SlackClient:
                 sort_dir="desc",
             )
 
-            messages = []
-            matches = response.get("messages", {}).get("matches", [])
-
-            for match in matches:
-                messages.append(SlackMessage(
+            # Fields come straight from the API's strings, so skip validation
+            return [
+                SlackMessage.model_construct(
                     text=match.get("text", ""),
                     user=match.get("username", match.get("user", "Unknown")),
                     channel=match.get("channel", {}).get("name", "Unknown"),
                     timestamp=match.get("ts", ""),
-                ))
-
-            return messages
+                )
+                for match in response.get("messages", {}).get("matches", [])
+            ]
         except SlackApiError as e:
             logger.error(f"Slack API error: {e}")
             return []
 
+    def _get_cached_user(self, user_id: str) -> Optional[dict]:
+        """Return cached user info if it's still fresh."""
+        entry = self._user_cache.get((self.token, user_id))
+        if entry and time.monotonic() - entry[0] < self.USER_CACHE_TTL:
+            return entry[1]
+        return None
+
+    def _cache_user(self, user_id: str, user_info: dict) -> None:
+        """Cache user info, evicting the oldest entry when full."""
+        cache = self._user_cache
+        key = (self.token, user_id)
+        if key not in cache and len(cache) >= self.USER_CACHE_MAX_ENTRIES:
+            del cache[next(iter(cache))]
+        cache[key] = (time.monotonic(), user_info)
+
+    @property
+    def _users_prewarmed(self) -> bool:
+        """Whether this token's users.list prewarm ran within the user cache TTL."""
+        prewarmed_at = self._users_prewarmed_at.get(self.token)
+        return prewarmed_at is not None and time.monotonic() - prewarmed_at < self.USER_CACHE_TTL
+
+    @classmethod
+    def channel_type(cls, channel_info: dict) -> str:
+        """Classify a search match's channel as "dm", "group" or "channel"."""
+        index = (
+            bool(channel_info.get("is_im")) << 2
+            | bool(channel_info.get("is_private")) << 1
+            | bool(channel_info.get("is_mpim"))
+        )
+        return cls._CHANNEL_TYPES[index]
+
+    @staticmethod
+    def _build_user_info(user_id: str, user: dict) -> dict:
+        """Build the cached user-info dict from a users.info/users.list member."""
+        profile = user.get("profile", {})
+        return {
+            "id": user_id,
+            "name": user.get("real_name", user.get("name", "Unknown")),
+            "email": profile.get("email"),
+            "display_name": profile.get("display_name"),
+            "title": profile.get("title"),
+        }
+
+    def _prewarm_users(self) -> None:
+        """
+        Fill the user cache from users.list.
+
+        A few paginated calls replace one users.info round-trip per message
+        author. Capped at USER_PREWARM_MAX_PAGES so huge workspaces fall back
+        to per-user lookups for the rest.
+        """
+        # Marked up front so concurrent clients for the token don't repeat it
+        prewarmed = self._users_prewarmed_at
+        prewarmed.pop(self.token, None)
+        if len(prewarmed) >= self.USER_PREWARM_MAX_TOKENS:
+            del prewarmed[next(iter(prewarmed))]
+        prewarmed[self.token] = time.monotonic()
+        cursor = None
+        try:
+            for _ in range(self.USER_PREWARM_MAX_PAGES):
+                response = self.client.users_list(limit=self.USER_PREWARM_PAGE_SIZE, cursor=cursor)
+                for user in response.get("members", []):
+                    user_id = user.get("id")
+                    if user_id:
+                        self._cache_user(user_id, self._build_user_info(user_id, user))
+
+                cursor = response.get("response_metadata", {}).get("next_cursor")
+                if not cursor:
+                    break
+        except SlackApiError as e:
+            logger.error(f"Error listing Slack users: {e}")
+
     def get_user_info(self, user_id: str) -> Optional[dict]:
         """Get information about a Slack user."""
-        if user_id in self._user_cache:
-            return self._user_cache[user_id]
+        # Bot and system messages carry no user ID; don't spend a call on them
+        if not user_id:
+            return None
+
+        cached = self._get_cached_user(user_id)
+        if cached is not None:
+            return cached
+
+        # First miss: load the workspace directory in bulk
+        if not self._users_prewarmed:
+            self._prewarm_users()
+            cached = self._get_cached_user(user_id)
+            if cached is not None:
+                return cached
 
         try:
             response = self.client.users_info(user=user_id)
-            user = response.get("user", {})
-            user_info = {
-                "id": user_id,
-                "name": user.get("real_name", user.get("name", "Unknown")),
-                "email": user.get("profile", {}).get("email"),
-                "display_name": user.get("profile", {}).get("display_name"),
-                "title": user.get("profile", {}).get("title"),
-            }
-            self._user_cache[user_id] = user_info
+            user_info = self._build_user_info(user_id, response.get("user", {}))
+            self._cache_user(user_id, user_info)
+            return user_info
+        except SlackApiError:
+            return None
+
+    async def aget_user_info(self, user_id: str) -> Optional[dict]:
+        """Async get_user_info; falls back to the sync version without aiohttp."""
+        if not user_id:
+            return None
+
+        cached = self._get_cached_user(user_id)
+        if cached is not None:
+            return cached
+
+        aclient = self._get_async_client()
+        if aclient is None or not self._users_prewarmed:
+            # The one-off users.list prewarm stays on the sync client
+            return await asyncio.to_thread(self.get_user_info, user_id)
+
+        try:
+            response = await aclient.users_info(user=user_id)
+            user_info = self._build_user_info(user_id, response.get("user", {}))
+            self._cache_user(user_id, user_info)
             return user_info
         except SlackApiError:
             return None
 
+    def _resolve_users(self, user_ids) -> None:
+        """
+        Cache info for every author in a message batch up front.
+
+        Authors missing after the users.list prewarm are looked up
+        concurrently rather than one users.info call at a time.
+        """
+        missing = {
+            user_id for user_id in user_ids
+            if user_id and self._get_cached_user(user_id) is None
+        }
+        if missing and not self._users_prewarmed:
+            self._prewarm_users()
+            missing = {user_id for user_id in missing if self._get_cached_user(user_id) is None}
+        if not missing:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.USER_LOOKUP_WORKERS, len(missing))) as executor:
+            list(executor.map(self.get_user_info, missing))
+
     def search_by_email(self, email: str, max_results: int = 20) -> list[SlackMessage]:
         """Search for messages mentioning someone by their email."""
         # First, try to find the user by email to get their name
+        user = self.lookup_user_by_email(email)
+        if user is None:
+            # If we can't find the user, just search by email
+            return self.search_messages_mentioning(email, max_results)
+
         try:
-            response = self.client.users_lookupByEmail(email=email)
-            user = response.get("user", {})
             name = user.get("real_name", user.get("name"))
 
-            # Search by both email and name
-            messages = self.search_messages_mentioning(email, max_results // 2)
+            # Search by both email and name. Slack search has no OR operator,
+            # so run the two queries side by side instead of back to back
             if name:
-                messages.extend(self.search_messages_mentioning(name, max_results // 2))
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    by_email = executor.submit(self.search_messages_mentioning, email, max_results // 2)
+                    by_name = executor.submit(self.search_messages_mentioning, name, max_results // 2)
+                    messages = by_email.result() + by_name.result()
+            else:
+                messages = self.search_messages_mentioning(email, max_results // 2)
 
             # Deduplicate by timestamp
             seen = set()
             unique_messages = []
             for msg in messages:
-                if msg.timestamp not in seen:
-                    seen.add(msg.timestamp)
+                key = _ts_key(msg.timestamp)
+                if key not in seen:
+                    seen.add(key)
                     unique_messages.append(msg)
 
             return unique_messages
-        except SlackApiError:
-            # If we can't find the user, just search by email
-            return self.search_messages_mentioning(email, max_results)
+        except SlackApiError as e:
+            logger.error(f"Slack API error: {e}")
+            return []
 
     def get_recent_channel_messages(
         self,
@@ -108,17 +454,19 @@ class SlackClient:
                 limit=limit,
             )
 
-            messages = []
-            for msg in response.get("messages", []):
-                user_info = self.get_user_info(msg.get("user", ""))
-                messages.append(SlackMessage(
+            history = response.get("messages", [])
+            self._resolve_users(msg.get("user", "") for msg in history)
+
+            # Every author is cached (or unresolvable) by now
+            return [
+                SlackMessage.model_construct(
                     text=msg.get("text", ""),
-                    user=user_info.get("name", "Unknown") if user_info else "Unknown",
+                    user=(self._get_cached_user(msg.get("user", "")) or {}).get("name", "Unknown"),
                     channel=channel_id,
                     timestamp=msg.get("ts", ""),
-                ))
-
-            return messages
+                )
+                for msg in history
+            ]
         except SlackApiError as e:
             logger.error(f"Slack API error: {e}")
             return []
@@ -141,64 +489,89 @@ class SlackClient:
                 sort_dir="desc",
             )
 
-            results = []
             matches = response.get("messages", {}).get("matches", [])
+            self._resolve_users(match.get("user", "") for match in matches)
 
-            for match in matches:
-                channel_info = match.get("channel", {})
-                channel_type = "channel"
-                if channel_info.get("is_im"):
-                    channel_type = "dm"
-                elif channel_info.get("is_private") or channel_info.get("is_mpim"):
-                    channel_type = "group"
-
-                # Get user info
-                user_id = match.get("user", "")
-                user_info = self.get_user_info(user_id) if user_id else None
-
-                result = {
-                    "text": match.get("text", ""),
-                    "user": match.get("username", user_info.get("name") if user_info else "Unknown"),
-                    "user_id": user_id,
-                    "user_email": user_info.get("email") if user_info else None,
-                    "channel": channel_info.get("name", "Unknown"),
-                    "channel_id": channel_info.get("id", ""),
-                    "channel_type": channel_type,
-                    "timestamp": match.get("ts", ""),
-                    "thread_ts": match.get("thread_ts"),
-                    "permalink": match.get("permalink", ""),
-                    "files": [],
-                }
-
-                # Extract file information
-                for file in match.get("files", []):
-                    result["files"].append({
-                        "id": file.get("id", ""),
-                        "name": file.get("name", "unknown"),
-                        "title": file.get("title", ""),
-                        "filetype": file.get("filetype", ""),
-                        "mimetype": file.get("mimetype", ""),
-                        "url_private": file.get("url_private", ""),
-                        "url_private_download": file.get("url_private_download", ""),
-                        "size": file.get("size", 0),
-                        "user": file.get("user", ""),
-                        "timestamp": file.get("timestamp", 0),
-                    })
-
-                results.append(result)
-
-            return results
+            return [self._build_file_search_result(match) for match in matches]
 
         except SlackApiError as e:
             logger.error(f"Slack API error: {e}")
             return []
 
-    async def download_file(self, url: str) -> Optional[bytes]:
+    async def asearch_messages_with_files(
+        self,
+        query: str,
+        max_results: int = 30,
+    ) -> list[dict]:
+        """
+        Async search_messages_with_files.
+
+        Uses AsyncWebClient when aiohttp is installed, so the search and the
+        author lookups overlap on the event loop; otherwise runs the sync
+        version in a thread.
+        """
+        aclient = self._get_async_client()
+        if aclient is None:
+            return await asyncio.to_thread(self.search_messages_with_files, query, max_results)
+
+        try:
+            response = await aclient.search_messages(
+                query=query,
+                count=max_results,
+                sort="timestamp",
+                sort_dir="desc",
+            )
+
+            matches = response.get("messages", {}).get("matches", [])
+            user_ids = {match.get("user", "") for match in matches}
+            if not self._users_prewarmed:
+                await asyncio.to_thread(self._prewarm_users)
+            await asyncio.gather(*(
+                self.aget_user_info(user_id) for user_id in user_ids if user_id
+            ))
+
+            return [self._build_file_search_result(match) for match in matches]
+
+        except SlackApiError as e:
+            logger.error(f"Slack API error: {e}")
+            return []
+
+    def _build_file_search_result(self, match: dict) -> dict:
+        """Build a search_messages_with_files result from a match whose author is resolved."""
+        channel_info = match.get("channel", {})
+        channel_type = self.channel_type(channel_info)
+
+        # Authors were cached up front; don't look them up one by one here
+        user_id = match.get("user", "")
+        user_info = self._get_cached_user(user_id) if user_id else None
+
+        return {
+            "text": match.get("text", ""),
+            "user": match.get("username", user_info.get("name") if user_info else "Unknown"),
+            "user_id": user_id,
+            "user_email": user_info.get("email") if user_info else None,
+            "channel": channel_info.get("name", "Unknown"),
+            "channel_id": channel_info.get("id", ""),
+            "channel_type": channel_type,
+            "timestamp": match.get("ts", ""),
+            "thread_ts": match.get("thread_ts"),
+            "permalink": match.get("permalink", ""),
+            "files": _slack_file_dicts(match.get("files")),
+        }
+
+    async def download_file(
+        self,
+        url: str,
+        expected_size: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Optional[bytes]:
         """
         Download a file from Slack.
 
         Args:
             url: The url_private or url_private_download of the file
+            expected_size: The file's size from Slack metadata, if known
+            max_bytes: Abort once the body exceeds this (default MAX_DOWNLOAD_BYTES)
 
         Returns:
             File content as bytes, or None on error
@@ -206,25 +579,84 @@ class SlackClient:
         if not url:
             return None
 
+        max_bytes = max_bytes or self.MAX_DOWNLOAD_BYTES
+
+        # Metadata already says whether there's anything (or too much) to fetch
+        if expected_size == 0:
+            return b""
+        if expected_size and expected_size > max_bytes:
+            logger.error(f"Skipping Slack file download: {expected_size} bytes exceeds {max_bytes}")
+            return None
+
         try:
-            async with httpx.AsyncClient() as http_client:
-                response = await http_client.get(
-                    url,
-                    headers={"Authorization": f"Bearer {self.token}"},
-                    timeout=30,
-                    follow_redirects=True,
-                )
+            # httpx streams slowly over HTTP/1.1; without h2, prefer aiohttp
+            if not _HTTP2_AVAILABLE and aiohttp is not None:
+                return await self._download_with_aiohttp(url, max_bytes)
 
-                if response.status_code == 200:
-                    return response.content
-                else:
+            # Reuse one keep-alive pool so each file skips the TCP/TLS handshake
+            async with self._get_http_client().stream("GET", url) as response:
+                if response.status_code != 200:
                     logger.error(f"Failed to download file: {response.status_code}")
                     return None
 
+                return await self._read_capped(
+                    response.aiter_bytes(chunk_size=self.DOWNLOAD_CHUNK_SIZE), max_bytes,
+                )
+
         except Exception as e:
             logger.error(f"Error downloading Slack file: {e}")
             return None
 
+    async def _download_with_aiohttp(self, url: str, max_bytes: int) -> Optional[bytes]:
+        """download_file's transport when HTTP/2 isn't available."""
+        async with self._get_aiohttp_session().get(
+            url,
+            headers={"Authorization": f"Bearer {self.token}", "Accept-Encoding": _ACCEPT_ENCODING},
+        ) as response:
+            if response.status != 200:
+                logger.error(f"Failed to download file: {response.status}")
+                return None
+
+            return await self._read_capped(
+                response.content.iter_chunked(self.DOWNLOAD_CHUNK_SIZE), max_bytes,
+            )
+
+    @staticmethod
+    async def _read_capped(chunks, max_bytes: int) -> Optional[bytes]:
+        """Join a download's chunks, giving up once the body exceeds max_bytes."""
+        parts = []
+        total = 0
+        async for chunk in chunks:
+            total += len(chunk)
+            if total > max_bytes:
+                logger.error(f"Aborting Slack file download: body exceeds {max_bytes} bytes")
+                return None
+            parts.append(chunk)
+        return b"".join(parts)
+
+    async def download_files(
+        self,
+        urls: list[str],
+        concurrency: int = 8,
+    ) -> list[Optional[bytes]]:
+        """
+        Download several Slack files concurrently.
+
+        Args:
+            urls: url_private or url_private_download of each file
+            concurrency: Maximum downloads in flight at once
+
+        Returns:
+            File contents in the order of urls (None for failures)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def download_one(url: str) -> Optional[bytes]:
+            async with semaphore:
+                return await self.download_file(url)
+
+        return await asyncio.gather(*(download_one(url) for url in urls))
+
     def download_file_sync(self, url: str) -> Optional[bytes]:
         """
         Synchronous version of file download.
@@ -239,19 +671,20 @@ class SlackClient:
             return None
 
         try:
-            import requests
+            if SlackClient._sync_session is None:
+                SlackClient._sync_session = requests.Session()
 
-            response = requests.get(
+            with SlackClient._sync_session.get(
                 url,
                 headers={"Authorization": f"Bearer {self.token}"},
                 timeout=30,
-            )
+                stream=True,
+            ) as response:
+                if response.status_code != 200:
+                    logger.error(f"Failed to download file: {response.status_code}")
+                    return None
 
-            if response.status_code == 200:
-                return response.content
-            else:
-                logger.error(f"Failed to download file: {response.status_code}")
-                return None
+                return b"".join(response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE))
 
         except Exception as e:
             logger.error(f"Error downloading Slack file: {e}")
@@ -262,6 +695,7 @@ class SlackClient:
         user_email: str,
         limit: int = 50,
         days_back: int = 14,
+        raise_errors: bool = False,
     ) -> list[dict]:
         """
         Get direct messages with a specific user.
@@ -270,77 +704,92 @@ class SlackClient:
             user_email: Email of the user to get DMs with
             limit: Maximum number of messages to retrieve
             days_back: Number of days to look back
+            raise_errors: Raise Slack API errors instead of returning []
 
         Returns:
             List of message dicts with file info
         """
+        cache_key = ("direct_messages", user_email, limit, days_back)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             # Find user by email
-            response = self.client.users_lookupByEmail(email=user_email)
-            user = response.get("user", {})
+            user = self.lookup_user_by_email(user_email) or {}
             user_id = user.get("id")
 
             if not user_id:
                 return []
 
-            # Open or get DM channel
-            dm_response = self.client.conversations_open(users=[user_id])
-            channel_id = dm_response.get("channel", {}).get("id")
-
+            # Open or get DM channel (Slack keeps the same one per pair)
+            channel_id = self._get_dm_channel(user_id)
             if not channel_id:
                 return []
 
             # Calculate oldest timestamp
-            oldest = (datetime.utcnow() - timedelta(days=days_back)).timestamp()
+            oldest = time.time() - days_back * 86400
 
             # Get messages
             history_response = self.client.conversations_history(
                 channel=channel_id,
                 limit=limit,
-                oldest=str(oldest),
+                oldest=f"{oldest:.6f}",
             )
 
-            messages = []
-            for msg in history_response.get("messages", []):
-                # Get sender info
-                sender_id = msg.get("user", "")
-                sender_info = self.get_user_info(sender_id) if sender_id else None
-
-                message = {
-                    "text": msg.get("text", ""),
-                    "user": sender_info.get("name") if sender_info else "Unknown",
-                    "user_id": sender_id,
-                    "channel": "direct-message",
-                    "channel_type": "dm",
-                    "timestamp": msg.get("ts", ""),
-                    "thread_ts": msg.get("thread_ts"),
-                    "files": [],
-                }
-
-                # Extract files
-                for file in msg.get("files", []):
-                    message["files"].append({
-                        "id": file.get("id", ""),
-                        "name": file.get("name", "unknown"),
-                        "filetype": file.get("filetype", ""),
-                        "url_private": file.get("url_private", ""),
-                        "size": file.get("size", 0),
-                    })
-
-                messages.append(message)
+            history = history_response.get("messages", [])
+            self._resolve_users(msg.get("user", "") for msg in history)
+
+            messages = [self._build_dm_message(msg) for msg in history]
 
+            self._cache_response(cache_key, messages)
             return messages
 
         except SlackApiError as e:
+            if raise_errors:
+                raise
             logger.error(f"Error getting DMs: {e}")
             return []
 
+    def _get_dm_channel(self, user_id: str) -> Optional[str]:
+        """Resolve the DM channel with a user, calling conversations.open once a day at most."""
+        key = (self.token, user_id)
+        entry = self._dm_channel_cache.get(key)
+        if entry and time.monotonic() - entry[0] < self.DM_CHANNEL_CACHE_TTL:
+            return entry[1]
+
+        dm_response = self.client.conversations_open(users=[user_id])
+        channel_id = dm_response.get("channel", {}).get("id")
+        if channel_id:
+            cache = self._dm_channel_cache
+            if key not in cache and len(cache) >= self.DM_CHANNEL_CACHE_MAX_ENTRIES:
+                del cache[next(iter(cache))]
+            cache[key] = (time.monotonic(), channel_id)
+        return channel_id
+
+    def _build_dm_message(self, msg: dict) -> dict:
+        """Build a get_direct_messages entry from a history message whose sender is resolved."""
+        sender_id = msg.get("user", "")
+        sender_info = self._get_cached_user(sender_id) if sender_id else None
+
+        return {
+            "text": msg.get("text", ""),
+            "user": sender_info.get("name") if sender_info else "Unknown",
+            "user_id": sender_id,
+            "channel": "direct-message",
+            "channel_type": "dm",
+            "timestamp": msg.get("ts", ""),
+            "thread_ts": msg.get("thread_ts"),
+            "files": _slack_file_dicts(msg.get("files")),
+        }
+
     def list_files(
         self,
         user_email: Optional[str] = None,
         channel_id: Optional[str] = None,
         days_back: int = 14,
         max_files: int = 20,
+        raise_errors: bool = False,
     ) -> list[dict]:
         """
         List files shared by or with a user.
@@ -350,25 +799,27 @@ class SlackClient:
             channel_id: Filter by channel
             days_back: Number of days to look back
             max_files: Maximum files to return
+            raise_errors: Raise Slack API errors instead of returning []
 
         Returns:
             List of file metadata dicts
         """
+        cache_key = ("files", user_email, channel_id, days_back, max_files)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             params = {
                 "count": max_files,
-                "ts_from": str((datetime.utcnow() - timedelta(days=days_back)).timestamp()),
+                "ts_from": f"{time.time() - days_back * 86400:.6f}",
             }
 
             # Add user filter if provided
             if user_email:
-                try:
-                    response = self.client.users_lookupByEmail(email=user_email)
-                    user_id = response.get("user", {}).get("id")
-                    if user_id:
-                        params["user"] = user_id
-                except SlackApiError:
-                    pass
+                user_id = (self.lookup_user_by_email(user_email) or {}).get("id")
+                if user_id:
+                    params["user"] = user_id
 
             # Add channel filter if provided
             if channel_id:
@@ -376,40 +827,29 @@ class SlackClient:
 
             response = self.client.files_list(**params)
 
-            files = []
-            for file in response.get("files", []):
-                files.append({
-                    "id": file.get("id", ""),
-                    "name": file.get("name", "unknown"),
-                    "title": file.get("title", ""),
-                    "filetype": file.get("filetype", ""),
-                    "mimetype": file.get("mimetype", ""),
-                    "url_private": file.get("url_private", ""),
-                    "url_private_download": file.get("url_private_download", ""),
-                    "size": file.get("size", 0),
-                    "user": file.get("user", ""),
-                    "timestamp": file.get("timestamp", 0),
-                    "channels": file.get("channels", []),
-                    "ims": file.get("ims", []),
-                })
+            files = [
+                _slack_file_dict(file, include_shares=True)
+                for file in response.get("files", [])
+            ]
 
+            self._cache_response(cache_key, files)
             return files
 
         except SlackApiError as e:
+            if raise_errors:
+                raise
             logger.error(f"Error listing files: {e}")
             return []
 
     def get_user_by_email(self, email: str) -> Optional[dict]:
         """Get Slack user info by email."""
-        try:
-            response = self.client.users_lookupByEmail(email=email)
-            user = response.get("user", {})
-            return {
-                "id": user.get("id"),
-                "name": user.get("real_name", user.get("name")),
-                "email": user.get("profile", {}).get("email"),
-                "display_name": user.get("profile", {}).get("display_name"),
-                "title": user.get("profile", {}).get("title"),
-            }
-        except SlackApiError:
+        user = self.lookup_user_by_email(email)
+        if user is None:
             return None
+        return {
+            "id": user.get("id"),
+            "name": user.get("real_name", user.get("name")),
+            "email": user.get("profile", {}).get("email"),
+            "display_name": user.get("profile", {}).get("display_name"),
+            "title": user.get("profile", {}).get("title"),
+        }
@@ -1,15 +1,34 @@
 """ProactivePA - AI Meeting Prep Assistant Backend."""
 
-from fastapi import FastAPI, HTTPException, Depends, Query, Header, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, Query, Header, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, Response
 from pydantic import BaseModel
 from typing import Optional
+from contextlib import asynccontextmanager
+from urllib.parse import quote, urlencode
 import httpx
 import jwt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
 import asyncio
+import hashlib
+import time
+from itertools import islice
+
+try:
+    # orjson serializes the large prep/context payloads several times faster
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
+try:
+    # httpx only speaks HTTP/2 when the h2 package is installed
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
 
 from config import get_settings
 from models import (
@@ -17,23 +36,27 @@ from models import (
     PrepDocument,
     MeetingPrepResponse,
     ConnectionStatus,
+    OAuthToken,
 )
 from supabase_client import (
     store_oauth_token,
-    get_oauth_token,
     delete_oauth_token,
     store_meeting_prep,
     get_meeting_prep,
     check_connection_status,
     get_user_email,
+    close_supabase_clients,
 )
+from oauth_cache import cached_get_oauth_token, cached_get_oauth_tokens, start_token_cache, reset_token_cache
 from integrations import GoogleCalendarClient, GmailClient, SlackClient
 from context_gatherer import ContextGatherer, DemoContextGatherer
+from document_processor import shutdown_process_pool
 from ai.context_analyzer import analyze_meeting_context
-from ai.prep_generator import EnhancedPrepGenerator, DemoPrepGenerator, EnhancedPrepDocument
-from ai.openai_prep import PrepDocumentGenerator, DemoGenerator
+# The prep generators (and the openai SDK behind them) are imported in the
+# handlers that use them, so other endpoints don't pay for loading them
 from demo_data import (
     get_demo_meetings,
+    get_demo_meetings_json,
     get_demo_meeting_by_id,
     get_demo_emails,
     get_demo_slack_messages,
@@ -45,10 +68,29 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Hold one pooled HTTP client for outbound calls, and release pools on shutdown."""
+    app.state.http = httpx.AsyncClient(
+        http2=_HTTP2_AVAILABLE,
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+        close_supabase_clients()
+        shutdown_process_pool()
+
+
 app = FastAPI(
     title="ProactivePA",
     description="AI-powered meeting prep assistant with document analysis",
     version="2.0.0",
+    default_response_class=DefaultResponse,
+    lifespan=lifespan,
 )
 
 # CORS configuration
@@ -61,6 +103,111 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def token_cache_scope(request: Request, call_next):
+    """Give each request its own OAuth token memo."""
+    scope = start_token_cache()
+    try:
+        return await call_next(request)
+    finally:
+        reset_token_cache(scope)
+
+
+# Larger bodies aren't buffered for hashing
+ETAG_MAX_BYTES = 1024 * 1024
+
+
+@app.middleware("http")
+async def etag_support(request: Request, call_next):
+    """Tag GET JSON responses with an ETag and answer 304 when it matches."""
+    response = await call_next(request)
+    # Streamed responses carry no content-length; leave them unbuffered
+    content_length = response.headers.get("content-length")
+    if (
+        request.method != "GET"
+        or response.status_code != 200
+        or not response.headers.get("content-type", "").startswith("application/json")
+        or content_length is None
+        or int(content_length) > ETAG_MAX_BYTES
+    ):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+    headers = dict(response.headers)
+    headers["etag"] = etag
+
+    if request.headers.get("if-none-match") == etag:
+        for name in ("content-length", "content-type"):
+            headers.pop(name, None)
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, status_code=response.status_code, headers=headers)
+
+
+# Short-lived per-user cache for responses that hit Google or Supabase on
+# every UI poll; entries are (stored_at, value), keyed (kind, user_id, ...)
+RESPONSE_CACHE_TTL = 60  # seconds
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+_response_cache: dict[tuple, tuple[float, object]] = {}
+
+
+def _get_cached_response(key: tuple):
+    """Return a cached response for key, or None if missing or expired."""
+    entry = _response_cache.get(key)
+    if entry and time.monotonic() - entry[0] < RESPONSE_CACHE_TTL:
+        return entry[1]
+    return None
+
+
+def _cache_response(key: tuple, value) -> None:
+    """Store a response, evicting the oldest entry when full."""
+    _response_cache.pop(key, None)
+    if len(_response_cache) >= RESPONSE_CACHE_MAX_ENTRIES:
+        del _response_cache[next(iter(_response_cache))]
+    _response_cache[key] = (time.monotonic(), value)
+
+
+def _invalidate_user_responses(user_id: str) -> None:
+    """Drop every cached response for a user (e.g. after a token change)."""
+    for key in [k for k in _response_cache if k[1] == user_id]:
+        del _response_cache[key]
+
+
+# Decoded JWT subjects by token string, as (expires_at, sub) with
+# expires_at on the monotonic clock; entries never outlive the token's exp
+JWT_CACHE_TTL = 300  # seconds
+JWT_CACHE_MAX_ENTRIES = 10_000
+_jwt_subject_cache: dict[str, tuple[float, str]] = {}
+
+
+def _decode_user_id(token: str) -> Optional[str]:
+    """Decode a Supabase JWT's 'sub' claim, verifying it when a secret is configured."""
+    cached = _jwt_subject_cache.get(token)
+    if cached and time.monotonic() < cached[0]:
+        return cached[1]
+
+    if settings.supabase_jwt_secret:
+        payload = jwt.decode(
+            token,
+            settings.supabase_jwt_secret,
+            algorithms=["HS256"],
+            audience="authenticated",
+        )
+    else:
+        payload = jwt.decode(token, options={"verify_signature": False})
+
+    sub = payload.get("sub")
+    if sub:
+        ttl = JWT_CACHE_TTL
+        if payload.get("exp"):
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            if len(_jwt_subject_cache) >= JWT_CACHE_MAX_ENTRIES:
+                del _jwt_subject_cache[next(iter(_jwt_subject_cache))]
+            _jwt_subject_cache[token] = (time.monotonic() + ttl, sub)
+    return sub
+
+
 # Auth dependency - verify Supabase JWT
 async def get_current_user(
     authorization: Optional[str] = Header(None),
@@ -72,9 +219,8 @@ async def get_current_user(
     if authorization and authorization.startswith("Bearer "):
         token = authorization.replace("Bearer ", "")
         try:
-            # Decode JWT to get user ID (Supabase JWTs contain 'sub' claim)
-            payload = jwt.decode(token, options={"verify_signature": False})
-            user_id_from_token = payload.get("sub")
+            # Supabase JWTs carry the user ID in the 'sub' claim
+            user_id_from_token = _decode_user_id(token)
             if user_id_from_token:
                 return user_id_from_token
         except Exception as e:
@@ -93,52 +239,66 @@ async def health_check():
 
 # ============ OAuth Routes ============
 
+GOOGLE_SCOPES = [
+    "https://www.googleapis.com/auth/calendar.readonly",
+    "https://www.googleapis.com/auth/gmail.readonly",
+    "https://www.googleapis.com/auth/drive.readonly",
+]
+
+# User token scopes (needed for search:read and file access)
+SLACK_USER_SCOPES = "search:read,users:read,users:read.email,channels:history,groups:history,im:history,mpim:history,files:read"
+
+# Everything but the state is fixed, so the encoded URLs are built once
+_GOOGLE_AUTH_URL_PREFIX = "https://accounts.google.com/o/oauth2/v2/auth?" + urlencode({
+    "client_id": settings.google_client_id,
+    "redirect_uri": settings.google_redirect_uri,
+    "response_type": "code",
+    "scope": " ".join(GOOGLE_SCOPES),
+    "access_type": "offline",
+    "prompt": "consent",
+})
+_SLACK_AUTH_URL_PREFIX = "https://slack.com/oauth/v2/authorize?" + urlencode({
+    "client_id": settings.slack_client_id,
+    "user_scope": SLACK_USER_SCOPES,
+    "redirect_uri": settings.slack_redirect_uri,
+})
+
+
 @app.get("/auth/google")
 async def google_auth_start(user_id: str = Depends(get_current_user)):
     """Start Google OAuth flow."""
-    scopes = [
-        "https://www.googleapis.com/auth/calendar.readonly",
-        "https://www.googleapis.com/auth/gmail.readonly",
-        "https://www.googleapis.com/auth/drive.readonly",
-    ]
-    scope_str = " ".join(scopes)
-
-    auth_url = (
-        f"https://accounts.google.com/o/oauth2/v2/auth?"
-        f"client_id={settings.google_client_id}&"
-        f"redirect_uri={settings.google_redirect_uri}&"
-        f"response_type=code&"
-        f"scope={scope_str}&"
-        f"access_type=offline&"
-        f"prompt=consent&"
-        f"state={user_id}"
-    )
-    return {"auth_url": auth_url}
+    return {"auth_url": f"{_GOOGLE_AUTH_URL_PREFIX}&state={quote(user_id, safe='')}"}
+
+
+# Google access tokens last an hour unless the exchange says otherwise
+DEFAULT_TOKEN_EXPIRY = timedelta(hours=1)
 
 
 @app.get("/auth/google/callback")
-async def google_auth_callback(code: str, state: str):
+async def google_auth_callback(code: str, state: str, request: Request):
     """Handle Google OAuth callback."""
     user_id = state
 
     # Exchange code for tokens
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://oauth2.googleapis.com/token",
-            data={
-                "client_id": settings.google_client_id,
-                "client_secret": settings.google_client_secret,
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": settings.google_redirect_uri,
-            },
-        )
+    response = await request.app.state.http.post(
+        "https://oauth2.googleapis.com/token",
+        data={
+            "client_id": settings.google_client_id,
+            "client_secret": settings.google_client_secret,
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": settings.google_redirect_uri,
+        },
+    )
 
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail="Failed to exchange code")
 
     tokens = response.json()
-    expires_at = datetime.utcnow() + timedelta(seconds=tokens.get("expires_in", 3600))
+    expires_in = tokens.get("expires_in")
+    expires_at = datetime.now(timezone.utc) + (
+        timedelta(seconds=expires_in) if expires_in else DEFAULT_TOKEN_EXPIRY
+    )
 
     await store_oauth_token(
         user_id=user_id,
@@ -147,6 +307,7 @@ async def google_auth_callback(code: str, state: str):
         refresh_token=tokens.get("refresh_token"),
         expires_at=expires_at,
     )
+    _invalidate_user_responses(user_id)
 
     return RedirectResponse(url=f"{settings.frontend_url}/connect?google=success")
 
@@ -154,34 +315,23 @@ async def google_auth_callback(code: str, state: str):
 @app.get("/auth/slack")
 async def slack_auth_start(user_id: str = Depends(get_current_user)):
     """Start Slack OAuth flow."""
-    # User token scopes (needed for search:read and file access)
-    user_scopes = "search:read,users:read,users:read.email,channels:history,groups:history,im:history,mpim:history,files:read"
-
-    auth_url = (
-        f"https://slack.com/oauth/v2/authorize?"
-        f"client_id={settings.slack_client_id}&"
-        f"user_scope={user_scopes}&"
-        f"redirect_uri={settings.slack_redirect_uri}&"
-        f"state={user_id}"
-    )
-    return {"auth_url": auth_url}
+    return {"auth_url": f"{_SLACK_AUTH_URL_PREFIX}&state={quote(user_id, safe='')}"}
 
 
 @app.get("/auth/slack/callback")
-async def slack_auth_callback(code: str, state: str):
+async def slack_auth_callback(code: str, state: str, request: Request):
     """Handle Slack OAuth callback."""
     user_id = state
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://slack.com/api/oauth.v2.access",
-            data={
-                "client_id": settings.slack_client_id,
-                "client_secret": settings.slack_client_secret,
-                "code": code,
-                "redirect_uri": settings.slack_redirect_uri,
-            },
-        )
+    response = await request.app.state.http.post(
+        "https://slack.com/api/oauth.v2.access",
+        data={
+            "client_id": settings.slack_client_id,
+            "client_secret": settings.slack_client_secret,
+            "code": code,
+            "redirect_uri": settings.slack_redirect_uri,
+        },
+    )
 
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail="Failed to exchange code")
@@ -200,6 +350,7 @@ async def slack_auth_callback(code: str, state: str):
         refresh_token=None,
         expires_at=None,
     )
+    _invalidate_user_responses(user_id)
 
     return RedirectResponse(url=f"{settings.frontend_url}/connect?slack=success")
 
@@ -211,6 +362,7 @@ async def disconnect_provider(
 ):
     """Disconnect a provider."""
     await delete_oauth_token(user_id, provider)
+    _invalidate_user_responses(user_id)
     return {"status": "disconnected"}
 
 
@@ -220,8 +372,14 @@ async def get_connection_status(user_id: str = Depends(get_current_user)):
     if settings.demo_mode:
         return ConnectionStatus(google_connected=True, slack_connected=True)
 
-    status = await check_connection_status(user_id)
-    return ConnectionStatus(**status)
+    cache_key = ("status", user_id)
+    cached = _get_cached_response(cache_key)
+    if cached is not None:
+        return cached
+
+    status = ConnectionStatus(**await check_connection_status(user_id))
+    _cache_response(cache_key, status)
+    return status
 
 
 # ============ Meetings Routes ============
@@ -230,14 +388,22 @@ async def get_connection_status(user_id: str = Depends(get_current_user)):
 async def get_meetings(user_id: str = Depends(get_current_user)):
     """Get upcoming meetings from Google Calendar."""
     if settings.demo_mode:
-        return get_demo_meetings()
+        # Pre-serialized once per refresh, skipping response-model validation
+        return Response(content=get_demo_meetings_json(), media_type="application/json")
 
-    token = await get_oauth_token(user_id, "google")
+    cache_key = ("meetings", user_id)
+    cached = _get_cached_response(cache_key)
+    if cached is not None:
+        return cached
+
+    token = await cached_get_oauth_token(user_id, "google")
     if not token:
         raise HTTPException(status_code=400, detail="Google not connected")
 
     calendar = GoogleCalendarClient(token.access_token, token.refresh_token)
-    return calendar.get_upcoming_meetings()
+    meetings = await asyncio.to_thread(calendar.get_upcoming_meetings)
+    _cache_response(cache_key, meetings)
+    return meetings
 
 
 @app.get("/meetings/{meeting_id}", response_model=Meeting)
@@ -252,14 +418,20 @@ async def get_meeting(
             raise HTTPException(status_code=404, detail="Meeting not found")
         return meeting
 
-    token = await get_oauth_token(user_id, "google")
+    cache_key = ("meeting", user_id, meeting_id)
+    cached = _get_cached_response(cache_key)
+    if cached is not None:
+        return cached
+
+    token = await cached_get_oauth_token(user_id, "google")
     if not token:
         raise HTTPException(status_code=400, detail="Google not connected")
 
     calendar = GoogleCalendarClient(token.access_token, token.refresh_token)
-    meeting = calendar.get_meeting_by_id(meeting_id)
+    meeting = await asyncio.to_thread(calendar.get_meeting_by_id, meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
+    _cache_response(cache_key, meeting)
     return meeting
 
 
@@ -281,10 +453,34 @@ class EnhancedPrepResponse(BaseModel):
         from_attributes = True
 
 
+# Background prep jobs by (user_id, meeting_id): {"status": "pending"} while
+# running, {"status": "error", "detail": ..., "failed_at": ...} on failure,
+# removed once stored. Errors are reported by the next poll or expire
+PREP_JOB_ERROR_TTL = 600  # seconds
+_prep_jobs: dict[tuple[str, str], dict] = {}
+
+
+def _get_prep_job(job_key: tuple[str, str]) -> Optional[dict]:
+    """Return a background prep job, dropping failures older than PREP_JOB_ERROR_TTL."""
+    job = _prep_jobs.get(job_key)
+    if job and job["status"] == "error" and time.monotonic() - job["failed_at"] >= PREP_JOB_ERROR_TTL:
+        _prep_jobs.pop(job_key, None)
+        return None
+    return job
+
+
+def _cached_prep_meeting(cached: dict) -> Optional[Meeting]:
+    """Return the meeting embedded in a stored prep document, if any."""
+    meeting = cached.get("meeting")
+    return Meeting.model_validate(meeting) if meeting else None
+
+
 @app.post("/api/meetings/{meeting_id}/generate-prep")
 async def generate_enhanced_prep(
     meeting_id: str,
+    background_tasks: BackgroundTasks,
     force_regenerate: bool = False,
+    background: bool = False,
     user_id: str = Depends(get_current_user),
 ):
     """
@@ -295,18 +491,21 @@ async def generate_enhanced_prep(
     - Downloads and extracts text from attachments
     - Applies intelligent filtering
     - Generates AI prep with document insights
+
+    With background=true the work runs after a 202 response, and the
+    result is fetched by polling GET /prep/{meeting_id}.
     """
     # Check for cached prep
     if not force_regenerate and not settings.demo_mode:
         cached = await get_meeting_prep(user_id, meeting_id)
         if cached and cached.get("prep_markdown"):
-            # Return cached enhanced prep
-            meeting = await get_meeting(meeting_id, user_id)
+            # Return cached enhanced prep, with the meeting stored alongside it
+            meeting = _cached_prep_meeting(cached) or await get_meeting(meeting_id, user_id)
             return {
                 "meeting": meeting,
                 "prep_document": cached,
                 "context_summary": cached.get("context_stats", {}),
-                "generated_at": cached.get("generated_at", datetime.utcnow().isoformat()),
+                "generated_at": cached.get("generated_at") or datetime.now(timezone.utc).isoformat(),
             }
 
     # Get meeting details
@@ -315,22 +514,40 @@ async def generate_enhanced_prep(
         if not meeting:
             raise HTTPException(status_code=404, detail="Meeting not found")
     else:
-        token = await get_oauth_token(user_id, "google")
+        # Gathering needs the Slack token too; look both up at once
+        token, _ = await cached_get_oauth_tokens(user_id, "google", "slack")
         if not token:
             raise HTTPException(status_code=400, detail="Google not connected")
         calendar = GoogleCalendarClient(token.access_token, token.refresh_token)
-        meeting = calendar.get_meeting_by_id(meeting_id)
+        meeting = await asyncio.to_thread(calendar.get_meeting_by_id, meeting_id)
         if not meeting:
             raise HTTPException(status_code=404, detail="Meeting not found")
 
+    if background and not settings.demo_mode:
+        # Gather and generate after responding; clients poll GET /prep/{id}
+        job_key = (user_id, meeting_id)
+        job = _get_prep_job(job_key)
+        if not job or job["status"] != "pending":
+            _prep_jobs[job_key] = {"status": "pending"}
+            background_tasks.add_task(_run_prep_job, user_id, meeting)
+        return JSONResponse(status_code=202, content={"status": "pending", "meeting_id": meeting_id})
+
+    return await _build_enhanced_prep(user_id, meeting)
+
+
+async def _build_enhanced_prep(user_id: str, meeting: Meeting) -> dict:
+    """Gather context for a meeting, generate its enhanced prep and cache it."""
     # Gather comprehensive context
+    user_email_task = None
     if settings.demo_mode:
         gatherer = DemoContextGatherer(internal_domain="company.com")
         context = await gatherer.gather_meeting_context(meeting)
     else:
+        # The user's email (for perspective) doesn't depend on the context
+        user_email_task = asyncio.create_task(get_user_email(user_id))
+
         # Initialize clients
-        google_token = await get_oauth_token(user_id, "google")
-        slack_token = await get_oauth_token(user_id, "slack")
+        google_token, slack_token = await cached_get_oauth_tokens(user_id, "google", "slack")
 
         gmail_client = GmailClient(google_token.access_token, google_token.refresh_token) if google_token else None
         slack_client = SlackClient(slack_token.access_token) if slack_token else None
@@ -342,23 +559,30 @@ async def generate_enhanced_prep(
             calendar_client=calendar_client,
             drive_credentials=calendar_client.credentials if calendar_client else None,
             internal_domain=None,  # Could be configured per user
+            user_id=user_id,
         )
 
-        context = await gatherer.gather_meeting_context(meeting, days_back=14, include_documents=True)
+        try:
+            context = await gatherer.gather_meeting_context(meeting, days_back=14, include_documents=True)
+        finally:
+            await gatherer.aclose()
 
     # Apply intelligent filtering
     filtered_context = analyze_meeting_context(context, meeting.title)
 
-    # Get user's email for perspective
-    user_email = await get_user_email(user_id) if not settings.demo_mode else None
+    user_email = await user_email_task if user_email_task else None
 
     # Generate enhanced prep
+    from ai.prep_generator import EnhancedPrepGenerator, DemoPrepGenerator
+
     if settings.demo_mode:
         generator = DemoPrepGenerator()
     else:
         generator = EnhancedPrepGenerator()
 
-    prep = generator.generate_prep(
+    # The LLM call blocks; keep it off the event loop
+    prep = await asyncio.to_thread(
+        generator.generate_prep,
         meeting=meeting,
         filtered_context=filtered_context,
         has_external_attendees=context.has_external_attendees(),
@@ -369,8 +593,9 @@ async def generate_enhanced_prep(
     if not settings.demo_mode:
         await store_meeting_prep(
             user_id=user_id,
-            meeting_id=meeting_id,
+            meeting_id=meeting.id,
             prep_document=prep.to_dict(),
+            meeting=meeting,
         )
 
     return {
@@ -386,6 +611,29 @@ async def generate_enhanced_prep(
     }
 
 
+async def _run_prep_job(user_id: str, meeting: Meeting) -> None:
+    """Background prep generation; the stored prep marks completion."""
+    job_key = (user_id, meeting.id)
+    try:
+        await _build_enhanced_prep(user_id, meeting)
+        _prep_jobs.pop(job_key, None)
+    except Exception as e:
+        logger.error(f"Background prep generation failed for {meeting.id}: {e}")
+        # Drop failures nobody polled for before recording this one
+        now = time.monotonic()
+        for key in [k for k, job in _prep_jobs.items()
+                    if job["status"] == "error" and now - job["failed_at"] >= PREP_JOB_ERROR_TTL]:
+            del _prep_jobs[key]
+        _prep_jobs[job_key] = {"status": "error", "detail": str(e), "failed_at": now}
+
+
+def _search_attendee_emails(token: OAuthToken, email: str) -> list:
+    """Build a Gmail client and search one attendee's emails, in a worker thread."""
+    # One Gmail client per thread: its httplib2 connection isn't thread-safe
+    gmail = GmailClient(token.access_token, token.refresh_token)
+    return gmail.search_emails_with_person(email)
+
+
 # Legacy endpoint for backwards compatibility
 @app.post("/prep/generate", response_model=MeetingPrepResponse)
 async def generate_prep_document(
@@ -398,7 +646,7 @@ async def generate_prep_document(
     if not request.force_regenerate and not settings.demo_mode:
         cached = await get_meeting_prep(user_id, request.meeting_id)
         if cached:
-            meeting = await get_meeting(request.meeting_id, user_id)
+            meeting = _cached_prep_meeting(cached) or await get_meeting(request.meeting_id, user_id)
             # Convert enhanced prep to legacy format if needed
             if cached.get("prep_markdown"):
                 legacy_prep = PrepDocument(
@@ -407,7 +655,7 @@ async def generate_prep_document(
                     key_points=[p.get("point", "") for p in cached.get("key_discussion_points", [])],
                     suggested_agenda=[a.get("item", "") for a in cached.get("suggested_agenda", [])],
                     action_items=cached.get("action_items", []),
-                    generated_at=datetime.fromisoformat(cached.get("generated_at", datetime.utcnow().isoformat())),
+                    generated_at=datetime.fromisoformat(cached.get("generated_at") or datetime.now(timezone.utc).isoformat()),
                 )
             else:
                 legacy_prep = PrepDocument(**cached)
@@ -422,11 +670,12 @@ async def generate_prep_document(
         if not meeting:
             raise HTTPException(status_code=404, detail="Meeting not found")
     else:
-        token = await get_oauth_token(user_id, "google")
+        # Gathering needs the Slack token too; look both up at once
+        token, _ = await cached_get_oauth_tokens(user_id, "google", "slack")
         if not token:
             raise HTTPException(status_code=400, detail="Google not connected")
         calendar = GoogleCalendarClient(token.access_token, token.refresh_token)
-        meeting = calendar.get_meeting_by_id(request.meeting_id)
+        meeting = await asyncio.to_thread(calendar.get_meeting_by_id, request.meeting_id)
         if not meeting:
             raise HTTPException(status_code=404, detail="Meeting not found")
 
@@ -434,33 +683,55 @@ async def generate_prep_document(
     emails = []
     slack_messages = []
 
-    for attendee in meeting.attendees:
-        if settings.demo_mode:
+    if settings.demo_mode:
+        for attendee in meeting.attendees:
             emails.extend(get_demo_emails(attendee.email))
             slack_messages.extend(get_demo_slack_messages(attendee.email))
-        else:
-            # Get emails
-            google_token = await get_oauth_token(user_id, "google")
-            if google_token:
-                gmail = GmailClient(google_token.access_token, google_token.refresh_token)
-                emails.extend(gmail.search_emails_with_person(attendee.email))
-
-            # Get Slack messages
-            slack_token = await get_oauth_token(user_id, "slack")
-            if slack_token:
-                slack = SlackClient(slack_token.access_token)
-                slack_messages.extend(slack.search_by_email(attendee.email))
+    else:
+        # The user's email (for perspective) doesn't depend on the context
+        user_email_task = asyncio.create_task(get_user_email(user_id))
+
+        # Fetch tokens and build clients once, then fan out per attendee
+        google_token, slack_token = await cached_get_oauth_tokens(user_id, "google", "slack")
+
+        email_tasks = []
+        slack_tasks = []
+        if google_token:
+            email_tasks = [
+                asyncio.to_thread(_search_attendee_emails, google_token, a.email)
+                for a in meeting.attendees
+            ]
+        if slack_token:
+            slack = SlackClient(slack_token.access_token)
+            slack_tasks = [
+                asyncio.to_thread(slack.search_by_email, a.email)
+                for a in meeting.attendees
+            ]
+
+        results = await asyncio.gather(*email_tasks, *slack_tasks, return_exceptions=True)
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                logger.error(f"Error gathering attendee context: {result}")
+                continue
+            if i < len(email_tasks):
+                emails.extend(result)
+            else:
+                slack_messages.extend(result)
 
     # Get user's email for perspective
-    user_email = await get_user_email(user_id) if not settings.demo_mode else None
+    user_email = await user_email_task if not settings.demo_mode else None
 
     # Generate prep document
+    from ai.openai_prep import PrepDocumentGenerator, DemoGenerator
+
     if settings.demo_mode:
         generator = DemoGenerator()
     else:
         generator = PrepDocumentGenerator()
 
-    prep_document = generator.generate_prep_document(meeting, emails, slack_messages, user_email=user_email)
+    prep_document = await asyncio.to_thread(
+        generator.generate_prep_document, meeting, emails, slack_messages, user_email=user_email,
+    )
 
     # Cache the result (skip in demo mode)
     if not settings.demo_mode:
@@ -468,6 +739,7 @@ async def generate_prep_document(
             user_id=user_id,
             meeting_id=request.meeting_id,
             prep_document=prep_document.model_dump(mode="json"),
+            meeting=meeting,
         )
 
     return MeetingPrepResponse(
@@ -493,11 +765,22 @@ async def get_prep_document(
         context = await gatherer.gather_meeting_context(meeting)
         filtered_context = analyze_meeting_context(context, meeting.title)
 
+        from ai.prep_generator import DemoPrepGenerator
         generator = DemoPrepGenerator()
         prep = generator.generate_prep(meeting, filtered_context, context.has_external_attendees())
 
         return prep.to_dict()
 
+    # A running or failed job takes precedence over a stored prep, which may
+    # be the one a forced regeneration is replacing
+    job_key = (user_id, meeting_id)
+    job = _get_prep_job(job_key)
+    if job and job["status"] == "pending":
+        return JSONResponse(status_code=202, content={"status": "pending", "meeting_id": meeting_id})
+    if job:
+        _prep_jobs.pop(job_key, None)
+        raise HTTPException(status_code=500, detail=f"Prep generation failed: {job['detail']}")
+
     cached = await get_meeting_prep(user_id, meeting_id)
     if not cached:
         raise HTTPException(status_code=404, detail="Prep document not found")
@@ -507,6 +790,13 @@ async def get_prep_document(
 
 # ============ Context Gathering Endpoint ============
 
+# How much of the gathered context the inspection endpoint returns; the
+# gatherer drops the rest instead of holding it for the response
+CONTEXT_PREVIEW_EMAILS = 10
+CONTEXT_PREVIEW_SLACK_MESSAGES = 20
+CONTEXT_PREVIEW_DOCUMENTS = 10
+
+
 @app.get("/api/meetings/{meeting_id}/context")
 async def get_meeting_context(
     meeting_id: str,
@@ -524,20 +814,22 @@ async def get_meeting_context(
             raise HTTPException(status_code=404, detail="Meeting not found")
 
         gatherer = DemoContextGatherer(internal_domain="company.com")
-        context = await gatherer.gather_meeting_context(meeting)
+        context = await gatherer.gather_meeting_context(
+            meeting, max_emails=CONTEXT_PREVIEW_EMAILS, max_slack_messages=CONTEXT_PREVIEW_SLACK_MESSAGES,
+        )
     else:
-        token = await get_oauth_token(user_id, "google")
+        # Gathering needs the Slack token too; look both up at once
+        token, _ = await cached_get_oauth_tokens(user_id, "google", "slack")
         if not token:
             raise HTTPException(status_code=400, detail="Google not connected")
 
         calendar = GoogleCalendarClient(token.access_token, token.refresh_token)
-        meeting = calendar.get_meeting_by_id(meeting_id)
+        meeting = await asyncio.to_thread(calendar.get_meeting_by_id, meeting_id)
         if not meeting:
             raise HTTPException(status_code=404, detail="Meeting not found")
 
         # Gather context
-        google_token = await get_oauth_token(user_id, "google")
-        slack_token = await get_oauth_token(user_id, "slack")
+        google_token, slack_token = await cached_get_oauth_tokens(user_id, "google", "slack")
 
         gmail_client = GmailClient(google_token.access_token, google_token.refresh_token) if google_token else None
         slack_client = SlackClient(slack_token.access_token) if slack_token else None
@@ -547,25 +839,38 @@ async def get_meeting_context(
             gmail_client=gmail_client,
             slack_client=slack_client,
             calendar_client=calendar_client,
+            user_id=user_id,
         )
 
-        context = await gatherer.gather_meeting_context(meeting, days_back=14, include_documents=True)
+        try:
+            context = await gatherer.gather_meeting_context(
+                meeting,
+                days_back=14,
+                include_documents=True,
+                max_emails=CONTEXT_PREVIEW_EMAILS,
+                max_slack_messages=CONTEXT_PREVIEW_SLACK_MESSAGES,
+            )
+        finally:
+            await gatherer.aclose()
 
     # Return context summary
     return {
         "meeting_id": meeting_id,
         "meeting_title": meeting.title,
-        "attendees": [{"email": a.email, "name": a.name} for a in meeting.attendees],
+        "attendees": [
+            {"email": email, "name": name}
+            for email, name in {a.email: a.name for a in meeting.attendees}.items()
+        ],
         "external_attendees": context.external_attendees,
         "stats": {
             "total_emails": context.total_emails,
             "total_slack_messages": context.total_slack_messages,
             "total_documents": context.total_documents,
         },
-        "email_subjects": [e.subject for e in context.emails[:10]],
-        "slack_channels": list(set(m.channel for m in context.slack_messages[:20])),
+        "email_subjects": [e.subject for e in context.emails],
+        "slack_channels": list(dict.fromkeys(m.channel for m in context.slack_messages)),
         "documents": [{"filename": d.filename, "source": d.source_type}
-                     for d in context.get_all_extracted_documents()[:10]],
+                     for d in islice(context.get_all_extracted_documents(), CONTEXT_PREVIEW_DOCUMENTS)],
         "errors": context.errors,
     }
 
@@ -578,28 +883,34 @@ async def demo_status():
     return {"demo_mode": settings.demo_mode}
 
 
+# Demo context is static, so each meeting's preview is built once per
+# process; the meetings themselves are re-read since their times slide
+_demo_preview_cache: dict[str, dict] = {}
+
+
 @app.get("/demo/meetings")
 async def get_demo_meetings_list():
     """Get demo meetings with enhanced context preview."""
     meetings = get_demo_meetings()
-    result = []
 
     for meeting in meetings:
+        if meeting.id in _demo_preview_cache:
+            continue
         # Generate quick context preview
         gatherer = DemoContextGatherer(internal_domain="company.com")
         context = await gatherer.gather_meeting_context(meeting)
 
-        result.append({
-            "meeting": meeting,
-            "context_preview": {
-                "emails": context.total_emails,
-                "slack_messages": context.total_slack_messages,
-                "documents": context.total_documents,
-                "has_external": context.has_external_attendees(),
-            }
-        })
+        _demo_preview_cache[meeting.id] = {
+            "emails": context.total_emails,
+            "slack_messages": context.total_slack_messages,
+            "documents": context.total_documents,
+            "has_external": context.has_external_attendees(),
+        }
 
-    return result
+    return [
+        {"meeting": meeting, "context_preview": _demo_preview_cache[meeting.id]}
+        for meeting in meetings
+    ]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+"""Per-request memoization of OAuth token lookups."""
+
+import asyncio
+from contextvars import ContextVar, Token
+from typing import Optional
+
+from models import OAuthToken
+from supabase_client import get_oauth_token
+
+# (user_id, provider) -> token for the current request; None outside a scope
+_token_cache: ContextVar[Optional[dict]] = ContextVar("oauth_tokens", default=None)
+
+
+def start_token_cache(tokens: Optional[dict] = None) -> Token:
+    """
+    Open a fresh token cache for the current context (request or job).
+
+    tokens optionally seeds it with already-fetched (user_id, provider)
+    lookups; None values mean the provider isn't connected.
+    """
+    return _token_cache.set(dict(tokens) if tokens else {})
+
+
+def reset_token_cache(token: Token) -> None:
+    """Close the cache opened by start_token_cache()."""
+    _token_cache.reset(token)
+
+
+async def cached_get_oauth_token(user_id: str, provider: str) -> Optional[OAuthToken]:
+    """
+    get_oauth_token() memoized for the current context.
+
+    Handlers look up the same token several times (meeting fetch, then
+    gatherer setup); only the first lookup hits Supabase. Missing tokens
+    are cached too. Without an open scope this is a plain lookup.
+    """
+    cache = _token_cache.get()
+    if cache is None:
+        return await get_oauth_token(user_id, provider)
+
+    key = (user_id, provider)
+    if key not in cache:
+        cache[key] = await get_oauth_token(user_id, provider)
+    return cache[key]
+
+
+async def cached_get_oauth_tokens(user_id: str, *providers: str) -> tuple[Optional[OAuthToken], ...]:
+    """Look up several providers' tokens concurrently, in the given order."""
+    return tuple(await asyncio.gather(*(cached_get_oauth_token(user_id, p) for p in providers)))
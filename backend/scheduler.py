@@ -12,11 +12,12 @@ import logging
 
 from config import get_settings
 from supabase_client import (
-    get_oauth_token,
-    get_meeting_prep,
+    get_existing_prep_ids,
     store_meeting_prep,
-    get_all_users_with_google,
+    iter_google_user_pages,
+    get_oauth_tokens_bulk,
 )
+from oauth_cache import cached_get_oauth_tokens, start_token_cache, reset_token_cache
 from integrations import GoogleCalendarClient, GmailClient, SlackClient
 from context_gatherer import ContextGatherer
 from ai.context_analyzer import analyze_meeting_context
@@ -37,6 +38,11 @@ class PrepScheduler:
     - Runs periodically (configurable interval)
     """
 
+    # Users processed at once per tick, and meetings at once per user
+    MAX_CONCURRENT_USERS = 10
+    MAX_CONCURRENT_MEETINGS = 3
+    STOP_TIMEOUT = 30  # seconds to let a running tick finish on stop()
+
     def __init__(
         self,
         check_interval_minutes: int = 15,
@@ -53,6 +59,7 @@ class PrepScheduler:
         self.lookahead_hours = lookahead_hours
         self.running = False
         self._task: Optional[asyncio.Task] = None
+        self._shutdown = asyncio.Event()
 
     async def start(self):
         """Start the scheduler."""
@@ -61,6 +68,7 @@ class PrepScheduler:
             return
 
         self.running = True
+        self._shutdown.clear()
         logger.info(f"Starting prep scheduler (interval: {self.check_interval}s, lookahead: {self.lookahead_hours}h)")
 
         self._task = asyncio.create_task(self._run_loop())
@@ -68,12 +76,15 @@ class PrepScheduler:
     async def stop(self):
         """Stop the scheduler."""
         self.running = False
+        self._shutdown.set()
         if self._task:
-            self._task.cancel()
+            # An idle loop exits at once; a tick in progress gets a grace
+            # period to finish before wait_for cancels it
             try:
-                await self._task
-            except asyncio.CancelledError:
+                await asyncio.wait_for(self._task, timeout=self.STOP_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
                 pass
+            self._task = None
         logger.info("Prep scheduler stopped")
 
     async def _run_loop(self):
@@ -84,30 +95,68 @@ class PrepScheduler:
             except Exception as e:
                 logger.error(f"Scheduler error: {e}")
 
-            # Wait for next check
-            await asyncio.sleep(self.check_interval)
+            # Wait for next check, waking early on stop()
+            try:
+                await asyncio.wait_for(self._shutdown.wait(), timeout=self.check_interval)
+                break
+            except asyncio.TimeoutError:
+                pass
 
     async def _check_and_generate(self):
         """Check for upcoming meetings and generate prep."""
         logger.info("Checking for meetings needing prep...")
 
-        # Get all users with Google connected
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_USERS)
+
+        async def process(user_id: str, tokens: Optional[dict]):
+            async with semaphore:
+                try:
+                    await self._process_user(user_id, tokens)
+                except Exception as e:
+                    logger.error(f"Error processing user {user_id}: {e}")
+
+        async def process_page(users: list[str]):
+            # Fetch the page's tokens in bulk rather than one query per user
+            try:
+                google_tokens, slack_tokens = await asyncio.gather(
+                    get_oauth_tokens_bulk(users, "google"),
+                    get_oauth_tokens_bulk(users, "slack"),
+                )
+            except Exception as e:
+                logger.error(f"Failed to prefetch tokens: {e}")
+                google_tokens = slack_tokens = None
+
+            await asyncio.gather(*(
+                process(user_id, None if google_tokens is None else {
+                    (user_id, "google"): google_tokens.get(user_id),
+                    (user_id, "slack"): slack_tokens.get(user_id),
+                })
+                for user_id in users
+            ))
+
+        # Work on each page of users while the next one is fetched
+        pages = []
         try:
-            users = await get_all_users_with_google()
+            async for users in iter_google_user_pages():
+                pages.append(asyncio.create_task(process_page(users)))
         except Exception as e:
             logger.error(f"Failed to get users: {e}")
-            return
 
-        for user_id in users:
-            try:
-                await self._process_user(user_id)
-            except Exception as e:
-                logger.error(f"Error processing user {user_id}: {e}")
+        await asyncio.gather(*pages)
 
-    async def _process_user(self, user_id: str):
-        """Process meetings for a single user."""
-        # Get Google token
-        google_token = await get_oauth_token(user_id, "google")
+    async def _process_user(self, user_id: str, tokens: Optional[dict] = None):
+        """Process meetings for a single user, optionally with prefetched tokens."""
+        # Look up each token once per user, like a request would
+        scope = start_token_cache(tokens)
+        try:
+            await self._process_user_meetings(user_id)
+        finally:
+            reset_token_cache(scope)
+
+    async def _process_user_meetings(self, user_id: str):
+        """Generate missing prep for one user's upcoming meetings."""
+        # Get tokens; Slack is needed later for gathering
+        google_token, _ = await cached_get_oauth_tokens(user_id, "google", "slack")
         if not google_token:
             return
 
@@ -118,7 +167,8 @@ class PrepScheduler:
         )
 
         try:
-            meetings = calendar.get_meetings_needing_prep(
+            meetings = await asyncio.to_thread(
+                calendar.get_meetings_needing_prep,
                 hours_ahead=self.lookahead_hours,
             )
         except Exception as e:
@@ -127,24 +177,36 @@ class PrepScheduler:
 
         logger.info(f"Found {len(meetings)} meetings for user {user_id}")
 
-        for meeting in meetings:
-            # Check if prep already exists
-            existing = await get_meeting_prep(user_id, meeting.id)
-            if existing:
-                continue
+        # Check which meetings already have prep in one query
+        existing = await get_existing_prep_ids(user_id, [m.id for m in meetings])
+        pending = [m for m in meetings if m.id not in existing]
 
-            # Generate prep
-            try:
-                await self._generate_prep_for_meeting(user_id, meeting)
-                logger.info(f"Generated prep for meeting: {meeting.title}")
-            except Exception as e:
-                logger.error(f"Failed to generate prep for {meeting.id}: {e}")
+        if not pending:
+            return
 
-    async def _generate_prep_for_meeting(self, user_id: str, meeting):
-        """Generate and cache prep for a meeting."""
+        gatherer = await self._build_gatherer(user_id)
+        try:
+            # One batched events.get round-trip for all pending meetings
+            await gatherer.prefetch_calendar_events(pending)
+
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_MEETINGS)
+
+            async def generate(meeting):
+                async with semaphore:
+                    try:
+                        await self._generate_prep_for_meeting(user_id, meeting, gatherer)
+                        logger.info(f"Generated prep for meeting: {meeting.title}")
+                    except Exception as e:
+                        logger.error(f"Failed to generate prep for {meeting.id}: {e}")
+
+            await asyncio.gather(*(generate(meeting) for meeting in pending))
+        finally:
+            await gatherer.aclose()
+
+    async def _build_gatherer(self, user_id: str) -> ContextGatherer:
+        """Build a context gatherer with the user's connected clients."""
         # Get tokens
-        google_token = await get_oauth_token(user_id, "google")
-        slack_token = await get_oauth_token(user_id, "slack")
+        google_token, slack_token = await cached_get_oauth_tokens(user_id, "google", "slack")
 
         # Initialize clients
         gmail_client = None
@@ -158,14 +220,17 @@ class PrepScheduler:
         if slack_token:
             slack_client = SlackClient(slack_token.access_token)
 
-        # Gather context
-        gatherer = ContextGatherer(
+        return ContextGatherer(
             gmail_client=gmail_client,
             slack_client=slack_client,
             calendar_client=calendar_client,
             drive_credentials=calendar_client.credentials if calendar_client else None,
+            user_id=user_id,
         )
 
+    async def _generate_prep_for_meeting(self, user_id: str, meeting, gatherer: ContextGatherer):
+        """Generate and cache prep for a meeting."""
+        # Gather context
         context = await gatherer.gather_meeting_context(
             meeting,
             days_back=14,
@@ -177,7 +242,8 @@ class PrepScheduler:
 
         # Generate prep
         generator = EnhancedPrepGenerator()
-        prep = generator.generate_prep(
+        prep = await asyncio.to_thread(
+            generator.generate_prep,
             meeting=meeting,
             filtered_context=filtered_context,
             has_external_attendees=context.has_external_attendees(),
@@ -188,6 +254,7 @@ class PrepScheduler:
             user_id=user_id,
             meeting_id=meeting.id,
             prep_document=prep.to_dict(),
+            meeting=meeting,
         )
 
 
@@ -206,6 +273,14 @@ if __name__ == "__main__":
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
+    try:
+        # uvloop ships with uvicorn[standard]; uvicorn picks it up on its own,
+        # but a standalone scheduler run has to install it itself
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     if len(sys.argv) > 1 and sys.argv[1] == "--once":
         # Run once and exit
         asyncio.run(run_once())
@@ -1,14 +1,77 @@
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 from config import get_settings
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import base64
 import hashlib
-from typing import Optional
-from models import OAuthToken
-from datetime import datetime
+from typing import AsyncIterator, Optional
+from models import OAuthToken, Meeting
+from datetime import datetime, timezone
+from functools import lru_cache
 
 settings = get_settings()
 
+try:
+    # httpx only speaks HTTP/2 when the h2 package is installed
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+try:
+    # C parser for PostgREST timestamps; also accepts the variable-length
+    # fractional seconds that fromisoformat rejects before Python 3.11
+    from ciso8601 import parse_datetime as _parse_timestamp
+except ImportError:
+    _parse_timestamp = datetime.fromisoformat
+
+try:
+    # orjson encodes the multi-KB prep documents several times faster
+    import orjson
+except ImportError:
+    orjson = None
+
+# Short-lived read caches, as key -> (stored_at, value). Tokens change only
+# through store/delete_oauth_token below, which invalidate them; other
+# processes see a change within the TTL
+TOKEN_CACHE_TTL = 30  # seconds
+USER_EMAIL_CACHE_TTL = 300  # seconds
+READ_CACHE_MAX_ENTRIES = 10_000
+_token_cache: dict[tuple[str, str], tuple[float, Optional[OAuthToken]]] = {}
+_user_email_cache: dict[str, tuple[float, Optional[str]]] = {}
+# Lookups currently running, shared by concurrent callers for the same key
+_token_inflight: dict[tuple[str, str], asyncio.Task] = {}
+_user_email_inflight: dict[str, asyncio.Task] = {}
+
+# Connection pool for PostgREST requests, shared by the scheduler's
+# concurrent users and in-flight API requests
+POSTGREST_MAX_CONNECTIONS = 20
+POSTGREST_MAX_KEEPALIVE = 10
+# Kept above service_role's statement_timeout (migration 002), so the
+# database cancels a slow query before the client abandons it
+POSTGREST_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+# Retries for transient query failures in _execute
+DB_RETRY_ATTEMPTS = 3
+DB_RETRY_BASE_DELAY = 0.1  # seconds, doubled per attempt, plus jitter
+DB_RETRY_MAX_DELAY = 2.0  # seconds
+# Connection-level failures, including a pooled keep-alive connection the
+# server already closed; read timeouts aren't retried since the statement
+# may still be running
+_TRANSIENT_HTTP_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError)
+# PostgREST couldn't connect to, or get a pooled connection from, Postgres
+_TRANSIENT_PGRST_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003"}
+
+# Version of the stored prep document layout; 2 embeds the meeting
+PREP_SCHEMA_VERSION = 2
+
 
 def get_encryption_key() -> bytes:
     """Derive a Fernet-compatible key from the secret key."""
@@ -16,26 +79,144 @@ def get_encryption_key() -> bytes:
     return base64.urlsafe_b64encode(key)
 
 
+# Tokens are stored as TOKEN_FORMAT_PREFIX + base64(nonce + AES-GCM
+# ciphertext). Values without the prefix are legacy Fernet tokens, which
+# are still decrypted and get rewritten as AES-GCM on their next refresh
+TOKEN_FORMAT_PREFIX = "v2:"
+GCM_NONCE_SIZE = 12
+
+# Derived once; both ciphers are stateless and safe to share across threads
+_fernet = Fernet(get_encryption_key())
+_aesgcm = AESGCM(hashlib.sha256(b"oauth-token-aesgcm:" + settings.secret_key.encode()).digest())
+
+
 def encrypt_token(token: str) -> str:
     """Encrypt a token for storage."""
-    f = Fernet(get_encryption_key())
-    return f.encrypt(token.encode()).decode()
+    nonce = os.urandom(GCM_NONCE_SIZE)
+    sealed = _aesgcm.encrypt(nonce, token.encode(), None)
+    return TOKEN_FORMAT_PREFIX + base64.urlsafe_b64encode(nonce + sealed).decode()
 
 
 def decrypt_token(encrypted_token: str) -> str:
-    """Decrypt a stored token."""
-    f = Fernet(get_encryption_key())
-    return f.decrypt(encrypted_token.encode()).decode()
+    """Decrypt a stored token, AES-GCM or legacy Fernet."""
+    if not encrypted_token.startswith(TOKEN_FORMAT_PREFIX):
+        return _fernet.decrypt(encrypted_token.encode()).decode()
+    raw = base64.urlsafe_b64decode(encrypted_token[len(TOKEN_FORMAT_PREFIX):])
+    return _aesgcm.decrypt(raw[:GCM_NONCE_SIZE], raw[GCM_NONCE_SIZE:], None).decode()
+
+
+# All database access goes through supabase-py, i.e. PostgREST over HTTPS.
+# Postgres connections, their pooling and prepared-statement handling are
+# managed server-side by PostgREST/Supavisor; the only pool this process
+# owns is the HTTP client's.
+
+
+class _PostgrestSession(httpx.Client):
+    """httpx client that encodes PostgREST request bodies with orjson when available."""
+
+    def build_request(self, method, url, *, json=None, content=None, headers=None, **kwargs):
+        if json is not None and content is None and orjson is not None:
+            content = orjson.dumps(json)
+            headers = httpx.Headers(headers)
+            headers["Content-Type"] = "application/json"
+            json = None
+        return super().build_request(method, url, json=json, content=content, headers=headers, **kwargs)
+
+
+def _use_pooled_session(client: Client) -> Client:
+    """Swap the client's PostgREST session for one with explicit pool limits."""
+    default = client.postgrest.session
+    client.postgrest.session = _PostgrestSession(
+        base_url=default.base_url,
+        headers=default.headers,
+        timeout=POSTGREST_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=POSTGREST_MAX_CONNECTIONS,
+            max_keepalive_connections=POSTGREST_MAX_KEEPALIVE,
+        ),
+        http2=_HTTP2_AVAILABLE,
+    )
+    default.close()
+    return client
 
 
+@lru_cache(maxsize=1)
 def get_supabase_client() -> Client:
-    """Get the Supabase client."""
-    return create_client(settings.supabase_url, settings.supabase_key)
+    """Get the Supabase client, created once so its HTTP connections are reused."""
+    return _use_pooled_session(create_client(settings.supabase_url, settings.supabase_key))
 
 
+@lru_cache(maxsize=1)
 def get_supabase_admin_client() -> Client:
-    """Get the Supabase admin client with service key."""
-    return create_client(settings.supabase_url, settings.supabase_service_key)
+    """Get the Supabase admin client with service key, created once per process."""
+    return _use_pooled_session(create_client(settings.supabase_url, settings.supabase_service_key))
+
+
+def _cache_lookup(cache: dict, key, ttl: float):
+    """Return (hit, value) for a read cache entry younger than ttl."""
+    entry = cache.get(key)
+    if entry and time.monotonic() - entry[0] < ttl:
+        return True, entry[1]
+    return False, None
+
+
+def _cache_store(cache: dict, key, value) -> None:
+    """Store a read cache entry, evicting the oldest one when full."""
+    cache.pop(key, None)
+    if len(cache) >= READ_CACHE_MAX_ENTRIES:
+        del cache[next(iter(cache))]
+    cache[key] = (time.monotonic(), value)
+
+
+async def _single_flight(inflight: dict, key, fetch):
+    """
+    Await fetch() once per key among concurrent callers.
+
+    Callers arriving while a fetch for the same key is running share its
+    result instead of issuing their own query. The shared task is shielded
+    so one caller being cancelled doesn't cancel it for the others.
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        inflight[key] = task
+        task.add_done_callback(lambda done: inflight.pop(key) if inflight.get(key) is done else None)
+    return await asyncio.shield(task)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed query is worth retrying on the same client."""
+    if isinstance(error, _TRANSIENT_HTTP_ERRORS):
+        return True
+    if isinstance(error, APIError):
+        return error.code in _TRANSIENT_PGRST_CODES or "MaxClients" in (error.message or "")
+    return False
+
+
+async def _execute(query):
+    """
+    Run a supabase-py query in a worker thread; the client is blocking.
+
+    Connection and pool failures are retried with jittered exponential
+    backoff on the same pooled client. Every write here is an upsert or
+    delete, so repeating one is safe.
+    """
+    for attempt in range(DB_RETRY_ATTEMPTS):
+        try:
+            return await asyncio.to_thread(query.execute)
+        except Exception as e:
+            if attempt == DB_RETRY_ATTEMPTS - 1 or not _is_transient(e):
+                raise
+            delay = min(DB_RETRY_MAX_DELAY, DB_RETRY_BASE_DELAY * 2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay))
+
+
+def close_supabase_clients() -> None:
+    """Close the pooled PostgREST sessions of any clients created so far."""
+    for getter in (get_supabase_client, get_supabase_admin_client):
+        if getter.cache_info().currsize:
+            getter().postgrest.session.close()
+            getter.cache_clear()
 
 
 async def store_oauth_token(
@@ -57,89 +238,166 @@ async def store_oauth_token(
         "access_token": encrypted_access,
         "refresh_token": encrypted_refresh,
         "expires_at": expires_at.isoformat() if expires_at else None,
-        "updated_at": datetime.utcnow().isoformat(),
+        # updated_at is stamped by the column default / update trigger
     }
 
     # Upsert the token
-    client.table("oauth_tokens").upsert(
+    await _execute(client.table("oauth_tokens").upsert(
         data,
         on_conflict="user_id,provider"
-    ).execute()
-
+    ))
+    _token_cache.pop((user_id, provider), None)
 
-async def get_oauth_token(user_id: str, provider: str) -> Optional[OAuthToken]:
-    """Retrieve and decrypt OAuth tokens from Supabase."""
-    client = get_supabase_admin_client()  # Use admin client to bypass RLS
 
-    result = client.table("oauth_tokens").select("*").eq(
-        "user_id", user_id
-    ).eq("provider", provider).execute()
+# The oauth_tokens columns _token_from_row reads
+TOKEN_COLUMNS = "user_id,provider,access_token,refresh_token,expires_at"
 
-    if not result.data or len(result.data) == 0:
-        return None
 
-    data = result.data[0]
+def _token_from_row(data: dict) -> OAuthToken:
+    """Decrypt an oauth_tokens row into an OAuthToken."""
     return OAuthToken(
         user_id=data["user_id"],
         provider=data["provider"],
         access_token=decrypt_token(data["access_token"]),
         refresh_token=decrypt_token(data["refresh_token"]) if data.get("refresh_token") else None,
-        expires_at=datetime.fromisoformat(data["expires_at"]) if data.get("expires_at") else None,
+        expires_at=_parse_timestamp(data["expires_at"]) if data.get("expires_at") else None,
+    )
+
+
+async def get_oauth_token(user_id: str, provider: str) -> Optional[OAuthToken]:
+    """Retrieve and decrypt OAuth tokens from Supabase (cached for TOKEN_CACHE_TTL)."""
+    hit, token = _cache_lookup(_token_cache, (user_id, provider), TOKEN_CACHE_TTL)
+    if hit:
+        return token
+
+    return await _single_flight(
+        _token_inflight, (user_id, provider), lambda: _fetch_oauth_token(user_id, provider),
     )
 
 
+async def _fetch_oauth_token(user_id: str, provider: str) -> Optional[OAuthToken]:
+    client = get_supabase_admin_client()  # Use admin client to bypass RLS
+
+    result = await _execute(client.table("oauth_tokens").select(TOKEN_COLUMNS).eq(
+        "user_id", user_id
+    ).eq("provider", provider).limit(1).maybe_single())
+
+    # maybe_single() yields no response at all on some versions when nothing matches
+    token = _token_from_row(result.data) if result and result.data else None
+
+    _cache_store(_token_cache, (user_id, provider), token)
+    return token
+
+
+# User IDs per IN (...) filter, keeping the request URL well under limits
+BULK_TOKEN_CHUNK_SIZE = 500
+# Rows decrypted per pool task; single tokens are too cheap to dispatch alone
+DECRYPT_BATCH_SIZE = 64
+
+_decrypt_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="token-decrypt")
+
+
+def _tokens_from_rows(rows: list[dict]) -> list[OAuthToken]:
+    return [_token_from_row(row) for row in rows]
+
+
+async def get_oauth_tokens_bulk(user_ids: list[str], provider: str) -> dict[str, OAuthToken]:
+    """
+    Fetch one provider's tokens for many users with a query per chunk.
+
+    Users without a token are absent from the result. Decryption runs on a
+    thread pool alongside the remaining queries.
+    """
+    client = get_supabase_admin_client()  # Use admin client to bypass RLS
+
+    async def fetch_chunk(chunk: list[str]) -> list[OAuthToken]:
+        result = await _execute(client.table("oauth_tokens").select(TOKEN_COLUMNS).eq(
+            "provider", provider
+        ).in_("user_id", chunk))
+        rows = result.data or []
+        # Spread decryption over the pool; OpenSSL runs without the GIL
+        loop = asyncio.get_running_loop()
+        batches = await asyncio.gather(*(
+            loop.run_in_executor(_decrypt_pool, _tokens_from_rows, rows[i:i + DECRYPT_BATCH_SIZE])
+            for i in range(0, len(rows), DECRYPT_BATCH_SIZE)
+        ))
+        return [token for batch in batches for token in batch]
+
+    chunks = await asyncio.gather(*(
+        fetch_chunk(user_ids[i:i + BULK_TOKEN_CHUNK_SIZE])
+        for i in range(0, len(user_ids), BULK_TOKEN_CHUNK_SIZE)
+    ))
+    return {token.user_id: token for chunk in chunks for token in chunk}
+
+
 async def delete_oauth_token(user_id: str, provider: str) -> None:
     """Delete OAuth tokens from Supabase."""
     client = get_supabase_admin_client()  # Use admin client to bypass RLS
-    client.table("oauth_tokens").delete().eq(
+    await _execute(client.table("oauth_tokens").delete().eq(
         "user_id", user_id
-    ).eq("provider", provider).execute()
+    ).eq("provider", provider))
+    _token_cache.pop((user_id, provider), None)
 
 
 async def store_meeting_prep(
     user_id: str,
     meeting_id: str,
     prep_document: dict,
+    meeting: Optional[Meeting] = None,
 ) -> None:
-    """Store a generated meeting prep document."""
+    """
+    Store a generated meeting prep document.
+
+    When given, the meeting is embedded in the document so cache hits can
+    be served without fetching it from Google Calendar again.
+    """
     client = get_supabase_admin_client()  # Use admin client to bypass RLS
 
+    if meeting is not None:
+        prep_document = {
+            **prep_document,
+            "meeting": meeting.model_dump(mode="json"),
+            "schema_version": PREP_SCHEMA_VERSION,
+        }
+
     data = {
         "user_id": user_id,
         "meeting_id": meeting_id,
         "prep_document": prep_document,
-        "generated_at": datetime.utcnow().isoformat(),
+        # No trigger on meeting_preps, so regenerations must set this themselves
+        "generated_at": datetime.now(timezone.utc).isoformat(),
     }
 
-    client.table("meeting_preps").upsert(
+    await _execute(client.table("meeting_preps").upsert(
         data,
         on_conflict="user_id,meeting_id"
-    ).execute()
+    ))
 
 
 async def get_meeting_prep(user_id: str, meeting_id: str) -> Optional[dict]:
     """Retrieve a stored meeting prep document."""
     client = get_supabase_admin_client()  # Use admin client to bypass RLS
 
-    result = client.table("meeting_preps").select("*").eq(
+    result = await _execute(client.table("meeting_preps").select("prep_document").eq(
         "user_id", user_id
-    ).eq("meeting_id", meeting_id).execute()
+    ).eq("meeting_id", meeting_id).limit(1).maybe_single())
 
-    if not result.data or len(result.data) == 0:
+    if not result or not result.data:
         return None
 
-    return result.data[0].get("prep_document")
+    return result.data.get("prep_document")
 
 
 async def check_connection_status(user_id: str) -> dict:
     """Check which services the user has connected."""
     client = get_supabase_admin_client()  # Use admin client to bypass RLS
 
-    result = client.table("oauth_tokens").select("provider").eq(
+    # At most one row per provider comes back, and only the two we report
+    result = await _execute(client.table("oauth_tokens").select("provider").eq(
         "user_id", user_id
-    ).execute()
+    ).in_("provider", ["google", "slack"]))
 
-    providers = [r["provider"] for r in result.data] if result.data else []
+    providers = {r["provider"] for r in result.data} if result.data else set()
 
     return {
         "google_connected": "google" in providers,
@@ -148,43 +406,92 @@ async def check_connection_status(user_id: str) -> dict:
 
 
 async def get_user_email(user_id: str) -> Optional[str]:
-    """Get the user's email from Supabase auth."""
+    """Get the user's email from Supabase auth (cached for USER_EMAIL_CACHE_TTL)."""
+    hit, email = _cache_lookup(_user_email_cache, user_id, USER_EMAIL_CACHE_TTL)
+    if hit:
+        return email
+
+    return await _single_flight(_user_email_inflight, user_id, lambda: _fetch_user_email(user_id))
+
+
+async def _fetch_user_email(user_id: str) -> Optional[str]:
     client = get_supabase_admin_client()
+    email = None
 
     try:
         # Try to get user from auth.users via admin API
-        user = client.auth.admin.get_user_by_id(user_id)
+        user = await asyncio.to_thread(client.auth.admin.get_user_by_id, user_id)
         if user and user.user:
-            return user.user.email
+            email = user.user.email
     except Exception:
-        pass
+        # Don't cache failures; the next call retries
+        return None
 
-    return None
+    _cache_store(_user_email_cache, user_id, email)
+    return email
 
 
-async def get_all_users_with_google() -> list[str]:
-    """Get all user IDs that have Google connected (for scheduler)."""
+# Rows per page when listing users; PostgREST caps responses at 1000 rows
+# by default (max-rows), so unpaginated selects silently truncate
+USER_PAGE_SIZE = 1000
+
+
+async def iter_google_user_pages(page_size: int = USER_PAGE_SIZE) -> AsyncIterator[list[str]]:
+    """
+    Yield the user IDs that have Google connected, one page at a time.
+
+    Pages follow user_id order using the last ID seen as the cursor, so
+    rows added or removed mid-scan don't shift later pages.
+    """
     client = get_supabase_admin_client()
+    last_user_id = None
 
-    result = client.table("oauth_tokens").select("user_id").eq(
-        "provider", "google"
-    ).execute()
+    while True:
+        query = client.table("oauth_tokens").select("user_id").eq("provider", "google")
+        if last_user_id is not None:
+            query = query.gt("user_id", last_user_id)
+        result = await _execute(query.order("user_id").limit(page_size))
 
-    if not result.data:
-        return []
+        # UNIQUE(user_id, provider) already makes these distinct
+        user_ids = [r["user_id"] for r in result.data or []]
+        if user_ids:
+            yield user_ids
+        if len(user_ids) < page_size:
+            return
+        last_user_id = user_ids[-1]
 
-    return list(set(r["user_id"] for r in result.data))
+
+async def get_all_users_with_google() -> list[str]:
+    """Get all user IDs that have Google connected."""
+    return [user_id async for page in iter_google_user_pages() for user_id in page]
 
 
 async def get_user_meeting_prep_ids(user_id: str) -> list[str]:
     """Get all meeting IDs that have prep documents for a user."""
     client = get_supabase_admin_client()
 
-    result = client.table("meeting_preps").select("meeting_id").eq(
+    result = await _execute(client.table("meeting_preps").select("meeting_id").eq(
         "user_id", user_id
-    ).execute()
+    ))
 
     if not result.data:
         return []
 
     return [r["meeting_id"] for r in result.data]
+
+
+async def get_existing_prep_ids(user_id: str, meeting_ids: list[str]) -> set[str]:
+    """Return which of the given meetings already have a prep document, in one query."""
+    if not meeting_ids:
+        return set()
+
+    client = get_supabase_admin_client()
+
+    result = await _execute(client.table("meeting_preps").select("meeting_id").eq(
+        "user_id", user_id
+    ).in_("meeting_id", meeting_ids))
+
+    if not result.data:
+        return set()
+
+    return {r["meeting_id"] for r in result.data}
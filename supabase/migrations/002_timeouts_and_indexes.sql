@@ -0,0 +1,16 @@
+-- Query timeouts and indexes for the scheduler's bulk reads
+-- Run this in your Supabase SQL Editor after 001_initial_schema.sql
+
+-- The backend talks to PostgREST as service_role, which has no statement
+-- timeout by default. Cancel runaway queries before the backend's 10s HTTP
+-- timeout gives up on them, so they don't keep holding a pooled connection.
+ALTER ROLE service_role SET statement_timeout = '8s';
+ALTER ROLE service_role SET idle_in_transaction_session_timeout = '60s';
+
+-- Have PostgREST pick up the new role settings
+NOTIFY pgrst, 'reload config';
+
+-- Token lookups by (user_id, provider) are already covered by the
+-- UNIQUE(user_id, provider) index. The scheduler pages through one
+-- provider's users in user_id order, which this index serves directly
+CREATE INDEX IF NOT EXISTS idx_oauth_tokens_provider_user_id ON oauth_tokens(provider, user_id);